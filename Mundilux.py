@@ -1,30 +1,51 @@
 import sys
 import os
+import time
+_STARTUP_T0 = time.perf_counter()  # Reference point for --profile-startup
 import json
-import pyperclip
+import argparse
+import heapq
+import bisect
+import mmap
+import zlib
+import struct
+import importlib.util
 import re
-import pyttsx3
+import unicodedata
+import sqlite3
+import queue
+import socket
+import socketserver
+import random
+import hashlib
+import hmac
+import secrets
+import threading
 import traceback
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+# pyttsx3, plyer, pyperclip and groq are imported on first use to keep startup fast
+_STARTUP_MARKS = [("stdlib imports", time.perf_counter())]
 
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QTextEdit, QPushButton, QMessageBox, QGroupBox,
-    QListWidget, QListWidgetItem, QComboBox, QLineEdit, QCheckBox,
-    QFileDialog, QDialog, QDialogButtonBox, QFormLayout
+    QListView, QComboBox, QLineEdit, QCheckBox,
+    QFileDialog, QDialog, QDialogButtonBox, QFormLayout, QProgressDialog
 )
-from PyQt5.QtGui import QFont, QIcon
-from PyQt5.QtCore import Qt, pyqtSignal, QObject, QThread, QTimer
-
-from plyer import notification
+from PyQt5.QtGui import QFont, QIcon, QColor, QTextCharFormat
+from PyQt5.QtCore import (
+    Qt, pyqtSignal, QObject, QThread, QTimer, QRunnable, QThreadPool,
+    QAbstractListModel, QModelIndex, QRegularExpression
+)
+_STARTUP_MARKS.append(("PyQt5 imports", time.perf_counter()))
 
 # Set the GROQ API Key once here
 os.environ["GROQ_API_KEY"] = "your_API_sec_key"
 
-# Import Groq for Llama AI integration
-try:
-    from groq import Groq
-except ImportError:
+# Groq for Llama AI integration is imported on first use (see GroqClient)
+if importlib.util.find_spec("groq") is None:
     print("groq package not found. Please install it using 'pip install groq'.")
     sys.exit(1)
 
@@ -39,16 +60,400 @@ if not GROQ_API_KEY:
     print("GROQ_API_KEY must be set in the environment variables.")
     sys.exit(1)
 
+# Model and prompts used for every lookup. Bump PROMPT_VERSION whenever the
+# prompts change so cached definitions produced by the old wording are ignored.
+GROQ_MODEL = "llama3-70b-8192"
+PROMPT_VERSION = 1
+
+SYSTEM_PROMPT = "You are a helpful assistant specializing in multiple languages. Provide clear and concise definitions, synonyms, antonyms, and example sentences in the specified language."
+
+BATCH_SIZE = 8  # Words per batch request
+BATCH_MAX_TOKENS_PER_WORD = 400
+BATCH_MAX_TOKENS = 6000
+
+def build_batch_prompt(words, language: str) -> str:
+    """Return the user prompt asking for the linguistic information of several words as JSON."""
+    return (
+        f"Provide the definition, synonyms, antonyms, and example sentences in {language} for each of these words: "
+        f"{json.dumps(list(words), ensure_ascii=False)}. Whatever the language is, write the entries in that language. "
+        "Answer with a single JSON object that maps every word, spelled exactly as given, to its entry as one string. "
+        "Inside each entry separate the different sections with blank lines. "
+        "Do not add any text outside the JSON object."
+    )
+
+def parse_batch_response(content: str, words) -> dict:
+    """
+    Parse a JSON batch answer into {word: response} for the requested words.
+    Words missing from the answer are left out.
+    """
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        # Tolerate text around the object
+        start, end = content.find("{"), content.rfind("}")
+        if start == -1 or end <= start:
+            return {}
+        try:
+            data = json.loads(content[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+    if not isinstance(data, dict):
+        return {}
+
+    by_key = {str(key).strip().casefold(): value for key, value in data.items()}
+    entries = {}
+    for word in words:
+        value = by_key.get(word.strip().casefold())
+        if isinstance(value, dict):
+            # Some answers come back structured; flatten them into sections
+            value = "\n\n".join(
+                f"{section}: {', '.join(map(str, v)) if isinstance(v, list) else v}"
+                for section, v in value.items()
+            )
+        elif isinstance(value, list):
+            value = "\n\n".join(map(str, value))
+        if isinstance(value, str) and value.strip():
+            entries[word] = value.strip()
+    return entries
+
+def build_user_prompt(word: str, language: str) -> str:
+    """Return the user prompt asking for the linguistic information of a word."""
+    return f"Provide the definition, synonyms, antonyms, and example sentences for the word '{word}' in {language}. Format your response clearly. and whatever the language is I want you to speak in that language. also seperate your different resonses in different lines at least 2 lines space . and do not say hi or what you are about to do or any extra things just what you are asked to do"
+
+###############################################################################
+# STARTUP PROFILING
+###############################################################################
+# Time budget for the window to show its first paint, checked by --profile-startup
+STARTUP_BUDGET_MS = float(os.environ.get("MUNDILEX_STARTUP_BUDGET_MS", "500"))
+
+class StartupProfile:
+    """
+    Named timestamps from process start to the first paint and the deferred
+    data load. Marks are cheap and always recorded; report() prints them as
+    a breakdown when --profile-startup is given.
+    """
+    def __init__(self, t0, marks=()):
+        self.t0 = t0
+        self.marks = list(marks)
+        self.enabled = False
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter()))
+
+    def elapsed_ms(self, label=None):
+        """Milliseconds from process start to a mark (default: the latest)."""
+        for name, t in reversed(self.marks):
+            if label is None or name == label:
+                return (t - self.t0) * 1000
+        return None
+
+    def report(self, budget_label="first paint", budget_ms=STARTUP_BUDGET_MS):
+        print("Startup profile:")
+        previous = self.t0
+        for label, t in self.marks:
+            print(f"  {label:<32} {(t - previous) * 1000:8.1f} ms  (at {(t - self.t0) * 1000:8.1f} ms)")
+            previous = t
+        reached = self.elapsed_ms(budget_label)
+        if reached is not None:
+            verdict = "within" if reached <= budget_ms else "OVER"
+            print(f"  {budget_label} after {reached:.1f} ms, {verdict} the {budget_ms:.0f} ms budget")
+
+startup_profile = StartupProfile(_STARTUP_T0, _STARTUP_MARKS)
+
+###############################################################################
+# METRICS & PROFILING
+###############################################################################
+# Timing spans of the hot path (clipboard read -> rendering) are collected in
+# histograms; they are shown in the Metrics panel (F12), served by the lookup
+# daemon at /metrics and written to MUNDILEX_METRICS_FILE when it is set.
+METRICS_FILE = os.environ.get("MUNDILEX_METRICS_FILE", "")
+METRICS_WRITE_INTERVAL_MS = 10000
+# Histogram bucket bounds in seconds
+METRICS_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+# The sampling profiler starts with the app when MUNDILEX_PROFILE=1
+PROFILER_AUTOSTART = os.environ.get("MUNDILEX_PROFILE", "0") == "1"
+PROFILER_INTERVAL = float(os.environ.get("MUNDILEX_PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILER_MAX_DEPTH = 64
+
+class Histogram:
+    """Counts of observed durations per bucket, plus their sum and maximum. Thread-safe."""
+
+    def __init__(self, bounds=METRICS_BUCKETS):
+        self.bounds = bounds
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.bounds) + 1)  # The last one is +Inf
+            self.count = 0
+            self.sum = 0.0
+            self.max = 0.0
+            self.last = 0.0
+
+    def observe(self, seconds: float):
+        index = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            self.last = seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, fraction: float) -> float:
+        """Estimate a quantile, interpolating within its bucket."""
+        with self._lock:
+            counts, total, peak = list(self.counts), self.count, self.max
+        if not total:
+            return 0.0
+        rank = fraction * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                low = self.bounds[index - 1] if index else 0.0
+                high = self.bounds[index] if index < len(self.bounds) else peak
+                return min(peak, low + (high - low) * (rank - seen) / count)
+            seen += count
+        return peak
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"counts": list(self.counts), "count": self.count, "sum": self.sum, "max": self.max,
+                    "last": self.last}
+
+class _Span:
+    """Context manager timing one pass through a step (see Metrics.span)."""
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+class Metrics:
+    """
+    In-process metrics: one duration histogram per span name, plus
+    collectors (callables returning a possibly nested dict of numbers, e.g.
+    LookupCore.stats) read at export time. Exported in the Prometheus text
+    format; strings become a gauge with the value as a label (circuit
+    state).
+    """
+
+    def __init__(self, prefix="mundilex"):
+        self.prefix = prefix
+        self._histograms = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, Histogram())
+        return histogram
+
+    def span(self, name: str) -> _Span:
+        """Time a block: `with metrics.span("network"): ...`"""
+        return _Span(self.histogram(name))
+
+    def observe(self, name: str, seconds: float):
+        self.histogram(name).observe(seconds)
+
+    def histograms(self) -> dict:
+        with self._lock:
+            return dict(sorted(self._histograms.items()))
+
+    def register(self, collector, name=None):
+        """Export collector()'s values, under name_ when a name is given."""
+        with self._lock:
+            self._collectors.append((name, collector))
+
+    def unregister(self, collector):
+        with self._lock:
+            self._collectors = [entry for entry in self._collectors if entry[1] != collector]
+
+    def reset(self):
+        for histogram in self.histograms().values():
+            histogram.reset()
+
+    def values(self) -> dict:
+        """Current values of every collector, flattened to {metric name: value}."""
+        with self._lock:
+            collectors = list(self._collectors)
+        values = {}
+
+        def flatten(name, value):
+            if isinstance(value, dict):
+                for key, item in value.items():
+                    flatten(f"{name}_{key}", item)
+            elif isinstance(value, (bool, int, float, str)):
+                values[re.sub(r"[^a-zA-Z0-9_]", "_", name)] = value
+
+        for name, collector in collectors:
+            try:
+                flatten(f"{self.prefix}_{name}" if name else self.prefix, collector())
+            except Exception as e:
+                print(f"Metrics collector {collector} failed: {e}")
+        return values
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        name = f"{self.prefix}_span_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each step of a lookup",
+            f"# TYPE {name} histogram",
+        ]
+        for span, histogram in self.histograms().items():
+            snapshot = histogram.snapshot()
+            cumulative = 0
+            for bound, count in zip(list(histogram.bounds) + ["+Inf"], snapshot["counts"]):
+                cumulative += count
+                lines.append(f'{name}_bucket{{span="{span}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_sum{{span="{span}"}} {snapshot["sum"]:.9g}')
+            lines.append(f'{name}_count{{span="{span}"}} {snapshot["count"]}')
+        for key, value in self.values().items():
+            lines.append(f"# TYPE {key} gauge")
+            if isinstance(value, str):
+                lines.append(f'{key}{{state="{value}"}} 1')
+            else:
+                lines.append(f"{key} {float(value):g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str):
+        """Write prometheus_text() to path atomically (for node_exporter's textfile collector)."""
+        partial = path + ".tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(partial, path)
+
+metrics = Metrics()
+
+class SamplingProfiler:
+    """
+    Statistical profiler that can be switched on in a running app. A
+    background thread records the Python stack of every other thread every
+    `interval` seconds; a function's share of samples is its share of wall
+    time (threads waiting on the network or a lock count too). Samples are
+    kept as folded stacks, the input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval=PROFILER_INTERVAL):
+        self.interval = interval
+        self._stacks = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self.samples = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="SamplingProfiler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join()
+
+    def reset(self):
+        with self._lock:
+            self._stacks = {}
+            self.samples = 0
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < PROFILER_MAX_DEPTH:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread {ident}"))
+                key = ";".join(reversed(stack))
+                with self._lock:
+                    self._stacks[key] = self._stacks.get(key, 0) + 1
+            with self._lock:
+                self.samples += 1
+
+    def folded(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in sorted(self._stacks.items()))
+
+    def write_folded(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+
+    def top(self, limit=15) -> list:
+        """
+        (function, self samples, total samples) of the functions seen most
+        often, by self samples. A function running in several threads is
+        counted once per thread, so its share of the rounds can exceed 100%.
+        """
+        own, total = {}, {}
+        with self._lock:
+            stacks = list(self._stacks.items())
+        for stack, count in stacks:
+            frames = stack.split(";")[1:]  # Without the thread name
+            if not frames:
+                continue
+            own[frames[-1]] = own.get(frames[-1], 0) + count
+            for function in set(frames):
+                total[function] = total.get(function, 0) + count
+        ranked = sorted(total, key=lambda function: (own.get(function, 0), total[function]), reverse=True)
+        return [(function, own.get(function, 0), total[function]) for function in ranked[:limit]]
+
+    def report(self, limit=15) -> str:
+        lines = [f"{self.samples} samples every {self.interval * 1000:g} ms ({'running' if self.running else 'stopped'})"]
+        if self.samples:
+            lines.append(f"  {'self':>6} {'total':>6}  function")
+            for function, own, total in self.top(limit):
+                lines.append(f"  {own / self.samples:6.1%} {total / self.samples:6.1%}  {function}")
+        return "\n".join(lines)
+
+profiler = SamplingProfiler()
+
+def write_metrics_file(path=None):
+    """Write the metrics to MUNDILEX_METRICS_FILE (or path); errors are printed, not raised."""
+    path = path or METRICS_FILE
+    try:
+        metrics.write(path)
+    except OSError as e:
+        print(f"Failed to write metrics to {path}: {e}")
+
 ###############################################################################
 # NOTIFICATIONS (PLYER)
 ###############################################################################
 NOTIFICATION_MAX_LENGTH = 256
+NOTIFICATIONS_ENABLED = os.environ.get("MUNDILEX_NOTIFICATIONS", "1") != "0"
+# At most one notification per interval; what arrives in between is merged
+NOTIFICATION_MIN_INTERVAL = float(os.environ.get("MUNDILEX_NOTIFICATION_INTERVAL", "3"))
+NOTIFICATION_SUMMARY_MAX_ITEMS = 3
 
 def show_notification(title, message):
     """Show desktop notification using plyer."""
     if len(message) > NOTIFICATION_MAX_LENGTH:
         message = message[:NOTIFICATION_MAX_LENGTH - 3] + "..."
     try:
+        from plyer import notification
         notification.notify(
             title=title,
             message=message,
@@ -58,20 +463,314 @@ def show_notification(title, message):
     except Exception as e:
         print(f"Failed to show notification: {e}")
 
+class NotificationDispatcher:
+    """
+    Shows desktop notifications from a background thread, so a slow
+    notification service (plyer goes through D-Bus on Linux) never stalls a
+    lookup. At most one notification is shown per min_interval seconds.
+    Notifications queued in the meantime are kept per key (the word): a
+    newer one for the same key replaces the stale one, and several keys are
+    merged into one summary with the first line of each, newest first.
+    """
+
+    def __init__(self, min_interval=NOTIFICATION_MIN_INTERVAL, show=show_notification):
+        self.min_interval = min_interval
+        self.show = show
+        self._pending = {}  # key -> (title, message, queued at), oldest first
+        self._condition = threading.Condition()
+        self._thread = None
+        self._next_allowed = 0.0
+        self.queued = 0
+        self.shown = 0
+        self.replaced = 0
+        self.merged = 0
+
+    def notify(self, title: str, message: str, key=None):
+        """Queue a notification; returns at once."""
+        if not NOTIFICATIONS_ENABLED:
+            return
+        key = key if key is not None else title
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="NotificationDispatcher", daemon=True)
+                self._thread.start()
+            if self._pending.pop(key, None) is not None:
+                self.replaced += 1
+            self._pending[key] = (title, message, time.perf_counter())
+            self.queued += 1
+            self._condition.notify()
+
+    def close(self, timeout=1.0):
+        """Drop queued notifications and stop the thread."""
+        with self._condition:
+            thread, self._thread = self._thread, None
+            self._pending.clear()
+            self._condition.notify()
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        me = threading.current_thread()
+        while True:
+            with self._condition:
+                # A closed dispatcher's thread exits, even if notify() has started a new one
+                while self._thread is me and (not self._pending or time.monotonic() < self._next_allowed):
+                    self._condition.wait(max(0.0, self._next_allowed - time.monotonic()) if self._pending else None)
+                if self._thread is not me:
+                    return
+                pending, self._pending = list(self._pending.items()), {}
+            title, message = self._compose(pending)
+            for _, (_, _, queued_at) in pending:
+                metrics.observe("notification_delay", time.perf_counter() - queued_at)
+            with metrics.span("notification"):
+                self.show(title, message)
+            with self._condition:
+                self.shown += 1
+                self.merged += len(pending) - 1
+                self._next_allowed = time.monotonic() + self.min_interval
+
+    @staticmethod
+    def _compose(pending):
+        """Title and message of one notification for the queued (key, (title, message, time)) items."""
+        if len(pending) == 1:
+            _, (title, message, _) = pending[0]
+            return title, message
+        lines = []
+        for key, (_, message, _) in reversed(pending[-NOTIFICATION_SUMMARY_MAX_ITEMS:]):
+            # The first line that is more than a heading such as "**Definition:**"
+            gist = next((line for line in (part.strip(" *") for part in message.splitlines())
+                         if line and not line.endswith(":")), "")
+            lines.append(f"{key}: {gist}" if gist else str(key))
+        if len(pending) > NOTIFICATION_SUMMARY_MAX_ITEMS:
+            lines.append(f"and {len(pending) - NOTIFICATION_SUMMARY_MAX_ITEMS} more")
+        return f"{len(pending)} words looked up", "\n".join(lines)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "queued": self.queued,
+                "shown": self.shown,
+                "replaced": self.replaced,
+                "merged": self.merged,
+                "pending": len(self._pending)
+            }
+
+notifications = NotificationDispatcher()
+metrics.register(notifications.stats, "notifications")
+
+###############################################################################
+# TEXT TO SPEECH
+###############################################################################
+LANGUAGE_CODES = {
+    "German": "de",
+    "English": "en",
+    "French": "fr",
+    "Italian": "it",
+    "Spanish": "es",
+    "Russian": "ru"
+}
+SPEECH_RATE = 150
+SPEECH_VOLUME = 0.9
+# Cache synthesized audio per (text, voice) for instant replay (needs QtMultimedia)
+TTS_AUDIO_CACHE = os.environ.get("MUNDILEX_TTS_CACHE", "0") == "1"
+TTS_AUDIO_CACHE_DIR = "tts_cache"
+
+def voice_language_codes(voice) -> set:
+    """Return the primary language codes ("de", "en", ...) a pyttsx3 voice declares."""
+    codes = set()
+    for lang in getattr(voice, "languages", None) or []:
+        if isinstance(lang, bytes):
+            # eSpeak prefixes the language with a priority byte
+            lang = lang.decode("utf-8", errors="ignore")
+        lang = "".join(ch for ch in str(lang) if ch.isprintable()).strip().lower()
+        if lang:
+            codes.add(lang.replace("_", "-").split("-")[0])
+    return codes
+
+def build_voice_index(voices) -> dict:
+    """Map language codes to the id of the first voice that speaks them."""
+    index = {}
+    names = {name.lower(): code for name, code in LANGUAGE_CODES.items()}
+    for voice in voices:
+        codes = voice_language_codes(voice)
+        # Some drivers only name the language ("German") instead of declaring it
+        voice_name = str(getattr(voice, "name", "")).lower()
+        codes.update(code for name, code in names.items() if name in voice_name)
+        for code in codes:
+            index.setdefault(code, voice.id)
+    return index
+
+class SpeechService(QObject):
+    """
+    Long-lived text-to-speech service.
+
+    The pyttsx3 engine is created once on a dedicated thread, started by
+    the first speak() (or start()), which also builds the language -> voice
+    index. Utterances are queued and
+    spoken without blocking the GUI; a new utterance interrupts the current
+    one by default. With TTS_AUDIO_CACHE, audio is rendered to a WAV file per
+    (text, voice) and replayed from disk the next time.
+    """
+    voice_missing = pyqtSignal(str)  # language
+    play_file = pyqtSignal(str)  # cached WAV to play on the GUI thread
+    stop_playback = pyqtSignal()
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, rate=SPEECH_RATE, volume=SPEECH_VOLUME,
+                 audio_cache_dir=TTS_AUDIO_CACHE_DIR if TTS_AUDIO_CACHE else None):
+        super().__init__()
+        self.rate = rate
+        self.volume = volume
+        self.audio_cache_dir = audio_cache_dir
+        self.voice_index = {}
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._warned_languages = set()
+
+    def start(self):
+        """Start the speech thread (and create the engine) unless it is running."""
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="SpeechService", daemon=True)
+                self._thread.start()
+
+    def speak(self, text: str, language: str, interrupt: bool = True):
+        """Queue text to be spoken in a language; by default stop what is playing first."""
+        self.start()
+        if interrupt:
+            self._drain()
+            self._queue.put(("stop",))
+        self._queue.put(("say", text, language))
+
+    def stop(self):
+        """Stop speaking and drop queued utterances."""
+        if self._thread is None:
+            return
+        self._drain()
+        self._queue.put(("stop",))
+
+    def shutdown(self, timeout=2.0):
+        if self._thread is None:
+            return
+        self._drain()
+        self._queue.put(("quit",))
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _drain(self):
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _voice_for(self, language):
+        code = LANGUAGE_CODES.get(language, "en")
+        voice_id = self.voice_index.get(code)
+        if voice_id is None and language not in self._warned_languages:
+            self._warned_languages.add(language)
+            self.voice_missing.emit(language)
+        return voice_id
+
+    def _cache_path(self, text, voice_id):
+        digest = hashlib.sha1(f"{voice_id}|{self.rate}|{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.audio_cache_dir, f"{digest}.wav")
+
+    def _run(self):
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+            engine.setProperty('rate', self.rate)
+            engine.setProperty('volume', self.volume)
+            self.voice_index = build_voice_index(engine.getProperty('voices'))
+            default_voice = engine.getProperty('voice')
+            # External event loop: the engine is only ever touched from this thread
+            engine.startLoop(False)
+        except Exception as e:
+            err_msg = f"Text-to-speech is not available: {e}"
+            print(err_msg)
+            # Only bother the user when they actually ask for a pronunciation
+            while True:
+                command = self._queue.get()
+                if command[0] == "quit":
+                    return
+                if command[0] == "say":
+                    self.error_occurred.emit(err_msg)
+
+        pending_save = None  # (partial path, final path) of audio being rendered
+        while True:
+            busy = engine.isBusy()
+            try:
+                command = self._queue.get_nowait() if busy or pending_save else self._queue.get()
+            except queue.Empty:
+                command = None
+
+            try:
+                if command is not None:
+                    if command[0] == "quit":
+                        break
+                    if command[0] == "stop":
+                        engine.stop()
+                        self.stop_playback.emit()
+                        pending_save = None
+                    elif command[0] == "say":
+                        _, text, language = command
+                        voice_id = self._voice_for(language)
+                        engine.setProperty('voice', voice_id or default_voice)
+                        if self.audio_cache_dir is None:
+                            engine.say(text)
+                        else:
+                            path = self._cache_path(text, voice_id or default_voice)
+                            if os.path.exists(path):
+                                self.play_file.emit(path)
+                            else:
+                                os.makedirs(self.audio_cache_dir, exist_ok=True)
+                                pending_save = (path + ".part.wav", path)
+                                engine.save_to_file(text, pending_save[0])
+                engine.iterate()
+                if pending_save is not None and not engine.isBusy() and os.path.exists(pending_save[0]):
+                    os.replace(*pending_save)
+                    self.play_file.emit(pending_save[1])
+                    pending_save = None
+            except Exception as e:
+                err_msg = f"Error during pronunciation: {e}"
+                print(err_msg)
+                traceback.print_exc()
+                self.error_occurred.emit(err_msg)
+                pending_save = None
+            if busy or pending_save:
+                time.sleep(0.01)
+        engine.endLoop()
+
 ###############################################################################
 # VOCABULARY & DATA PERSISTENCE
 ###############################################################################
-VOCAB_DATA_FILE = "vocab_data.json"
+VOCAB_DATA_FILE = "vocab_data.json"  # Legacy store, migrated once into VOCAB_DB_FILE
+VOCAB_DB_FILE = "vocab_data.db"
+FLASHCARD_FIELDS = ("word", "language", "response")
+# Spaced-repetition state kept next to each card (see ReviewScheduler)
+REVIEW_COLUMNS = (
+    ("due", "REAL"),
+    ("interval", "REAL NOT NULL DEFAULT 0"),
+    ("ease", "REAL NOT NULL DEFAULT 2.5"),
+    ("repetitions", "INTEGER NOT NULL DEFAULT 0"),
+    ("lapses", "INTEGER NOT NULL DEFAULT 0"),
+    ("last_review", "REAL")
+)
+# Full-text search over saved cards (see VocabStore.search_flashcards)
+SEARCH_RESULT_LIMIT = 500
+SEARCH_TERM_PATTERN = re.compile(r"\w+")
 
-def load_vocab_data() -> dict:
+def load_vocab_data(path=VOCAB_DATA_FILE) -> dict:
     """Load vocabulary list from JSON."""
-    if not os.path.exists(VOCAB_DATA_FILE):
+    if not os.path.exists(path):
         return {
             "vocab_list": [],
             "favorites": []
         }
     try:
-        with open(VOCAB_DATA_FILE, "r", encoding="utf-8") as f:
+        with open(path, "r", encoding="utf-8") as f:
             return json.load(f)
     except json.JSONDecodeError:
         return {
@@ -79,119 +778,3588 @@ def load_vocab_data() -> dict:
             "favorites": []
         }
 
-def save_vocab_data(data: dict):
-    """Save vocabulary list to JSON."""
-    try:
-        with open(VOCAB_DATA_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print(f"Failed to save vocab data: {e}")
+# Stored responses are compressed with a preset dictionary trained per
+# language, since every answer repeats the same headings and phrasing
+RESPONSE_CODEC = os.environ.get("MUNDILEX_RESPONSE_CODEC", "zlib").lower()  # zlib, zstd or none
+RESPONSE_DICT_SIZE = 32 * 1024  # zlib uses at most 32 KB of a preset dictionary
+RESPONSE_DICT_MIN_SAMPLES = 64  # Cards of a language needed to train its dictionary
+RESPONSE_DICT_MAX_SAMPLES = 500
+RESPONSE_DICT_MAX_WORDS = 8  # Longest run of words a zlib dictionary entry may hold
+RESPONSE_COMPRESSION_LEVEL = 9
+PACKED_RESPONSE = "packed_response"  # In-memory card field: (dictionary id, compressed bytes)
+
+def train_zlib_dictionary(samples, size=RESPONSE_DICT_SIZE) -> bytes:
+    """
+    Build a zlib preset dictionary from sample responses: the runs of words
+    that recur in the most responses, weighted by their length, with the
+    most valuable runs last where zlib reaches them with the shortest
+    distances.
+    """
+    counts = {}
+    for sample in samples:
+        tokens = re.findall(r"\S+\s*", sample)
+        runs = set()
+        for n in range(1, RESPONSE_DICT_MAX_WORDS + 1):
+            for i in range(len(tokens) - n + 1):
+                runs.add("".join(tokens[i:i + n]))
+        for run in runs:
+            counts[run] = counts.get(run, 0) + 1
+    candidates = sorted(
+        ((count * len(run.encode("utf-8")), run) for run, count in counts.items() if count > 1 and len(run) > 3),
+        reverse=True
+    )
+    chosen, joined, total = [], "", 0
+    for _, run in candidates:
+        if total >= size:
+            break
+        if run in joined:
+            continue
+        chosen.append(run)
+        joined += run
+        total += len(run.encode("utf-8"))
+    return "".join(reversed(chosen)).encode("utf-8")[-size:]
+
+class ResponseCodec:
+    """
+    Compresses flashcard responses. Each stored response records the id of
+    the dictionary it was compressed with: None for plain text, 0 for zlib
+    without a dictionary, otherwise a trained dictionary from add(). Ids it
+    has not seen are fetched with loader(id) -> (codec, bytes) or None, since
+    another process sharing the database may have trained them.
+    """
+
+    def __init__(self, codec=RESPONSE_CODEC, loader=None):
+        if codec == "zstd" and importlib.util.find_spec("zstandard") is None:
+            print("zstandard is not installed; compressing responses with zlib")
+            codec = "zlib"
+        self.codec = codec if codec in ("zlib", "zstd", "none") else "zlib"
+        self._dictionaries = {0: ("zlib", b"")}  # id -> (codec, bytes)
+        self._loader = loader
+        self._compressors = {}  # id -> prepared compressor
+        self._decompressors = {}  # id -> prepared decompressor
+        self._lock = threading.Lock()  # zstd (de)compressors are not thread-safe
+
+    def add(self, dictionary_id: int, codec: str, data: bytes):
+        self._dictionaries[dictionary_id] = (codec, data)
+
+    def codec_of(self, dictionary_id: int) -> str:
+        return self._dictionary(dictionary_id)[0]
+
+    def _dictionary(self, dictionary_id: int) -> tuple:
+        dictionary = self._dictionaries.get(dictionary_id)
+        if dictionary is None and self._loader is not None:
+            dictionary = self._loader(dictionary_id)
+            if dictionary is not None:
+                self._dictionaries[dictionary_id] = dictionary
+        if dictionary is None:
+            # Decompressing without the right dictionary would only fail later, less clearly
+            raise LookupError(f"Unknown compression dictionary {dictionary_id}")
+        return dictionary
+
+    def train(self, samples) -> bytes:
+        """Train a dictionary for this codec from sample responses."""
+        if self.codec == "zstd":
+            import zstandard
+            return zstandard.train_dictionary(
+                RESPONSE_DICT_SIZE, [sample.encode("utf-8") for sample in samples]
+            ).as_bytes()
+        return train_zlib_dictionary(samples)
+
+    def compress(self, text: str, dictionary_id):
+        """Return the stored form of text: the text itself if dictionary_id is None."""
+        if dictionary_id is None:
+            return text
+        compressor = self._compressors.get(dictionary_id)
+        if compressor is None:
+            compressor = self._compressors[dictionary_id] = self._prepare(dictionary_id, compress=True)
+        data = text.encode("utf-8")
+        with self._lock:
+            if hasattr(compressor, "copy"):
+                # A zlib compressor already primed with the dictionary
+                compressor = compressor.copy()
+                return compressor.compress(data) + compressor.flush()
+            return compressor.compress(data)
+
+    def decompress(self, value, dictionary_id) -> str:
+        """Inverse of compress."""
+        if dictionary_id is None:
+            return value
+        decompressor = self._decompressors.get(dictionary_id)
+        if decompressor is None:
+            decompressor = self._decompressors[dictionary_id] = self._prepare(dictionary_id, compress=False)
+        with self._lock:
+            if hasattr(decompressor, "copy"):
+                decompressor = decompressor.copy()
+                data = decompressor.decompress(value) + decompressor.flush()
+            else:
+                data = decompressor.decompress(value)
+        return data.decode("utf-8")
+
+    def _prepare(self, dictionary_id, compress):
+        codec, data = self._dictionary(dictionary_id)
+        if codec == "zstd":
+            import zstandard
+            dictionary = zstandard.ZstdCompressionDict(data)
+            if compress:
+                return zstandard.ZstdCompressor(level=RESPONSE_COMPRESSION_LEVEL, dict_data=dictionary)
+            return zstandard.ZstdDecompressor(dict_data=dictionary)
+        # Raw deflate streams: no header or checksum on every card
+        options = {"zdict": data} if data else {}
+        if compress:
+            return zlib.compressobj(RESPONSE_COMPRESSION_LEVEL, zlib.DEFLATED, -15, 9, **options)
+        return zlib.decompressobj(-15, **options)
+
+class VocabStore:
+    """
+    SQLite (WAL mode) storage for flashcards and favorites.
+
+    Every change is written on its own, so saving, favoriting or removing a
+    card costs one small transaction instead of rewriting the whole deck.
+    Flashcard fields other than word/language/response are kept as JSON so
+    imported cards round-trip through export unchanged. Cards are unique by
+    (casefolded word, language), the same key FlashcardIndex uses.
+    Responses are stored compressed (see ResponseCodec).
+    """
+
+    def __init__(self, path=VOCAB_DB_FILE, legacy_json=VOCAB_DATA_FILE, codec=RESPONSE_CODEC):
+        self.path = path
+        self._lock = threading.RLock()  # reentrant: the codec loads dictionaries while it is held
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS flashcards (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                word TEXT NOT NULL,
+                language TEXT NOT NULL,
+                response TEXT NOT NULL DEFAULT '',
+                response_dict INTEGER,
+                extra TEXT,
+                word_key TEXT,
+                due REAL,
+                interval REAL NOT NULL DEFAULT 0,
+                ease REAL NOT NULL DEFAULT 2.5,
+                repetitions INTEGER NOT NULL DEFAULT 0,
+                lapses INTEGER NOT NULL DEFAULT 0,
+                last_review REAL
+            );
+            CREATE TABLE IF NOT EXISTS favorites (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                word TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS response_dictionaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                language TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL
+            );
+        """)
+        plain_responses = self._upgrade_schema()
+        self._conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_flashcards_word_language ON flashcards (word, language);
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_flashcards_key ON flashcards (word_key, language);
+            CREATE INDEX IF NOT EXISTS idx_flashcards_due ON flashcards (due);
+        """)
+        self.codec = ResponseCodec(codec, loader=self._load_dictionary)
+        self._language_dictionaries = {}  # language -> newest dictionary id for self.codec
+        self._untrained = {}  # language -> cards stored before it had a dictionary
+        for dictionary_id, language, codec, data in self._conn.execute(
+            "SELECT id, language, codec, data FROM response_dictionaries ORDER BY id"
+        ):
+            self.codec.add(dictionary_id, codec, data)
+            if codec == self.codec.codec:
+                self._language_dictionaries[language] = dictionary_id
+        self.full_text = self._create_search_index()
+        self._conn.commit()
+        if plain_responses:
+            self.compress_responses()
+        if legacy_json:
+            self.migrate_from_json(legacy_json)
+
+    def _upgrade_schema(self) -> bool:
+        """
+        Add the columns introduced after the first release to older databases.
+        Returns True if the database still holds uncompressed responses.
+        """
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(flashcards)")]
+        for name, declaration in REVIEW_COLUMNS:
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE flashcards ADD COLUMN {name} {declaration}")
+        plain_responses = "response_dict" not in columns
+        if plain_responses:
+            # NULL marks a response stored as plain text
+            self._conn.execute("ALTER TABLE flashcards ADD COLUMN response_dict INTEGER")
+        if "word_key" in columns:
+            self._conn.commit()
+            return plain_responses
+        self._conn.execute("ALTER TABLE flashcards ADD COLUMN word_key TEXT")
+        rows = self._conn.execute("SELECT id, word FROM flashcards").fetchall()
+        self._conn.executemany(
+            "UPDATE flashcards SET word_key = ? WHERE id = ?",
+            ((word.strip().casefold(), card_id) for card_id, word in rows)
+        )
+        # Keep the oldest card of entries that only differed in case
+        self._conn.execute(
+            "DELETE FROM flashcards WHERE id NOT IN "
+            "(SELECT MIN(id) FROM flashcards GROUP BY word_key, language)"
+        )
+        # The old index was unique on the exact word; the key index replaces that
+        self._conn.execute("DROP INDEX IF EXISTS idx_flashcards_word_language")
+        self._conn.commit()
+        return plain_responses
+
+    def _create_search_index(self) -> bool:
+        """
+        Create the FTS5 index over word and response. It keeps no copy of the
+        text, since responses are stored compressed; add_flashcards and
+        remove_flashcards keep it in sync. Returns False if this SQLite build
+        has no FTS5, in which case search falls back to plain scans.
+        """
+        row = self._conn.execute("SELECT sql FROM sqlite_master WHERE name = 'flashcards_fts'").fetchone()
+        if row and "content=''" not in row[0]:
+            # Earlier versions indexed the plain-text column through triggers
+            self._conn.executescript("""
+                DROP TRIGGER IF EXISTS flashcards_fts_insert;
+                DROP TRIGGER IF EXISTS flashcards_fts_delete;
+                DROP TRIGGER IF EXISTS flashcards_fts_update;
+                DROP TABLE flashcards_fts;
+            """)
+            row = None
+        try:
+            self._conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS flashcards_fts USING fts5(
+                    word, response, content='',
+                    tokenize='unicode61 remove_diacritics 2', prefix='1 2 3 4'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable, falling back to plain scans: {e}")
+            return False
+        if row is None:
+            # Index the cards saved before the index existed
+            last_id = 0
+            while True:
+                rows = self._conn.execute(
+                    "SELECT id, word, response, response_dict FROM flashcards WHERE id > ? ORDER BY id LIMIT 1000",
+                    (last_id,)
+                ).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                self._conn.executemany(
+                    "INSERT INTO flashcards_fts (rowid, word, response) VALUES (?, ?, ?)",
+                    ((card_id, word, self.codec.decompress(response, dictionary_id))
+                     for card_id, word, response, dictionary_id in rows)
+                )
+        return True
+
+    @staticmethod
+    def search_terms(query: str) -> list:
+        """Split a search box query into the terms search_flashcards matches."""
+        return SEARCH_TERM_PATTERN.findall(query)
+
+    def search_flashcards(self, query: str, limit=SEARCH_RESULT_LIMIT) -> list:
+        """
+        Return (word, language) of up to limit cards containing every term
+        of query as a word prefix, cards matching on the word itself first.
+        Matching ignores case and diacritics.
+        """
+        terms = self.search_terms(query)
+        if not terms:
+            return []
+        if not self.full_text:
+            return self._scan_flashcards(terms, limit)
+        expression = " AND ".join('"{}"*'.format(term) for term in terms)
+        results, seen = [], set()
+        with metrics.span("flashcard_search"), self._lock:
+            # Word matches first, then the cards that only match in the response
+            for match in (f"word : ({expression})", expression):
+                if len(results) >= limit:
+                    break
+                rows = self._conn.execute(
+                    "SELECT f.id, f.word, f.language FROM flashcards_fts "
+                    "JOIN flashcards f ON f.id = flashcards_fts.rowid "
+                    "WHERE flashcards_fts MATCH ? LIMIT ?",
+                    (match, limit)
+                ).fetchall()
+                for card_id, word, language in rows:
+                    if card_id not in seen and len(results) < limit:
+                        seen.add(card_id)
+                        results.append((word, language))
+        return results
+
+    def _scan_flashcards(self, terms, limit) -> list:
+        """search_flashcards without FTS5: substring matches, in insertion order."""
+        terms = [term.casefold() for term in terms]
+        results = []
+        for flashcard in self.iter_flashcards():
+            text = f"{flashcard['word']} {flashcard['response']}".casefold()
+            if all(term in text for term in terms):
+                results.append((flashcard["word"], flashcard["language"]))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _row(self, flashcard: dict) -> tuple:
+        extra = {k: v for k, v in flashcard.items() if k not in FLASHCARD_FIELDS and k != PACKED_RESPONSE}
+        language = flashcard.get("language", "")
+        packed = flashcard.get(PACKED_RESPONSE)
+        if packed is None:
+            dictionary_id = self._dictionary_id(language)
+            packed = (self.codec.compress(flashcard.get("response", ""), dictionary_id), dictionary_id)
+        return (
+            flashcard["word"],
+            language,
+            packed[0],
+            packed[1],
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+            flashcard["word"].strip().casefold()
+        )
+
+    def _card(self, row, packed=False) -> dict:
+        """
+        Build a flashcard from (word, language, response, response_dict,
+        extra). With packed=True a compressed response stays compressed
+        until response_text() is called for it.
+        """
+        word, language, response, dictionary_id, extra = row
+        flashcard = {"word": word, "language": language}
+        if packed and dictionary_id is not None:
+            flashcard[PACKED_RESPONSE] = (response, dictionary_id)
+        else:
+            flashcard["response"] = self.codec.decompress(response, dictionary_id)
+        if extra:
+            flashcard.update(json.loads(extra))
+        return flashcard
+
+    def response_text(self, flashcard: dict, default="") -> str:
+        """Return a flashcard's response, decompressing it if the card holds it packed."""
+        packed = flashcard.get(PACKED_RESPONSE)
+        if packed is not None:
+            return self.codec.decompress(*packed)
+        return flashcard.get("response", default)
+
+    def _dictionary_id(self, language: str):
+        """Dictionary new responses of a language are compressed with (None stores plain text)."""
+        if self.codec.codec == "none":
+            return None
+        return self._language_dictionaries.get(language, 0)
+
+    def _load_dictionary(self, dictionary_id: int):
+        """Fetch a dictionary this store has not loaded yet, e.g. one another process trained."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT language, codec, data FROM response_dictionaries WHERE id = ?", (dictionary_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        language, codec, data = row
+        if codec == self.codec.codec and dictionary_id > self._language_dictionaries.get(language, 0):
+            self._language_dictionaries[language] = dictionary_id
+        return codec, data
+
+    def train_dictionary(self, language: str) -> bool:
+        """
+        Train a compression dictionary from a sample of a language's cards and
+        recompress all of them with it. Returns False if the language has too
+        few cards yet; they are then compressed without a dictionary.
+
+        Runs as one write transaction, so a process sharing the database never
+        sees a card whose dictionary is not committed yet. If another process
+        trained the language first, its dictionary is used instead.
+        """
+        self._untrained.pop(language, None)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                trained = self._train_dictionary(language)
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return trained
+
+    def _train_dictionary(self, language: str) -> bool:
+        row = self._conn.execute(
+            "SELECT id, data FROM response_dictionaries WHERE language = ? AND codec = ? ORDER BY id DESC LIMIT 1",
+            (language, self.codec.codec)
+        ).fetchone()
+        if row is not None:
+            dictionary_id, data = row
+            self.codec.add(dictionary_id, self.codec.codec, data)
+            self._language_dictionaries[language] = dictionary_id
+            self._recompress(language, dictionary_id)
+            return True
+        rows = self._conn.execute(
+            "SELECT response, response_dict FROM flashcards WHERE language = ? ORDER BY RANDOM() LIMIT ?",
+            (language, RESPONSE_DICT_MAX_SAMPLES)
+        ).fetchall()
+        if len(rows) < RESPONSE_DICT_MIN_SAMPLES:
+            self._recompress(language, 0)
+            return False
+        samples = [self.codec.decompress(response, dictionary_id) for response, dictionary_id in rows]
+        try:
+            data = self.codec.train(samples)
+        except Exception as e:
+            print(f"Could not train a compression dictionary for {language}: {e}")
+            return False
+        cursor = self._conn.execute(
+            "INSERT INTO response_dictionaries (language, codec, data) VALUES (?, ?, ?)",
+            (language, self.codec.codec, data)
+        )
+        self.codec.add(cursor.lastrowid, self.codec.codec, data)
+        self._language_dictionaries[language] = cursor.lastrowid
+        self._recompress(language, cursor.lastrowid)
+        return True
+
+    def _recompress(self, language: str, dictionary_id, batch_size=1000):
+        """Store every response of a language compressed with dictionary_id. The caller commits."""
+        last_id = 0
+        while True:
+            rows = self._conn.execute(
+                "SELECT id, response, response_dict FROM flashcards WHERE language = ? AND id > ? "
+                "ORDER BY id LIMIT ?",
+                (language, last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            self._conn.executemany(
+                "UPDATE flashcards SET response = ?, response_dict = ? WHERE id = ?",
+                (
+                    (self.codec.compress(self.codec.decompress(response, old_id), dictionary_id), dictionary_id, card_id)
+                    for card_id, response, old_id in rows if old_id != dictionary_id
+                )
+            )
+
+    def compress_responses(self):
+        """Compress the responses a database stored before compression was introduced."""
+        if self.codec.codec == "none":
+            return
+        with self._lock:
+            languages = [row[0] for row in self._conn.execute(
+                "SELECT DISTINCT language FROM flashcards WHERE response_dict IS NULL"
+            )]
+        for language in languages:
+            self.train_dictionary(language)
+        if languages:
+            print(f"Compressed the stored responses of {', '.join(languages)}")
+
+    def migrate_from_json(self, path: str) -> bool:
+        """Import a legacy vocab_data.json once. Returns True if a migration ran."""
+        with self._lock:
+            done = self._conn.execute("SELECT value FROM meta WHERE key = 'migrated_from_json'").fetchone()
+        if done or not os.path.exists(path):
+            return False
+        data = load_vocab_data(path)
+        added = len(self.add_flashcards(data.get("vocab_list", [])))
+        for word in data.get("favorites", []):
+            self.add_favorite(word)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated_from_json', ?)", (path,))
+            self._conn.commit()
+        print(f"Migrated {added} flashcards from {path} to {self.path}")
+        return True
+
+    def load_flashcards(self) -> list:
+        """
+        Return every flashcard in insertion order, with responses left
+        compressed (see response_text) so a large deck stays small in memory.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT word, language, response, response_dict, extra FROM flashcards ORDER BY id"
+            ).fetchall()
+        return [self._card(row, packed=True) for row in rows]
+
+    def load_favorites(self) -> list:
+        """Return every favorite word in insertion order."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT word FROM favorites ORDER BY id")]
+
+    def iter_flashcards(self, batch_size=1000):
+        """
+        Yield every flashcard in insertion order, reading batch_size rows at a
+        time so exports of huge decks run in constant memory.
+        """
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, word, language, response, response_dict, extra FROM flashcards "
+                    "WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for row in rows:
+                yield self._card(row[1:])
+
+    def load_review_states(self) -> list:
+        """Return (word_key, language, ReviewState) for every card in insertion order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT word_key, language, due, interval, ease, repetitions, lapses, last_review "
+                "FROM flashcards ORDER BY id"
+            ).fetchall()
+        return [(row[0], row[1], ReviewState(*row[2:])) for row in rows]
+
+    def update_reviews(self, states):
+        """Persist review states given as ((word_key, language), ReviewState) pairs in one transaction."""
+        with metrics.span("persistence"), self._lock:
+            self._conn.executemany(
+                "UPDATE flashcards SET due = ?, interval = ?, ease = ?, repetitions = ?, lapses = ?, last_review = ? "
+                "WHERE word_key = ? AND language = ?",
+                (
+                    (st.due, st.interval, st.ease, st.repetitions, st.lapses, st.last_review, key[0], key[1])
+                    for key, st in states
+                )
+            )
+            self._conn.commit()
+
+    def count_flashcards(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM flashcards").fetchone()[0]
+
+    def add_flashcard(self, flashcard: dict) -> bool:
+        """Insert a flashcard. Returns False if (word, language) already exists."""
+        return bool(self.add_flashcards([flashcard]))
+
+    def add_flashcards(self, flashcards) -> list:
+        """Insert several flashcards in one transaction and return the ones that were new."""
+        added = []
+        with metrics.span("persistence"), self._lock:
+            for flashcard in flashcards:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO flashcards (word, language, response, response_dict, extra, word_key) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    self._row(flashcard)
+                )
+                if cursor.rowcount:
+                    added.append(flashcard)
+                    if self.full_text:
+                        self._conn.execute(
+                            "INSERT INTO flashcards_fts (rowid, word, response) VALUES (?, ?, ?)",
+                            (cursor.lastrowid, flashcard["word"], self.response_text(flashcard))
+                        )
+            self._conn.commit()
+        self._train_when_ready(added)
+        return added
+
+    def _train_when_ready(self, added):
+        """Train a language's dictionary once enough of its cards have been stored."""
+        if self.codec.codec == "none":
+            return
+        counts = {}
+        for flashcard in added:
+            language = flashcard.get("language", "")
+            counts[language] = counts.get(language, 0) + 1
+        for language, count in counts.items():
+            if language in self._language_dictionaries:
+                continue
+            if language in self._untrained:
+                self._untrained[language] += count
+            else:
+                # Counted once, when the first new card of the language arrives
+                with self._lock:
+                    self._untrained[language] = self._conn.execute(
+                        "SELECT COUNT(*) FROM flashcards WHERE language = ?", (language,)
+                    ).fetchone()[0]
+            if self._untrained[language] >= RESPONSE_DICT_MIN_SAMPLES:
+                self.train_dictionary(language)
+
+    def remove_flashcards(self, word: str, language=None) -> int:
+        """Remove the flashcards of a word (in one language, or all). Returns the count."""
+        with metrics.span("persistence"), self._lock:
+            if language is None:
+                rows = self._conn.execute(
+                    "SELECT id, word, response, response_dict FROM flashcards WHERE word = ?", (word,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT id, word, response, response_dict FROM flashcards WHERE word = ? AND language = ?",
+                    (word, language)
+                ).fetchall()
+            if self.full_text:
+                # The index keeps no text, so it is told what to forget
+                self._conn.executemany(
+                    "INSERT INTO flashcards_fts (flashcards_fts, rowid, word, response) VALUES ('delete', ?, ?, ?)",
+                    ((card_id, word, self.codec.decompress(response, dictionary_id))
+                     for card_id, word, response, dictionary_id in rows)
+                )
+            self._conn.executemany("DELETE FROM flashcards WHERE id = ?", ((row[0],) for row in rows))
+            self._conn.commit()
+            return len(rows)
+
+    def add_favorite(self, word: str):
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO favorites (word) VALUES (?)", (word,))
+            self._conn.commit()
+
+    def remove_favorite(self, word: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM favorites WHERE word = ?", (word,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class FlashcardIndex:
+    """
+    In-memory flashcard index keyed by (casefolded word, language).
+
+    Keeps insertion order, so it doubles as the ordered deck, while duplicate
+    checks, lookups and removals are O(1).
+    """
+
+    def __init__(self, flashcards=()):
+        self._cards = {}
+        for flashcard in flashcards:
+            self.add(flashcard)
+
+    @staticmethod
+    def key(word: str, language: str) -> tuple:
+        return (word.strip().casefold(), language)
+
+    def add(self, flashcard: dict) -> bool:
+        """Add a flashcard. Returns False if an entry with the same key exists."""
+        key = self.key(flashcard["word"], flashcard.get("language", ""))
+        if key in self._cards:
+            return False
+        self._cards[key] = flashcard
+        return True
+
+    def get(self, word: str, language: str):
+        return self._cards.get(self.key(word, language))
+
+    def remove(self, word: str, language: str):
+        """Remove and return the flashcard for (word, language), or None."""
+        return self._cards.pop(self.key(word, language), None)
+
+    def cards(self) -> list:
+        return list(self._cards.values())
+
+    def __contains__(self, key) -> bool:
+        word, language = key
+        return self.key(word, language) in self._cards
+
+    def __iter__(self):
+        return iter(self._cards.values())
+
+    def __len__(self) -> int:
+        return len(self._cards)
+
+def flashcard_label(flashcard: dict) -> str:
+    """Text shown for a flashcard in the saved flashcards list."""
+    return f"{flashcard['word']} - {flashcard['language']}"
+
+###############################################################################
+# SPACED REPETITION
+###############################################################################
+# SM-2 grades: 0-2 means the card was forgotten, 3-5 remembered with
+# decreasing effort. The review buttons map to these values.
+GRADE_AGAIN, GRADE_HARD, GRADE_GOOD, GRADE_EASY = 1, 3, 4, 5
+DAY = 24 * 3600  # Seconds
+RELEARN_DELAY = 10 * 60  # A forgotten card comes back after ten minutes
+RESCHEDULE_SPREAD_DAYS = 7
+
+class ReviewState:
+    """SM-2 review state of one card. due is None for cards never reviewed."""
+    __slots__ = ("due", "interval", "ease", "repetitions", "lapses", "last_review")
+
+    def __init__(self, due=None, interval=0.0, ease=2.5, repetitions=0, lapses=0, last_review=None):
+        self.due = due
+        self.interval = interval  # Days
+        self.ease = ease
+        self.repetitions = repetitions
+        self.lapses = lapses
+        self.last_review = last_review
+
+    def sort_due(self) -> float:
+        # New cards sort before everything else, in the order they were added
+        return 0.0 if self.due is None else self.due
+
+class ReviewScheduler:
+    """
+    SM-2 scheduler with a min-heap of due dates.
+
+    Picking the next due card and recording a grade are O(log n). Grading or
+    removing a card leaves its old heap entry behind; stale entries are
+    recognised by their sequence number and skipped when they surface.
+    """
+
+    def __init__(self, states=()):
+        self._states = {}
+        self._seq = {}
+        self._counter = 0
+        self._heap = []
+        for word_key, language, state in states:
+            key = (word_key, language)
+            self._states[key] = state
+            self._counter += 1
+            self._seq[key] = self._counter
+            self._heap.append((state.sort_due(), self._counter, key))
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._states)
+
+    def _push(self, key, state):
+        self._counter += 1
+        self._seq[key] = self._counter
+        heapq.heappush(self._heap, (state.sort_due(), self._counter, key))
+        # Rebuild when stale entries dominate, keeping the heap O(n)
+        if len(self._heap) > 2 * len(self._states) + 64:
+            self._rebuild()
+
+    def _rebuild(self):
+        self._heap = [(self._states[key].sort_due(), seq, key) for key, seq in self._seq.items()]
+        heapq.heapify(self._heap)
+
+    def _clean_top(self):
+        while self._heap and self._seq.get(self._heap[0][2]) != self._heap[0][1]:
+            heapq.heappop(self._heap)
+
+    def add(self, key, state=None):
+        """Schedule a new card (due immediately unless a state is given)."""
+        if key in self._states:
+            return
+        state = state if state is not None else ReviewState()
+        self._states[key] = state
+        self._push(key, state)
+
+    def remove(self, key):
+        self._states.pop(key, None)
+        self._seq.pop(key, None)
+
+    def state(self, key):
+        return self._states.get(key)
+
+    def next_due(self, skip=None):
+        """
+        Return the key of the card due soonest, or None for an empty deck.
+        With skip, the soonest card other than that key is returned.
+        """
+        self._clean_top()
+        if not self._heap:
+            return None
+        if self._heap[0][2] != skip:
+            return self._heap[0][2]
+        top = heapq.heappop(self._heap)
+        self._clean_top()
+        result = self._heap[0][2] if self._heap else None
+        heapq.heappush(self._heap, top)
+        return result
+
+    def count_due(self, now=None) -> int:
+        """Number of cards due at now. O(n); meant for occasional display."""
+        now = time.time() if now is None else now
+        return sum(1 for state in self._states.values() if state.sort_due() <= now)
+
+    def grade(self, key, quality: int, now=None):
+        """Apply an SM-2 grade (0-5) to a card and return its new state."""
+        state = self._states.get(key)
+        if state is None:
+            return None
+        now = time.time() if now is None else now
+        if quality < 3:
+            state.repetitions = 0
+            state.lapses += 1
+            state.interval = 0.0
+            state.due = now + RELEARN_DELAY
+        else:
+            state.repetitions += 1
+            if state.repetitions == 1:
+                state.interval = 1.0
+            elif state.repetitions == 2:
+                state.interval = 6.0
+            else:
+                state.interval = round(state.interval * state.ease, 2)
+            state.due = now + state.interval * DAY
+        state.ease = max(1.3, state.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        state.last_review = now
+        self._push(key, state)
+        return state
+
+    def reschedule_all(self, now=None, spread_days=RESCHEDULE_SPREAD_DAYS) -> list:
+        """
+        Spread every overdue reviewed card evenly over the next spread_days,
+        most overdue first, e.g. after a break. Returns the changed
+        (key, state) pairs. O(n log n) for the whole deck.
+        """
+        now = time.time() if now is None else now
+        overdue = sorted(
+            ((state.due, key) for key, state in self._states.items()
+             if state.due is not None and state.due < now),
+        )
+        changed = []
+        step = spread_days * DAY / max(len(overdue), 1)
+        for i, (_, key) in enumerate(overdue):
+            state = self._states[key]
+            state.due = now + i * step
+            changed.append((key, state))
+        # Fresh sequence numbers in deck order keep new cards first-in, first-out
+        self._seq = {}
+        for key in self._states:
+            self._counter += 1
+            self._seq[key] = self._counter
+        self._rebuild()
+        return changed
+
+###############################################################################
+# LIST MODELS
+###############################################################################
+LIST_FETCH_BATCH = 500  # Rows handed to the view per fetchMore()
+
+class LazyListModel(QAbstractListModel):
+    """
+    List model for the saved flashcards and favorites views.
+
+    Rows are exposed to the view in batches through canFetchMore/fetchMore,
+    so opening a huge deck only materializes what is scrolled into view, and
+    single inserts/removals are reported incrementally instead of rebuilding
+    the whole list.
+    """
+
+    def __init__(self, label=str, batch_size=LIST_FETCH_BATCH, parent=None):
+        super().__init__(parent)
+        self._label = label
+        self._batch_size = batch_size
+        self._items = []
+        self._loaded = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self._loaded:
+            return None
+        if role == Qt.DisplayRole:
+            return self._label(self._items[index.row()])
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._items)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(self._batch_size, len(self._items) - self._loaded)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def set_items(self, items):
+        """Replace all items; only the first batch is exposed right away."""
+        self.beginResetModel()
+        self._items = list(items)
+        self._loaded = min(self._batch_size, len(self._items))
+        self.endResetModel()
+
+    def extend(self, items):
+        """Append items, notifying the view only if it has already fetched every row."""
+        items = list(items)
+        if not items:
+            return
+        fully_loaded = self._loaded == len(self._items)
+        if fully_loaded:
+            self.beginInsertRows(QModelIndex(), len(self._items), len(self._items) + len(items) - 1)
+        self._items.extend(items)
+        if fully_loaded:
+            self._loaded = len(self._items)
+            self.endInsertRows()
+
+    def append(self, item):
+        self.extend([item])
+
+    def item(self, row):
+        return self._items[row]
+
+    def remove_rows(self, rows):
+        """Remove the given rows (any order) with one notification per row."""
+        for row in sorted(set(rows), reverse=True):
+            if row < self._loaded:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self._items[row]
+                self._loaded -= 1
+                self.endRemoveRows()
+            else:
+                del self._items[row]
+
+    def remove_item(self, item):
+        """Remove the first row holding item, if any."""
+        try:
+            self.remove_rows([self._items.index(item)])
+        except ValueError:
+            pass
+
+###############################################################################
+# STREAMING IMPORT / EXPORT
+###############################################################################
+# Files ending in .jsonl hold one flashcard object per line; anything else is
+# the {"vocab_list": [...], "favorites": [...]} JSON document. Both are read
+# and written one card at a time, so memory use does not grow with file size.
+TRANSFER_BATCH_SIZE = 1000  # Cards committed to the store per transaction
+
+def is_jsonl_file(path: str) -> bool:
+    return path.lower().endswith((".jsonl", ".ndjson"))
+
+class JsonStreamReader:
+    """Incremental reader for one large JSON document, decoding a value at a time."""
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.chars_read = 0
+        self._decoder = json.JSONDecoder()
+
+    def _read_more(self) -> bool:
+        chunk = self.f.read(self.CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.chars_read += len(chunk)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at end of file)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_more():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' but found '{found or 'end of file'}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+                # A value that ends exactly at the buffer end may be a truncated number
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read_more()
+
+    def iter_array(self):
+        """Yield the elements of the array starting at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' but found '{separator or 'end of file'}'")
+
+def iter_flashcards_from_file(f, jsonl=False):
+    """
+    Yield (flashcard, characters read so far) from an open JSON or JSON Lines
+    flashcard file. Favorites in JSON documents are skipped, as before.
+    """
+    if jsonl:
+        chars_read = 0
+        for line in f:
+            chars_read += len(line)
+            line = line.strip()
+            if line:
+                yield json.loads(line), chars_read
+        return
+
+    reader = JsonStreamReader(f)
+    start = reader.peek()
+    if start == "[":
+        # A bare list of flashcards
+        for flashcard in reader.iter_array():
+            yield flashcard, reader.chars_read
+        return
+    reader.expect("{")
+    while reader.peek() != "}":
+        key = reader.value()
+        reader.expect(":")
+        if key == "vocab_list" and reader.peek() == "[":
+            for flashcard in reader.iter_array():
+                yield flashcard, reader.chars_read
+        else:
+            reader.value()
+        if reader.peek() == ",":
+            reader.pos += 1
+
+def write_flashcards_to_file(f, flashcards, favorites=(), jsonl=False):
+    """
+    Write flashcards (any iterable) as JSON Lines or as a JSON document.
+    Yields the number of cards written so far.
+    """
+    written = 0
+    if jsonl:
+        for flashcard in flashcards:
+            f.write(json.dumps(flashcard, ensure_ascii=False))
+            f.write("\n")
+            written += 1
+            yield written
+        return
+
+    f.write('{\n  "vocab_list": [')
+    for flashcard in flashcards:
+        f.write(",\n    " if written else "\n    ")
+        f.write(json.dumps(flashcard, ensure_ascii=False))
+        written += 1
+        yield written
+    f.write("\n  ],\n  \"favorites\": ")
+    f.write(json.dumps(list(favorites), ensure_ascii=False))
+    f.write("\n}\n")
+
+class FlashcardImportWorker(QObject):
+    """Streams a flashcard file into the store in batches on a background thread."""
+    progress = pyqtSignal(int)  # percent
+    batch_imported = pyqtSignal(list)  # flashcards that were new
+    finished = pyqtSignal(int, bool)  # new flashcards, cancelled
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, store, path, default_language, batch_size=TRANSFER_BATCH_SIZE):
+        super().__init__()
+        self.store = store
+        self.path = path
+        self.default_language = default_language
+        self.batch_size = batch_size
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def _commit(self, batch):
+        added = self.store.add_flashcards(batch)
+        if added:
+            self.batch_imported.emit(added)
+        return len(added)
+
+    def run(self):
+        imported = 0
+        try:
+            size = max(os.path.getsize(self.path), 1)
+            batch = []
+            with open(self.path, "r", encoding="utf-8") as f:
+                for flashcard, chars_read in iter_flashcards_from_file(f, is_jsonl_file(self.path)):
+                    if self._cancelled:
+                        break
+                    if not isinstance(flashcard, dict) or not isinstance(flashcard.get("word"), str):
+                        continue
+                    flashcard.setdefault("language", self.default_language)
+                    flashcard.setdefault("response", "")
+                    batch.append(flashcard)
+                    if len(batch) >= self.batch_size:
+                        imported += self._commit(batch)
+                        batch = []
+                        self.progress.emit(min(99, chars_read * 100 // size))
+            if batch and not self._cancelled:
+                imported += self._commit(batch)
+            self.progress.emit(100)
+        except Exception as e:
+            err_msg = f"Failed to import flashcards: {e}"
+            print(err_msg)
+            traceback.print_exc()
+            self.error_occurred.emit(err_msg)
+        self.finished.emit(imported, self._cancelled)
+
+class FlashcardExportWorker(QObject):
+    """Streams the store to a flashcard file on a background thread."""
+    progress = pyqtSignal(int)  # percent
+    finished = pyqtSignal(int, bool)  # exported flashcards, cancelled
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, store, path):
+        super().__init__()
+        self.store = store
+        self.path = path
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        exported = 0
+        # Write next to the target and rename at the end, so a cancelled or
+        # failed export never leaves a truncated file behind
+        partial_path = self.path + ".part"
+        try:
+            total = max(self.store.count_flashcards(), 1)
+            with open(partial_path, "w", encoding="utf-8") as f:
+                cards = self.store.iter_flashcards()
+                favorites = self.store.load_favorites()
+                for exported in write_flashcards_to_file(f, cards, favorites, is_jsonl_file(self.path)):
+                    if self._cancelled:
+                        break
+                    if exported % TRANSFER_BATCH_SIZE == 0:
+                        self.progress.emit(min(99, exported * 100 // total))
+            if self._cancelled:
+                os.remove(partial_path)
+            else:
+                os.replace(partial_path, self.path)
+                self.progress.emit(100)
+        except Exception as e:
+            err_msg = f"Failed to export flashcards: {e}"
+            print(err_msg)
+            traceback.print_exc()
+            self.error_occurred.emit(err_msg)
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        self.finished.emit(exported, self._cancelled)
+
+###############################################################################
+# WORD NORMALIZATION
+###############################################################################
+# A word is a run of Unicode letters (any script), optionally joined by an
+# apostrophe or hyphen: "Häuser", "дом", "aujourd'hui", "e-mail".
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:['’\-][^\W\d_]+)*")
+# "auto" lemmatizes with simplemma when it is installed, "none" never does
+LEMMATIZERS = ("auto", "simplemma", "none")
+LEMMATIZER = os.environ.get("MUNDILEX_LEMMATIZER", "auto")
+# Combining accents that only mark stress, per language code
+STRESS_MARKS = {
+    "ru": {"\u0301", "\u0300"}
+}
+# Letters folded together in lookup keys, per language code
+KEY_FOLDS = {
+    "ru": str.maketrans("ё", "е")
+}
+
+def tokenize(text: str) -> list:
+    """Split text into word tokens (letters of any script)."""
+    return WORD_PATTERN.findall(unicodedata.normalize("NFC", text))
+
+class WordNormalizer:
+    """
+    Maps every copied form of a word to one canonical form per language.
+
+    clean() applies Unicode NFC, strips surrounding punctuation and stress
+    marks; lemma() also reduces inflected forms with an optional offline
+    lemmatizer ("Häuser" -> "Haus"); key() casefolds the lemma into the key
+    used by the definition cache and request coalescing.
+    """
+
+    def __init__(self, lemmatizer=LEMMATIZER, max_cached=50000):
+        if lemmatizer not in LEMMATIZERS:
+            print(f"Unknown lemmatizer '{lemmatizer}', falling back to 'auto'.")
+            lemmatizer = "auto"
+        self.lemmatizer = lemmatizer
+        self.max_cached = max_cached
+        self._simplemma = None
+        self._lemmas = {}
+        self._lock = threading.Lock()
+
+    def _load_lemmatizer(self):
+        """Import simplemma on first use. Returns None when lemmatization is off or unavailable."""
+        if self.lemmatizer == "none":
+            return None
+        if self._simplemma is None:
+            try:
+                import simplemma
+                self._simplemma = simplemma
+            except ImportError:
+                if self.lemmatizer == "simplemma":
+                    print("simplemma package not found. Please install it using 'pip install simplemma'.")
+                self.lemmatizer = "none"
+                return None
+        return self._simplemma
+
+    def clean(self, text: str, language: str) -> str:
+        """Return text in NFC without surrounding punctuation or stress marks."""
+        text = unicodedata.normalize("NFC", text.strip())
+        start, end = 0, len(text)
+        while start < end and not text[start].isalnum():
+            start += 1
+        while end > start and not text[end - 1].isalnum():
+            end -= 1
+        text = text[start:end]
+        marks = STRESS_MARKS.get(LANGUAGE_CODES.get(language))
+        if marks:
+            text = unicodedata.normalize("NFC", "".join(
+                ch for ch in unicodedata.normalize("NFD", text) if ch not in marks
+            ))
+        return text
+
+    def lemma(self, word: str, language: str) -> str:
+        """Return the dictionary form of a word, or the cleaned word without a lemmatizer."""
+        word = self.clean(word, language)
+        simplemma = self._load_lemmatizer()
+        if simplemma is None or not word:
+            return word
+        code = LANGUAGE_CODES.get(language, "en")
+        with self._lock:
+            cached = self._lemmas.get((word, code))
+        if cached is not None:
+            return cached
+        # All-caps text (headlines, subtitles) lemmatizes badly; German keeps noun capitals
+        form = word
+        if word.isupper() and len(word) > 1:
+            form = word.capitalize() if code == "de" else word.lower()
+        try:
+            lemma = simplemma.lemmatize(form, lang=code)
+        except Exception as e:
+            print(f"Failed to lemmatize '{word}' ({language}): {e}")
+            lemma = form
+        with self._lock:
+            if len(self._lemmas) >= self.max_cached:
+                self._lemmas.clear()
+            self._lemmas[(word, code)] = lemma
+        return lemma
+
+    def fold(self, word: str, language: str) -> str:
+        """Return the cleaned, casefolded form of a word without lemmatizing it."""
+        key = self.clean(word, language).casefold()
+        folds = KEY_FOLDS.get(LANGUAGE_CODES.get(language))
+        return key.translate(folds) if folds else key
+
+    def key(self, word: str, language: str) -> str:
+        """Return the canonical lookup key of a word."""
+        return self.fold(self.lemma(word, language), language)
+
+    def warm(self, language: str):
+        """Load the lemmatizer data for a language ahead of the first lookup."""
+        self.lemma("a", language)
+
+word_normalizer = WordNormalizer()
+
+###############################################################################
+# DEFINITION CACHE
+###############################################################################
+DEFINITION_CACHE_FILE = "definition_cache.db"
+DEFINITION_CACHE_MAX_ENTRIES = 20000
+DEFINITION_CACHE_MAX_AGE = 90 * 24 * 3600  # Seconds
+DEFINITION_CACHE_TOUCH_INTERVAL = 30  # Seconds between writes of access times
+
+class DefinitionCache:
+    """
+    Persistent SQLite cache of fetched definitions.
+
+    Entries are keyed by (normalized word, language, model, prompt version) so a
+    model or prompt change never serves stale answers. Entries older than
+    max_age are misses (served only with allow_stale, while Groq is down),
+    and the least recently used entries are evicted once the cache grows
+    past max_entries.
+    """
+
+    def __init__(self, path=DEFINITION_CACHE_FILE, max_entries=DEFINITION_CACHE_MAX_ENTRIES,
+                 max_age=DEFINITION_CACHE_MAX_AGE, model=GROQ_MODEL, prompt_version=PROMPT_VERSION):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.model = model
+        self.prompt_version = prompt_version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Access times of hits, written in batches so a hit costs no write
+        self._touched = {}
+        self._last_touch_write = time.monotonic()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets the window and the lookup daemon share the file
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS definitions (
+                word TEXT NOT NULL,
+                language TEXT NOT NULL,
+                model TEXT NOT NULL,
+                prompt_version INTEGER NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (word, language, model, prompt_version)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_definitions_accessed ON definitions (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def normalize(word: str, language: str) -> str:
+        """Return the cache key form of a word (see WordNormalizer.key)."""
+        return word_normalizer.key(word, language)
+
+    def _key(self, word, language):
+        return (self.normalize(word, language), language, self.model, self.prompt_version)
+
+    def get(self, word: str, language: str, allow_stale=False):
+        """
+        Return the cached response for a word, or None on a miss. Expired
+        entries count as misses but are kept until replaced or evicted, so
+        allow_stale can still serve them while the API is unavailable.
+        """
+        key = self._key(word, language)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM definitions "
+                "WHERE word = ? AND language = ? AND model = ? AND prompt_version = ?",
+                key
+            ).fetchone()
+            if row is None or (now - row[1] > self.max_age and not allow_stale):
+                self.misses += 1
+                return None
+            self._touched[key] = now
+            if time.monotonic() - self._last_touch_write > DEFINITION_CACHE_TOUCH_INTERVAL:
+                self._write_touched()
+            self.hits += 1
+            return row[0]
+
+    def _write_touched(self):
+        """Persist the access times of recent hits. Called with the lock held."""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE definitions SET accessed_at = ? "
+                "WHERE word = ? AND language = ? AND model = ? AND prompt_version = ?",
+                ((accessed,) + key for key, accessed in self._touched.items())
+            )
+            self._conn.commit()
+            self._touched.clear()
+        self._last_touch_write = time.monotonic()
+
+    def put(self, word: str, language: str, response: str):
+        """Store a response and evict the oldest entries if the cache is full."""
+        now = time.time()
+        with metrics.span("cache_write"), self._lock:
+            # Eviction goes by access time, so it has to be current
+            self._write_touched()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO definitions VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._key(word, language) + (response, now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM definitions WHERE rowid IN ("
+                "SELECT rowid FROM definitions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def invalidate(self, word=None, language=None):
+        """
+        Drop cached entries. With no arguments the whole cache is cleared,
+        otherwise only the entries matching the given word and/or language.
+        """
+        with self._lock:
+            if word is None:
+                where, params = (" WHERE language = ?", (language,)) if language is not None else ("", ())
+                self._conn.execute(f"DELETE FROM definitions{where}", params)
+            else:
+                # Entries are stored under the word's key, which depends on the language
+                languages = [language] if language is not None else [
+                    row[0] for row in self._conn.execute("SELECT DISTINCT language FROM definitions")
+                ]
+                self._conn.executemany(
+                    "DELETE FROM definitions WHERE word = ? AND language = ?",
+                    ((self.normalize(word, lang), lang) for lang in languages)
+                )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current number of entries."""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM definitions").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": size
+        }
+
+    def close(self):
+        with self._lock:
+            self._write_touched()
+            self._conn.close()
+
+###############################################################################
+# CONVERSATION CONTEXT
+###############################################################################
+# "stateless" sends only the system prompt and the current word, "window" keeps
+# the last CONTEXT_WINDOW_TURNS lookups and "summary" folds older lookups into a
+# short summary so the request stays under CONTEXT_TOKEN_BUDGET.
+CONTEXT_MODES = ("stateless", "window", "summary")
+CONTEXT_MODE = os.environ.get("MUNDILEX_CONTEXT_MODE", "stateless")
+CONTEXT_WINDOW_TURNS = 4
+CONTEXT_TOKEN_BUDGET = 2048
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)."""
+    return len(text) // 4 + 1
+
+def estimate_message_tokens(messages) -> int:
+    """Estimate the prompt size of a list of chat messages."""
+    # Every message carries a few tokens of role/formatting overhead
+    return sum(estimate_tokens(m["content"]) + 4 for m in messages)
+
+class ConversationContext:
+    """
+    Builds the message list sent with each lookup and keeps it bounded.
+
+    The context never grows past token_budget: in "window" mode the oldest
+    turns are dropped, in "summary" mode they are replaced by a one-line list
+    of the words already explained.
+    """
+
+    def __init__(self, mode=CONTEXT_MODE, window_turns=CONTEXT_WINDOW_TURNS,
+                 token_budget=CONTEXT_TOKEN_BUDGET, system_prompt=SYSTEM_PROMPT):
+        if mode not in CONTEXT_MODES:
+            print(f"Unknown context mode '{mode}', falling back to 'stateless'.")
+            mode = "stateless"
+        self.mode = mode
+        self.window_turns = window_turns
+        self.token_budget = token_budget
+        self.system_prompt = system_prompt
+        self.turns = []  # (user message, assistant message, word)
+        self.summarized_words = []
+        self.last_usage = None
+        self._lock = threading.Lock()
+
+    def _summary_message(self):
+        if not self.summarized_words:
+            return None
+        return {
+            "role": "system",
+            "content": "Words already explained earlier in this session: " + ", ".join(self.summarized_words)
+        }
+
+    def build_messages(self, user_message: dict) -> list:
+        """Return the messages to send for a new user message."""
+        with self._lock:
+            messages = [{"role": "system", "content": self.system_prompt}]
+            if self.mode == "stateless":
+                return messages + [user_message]
+
+            summary = self._summary_message()
+            if summary is not None:
+                messages.append(summary)
+            history = []
+            for user, assistant, _ in self.turns:
+                history.extend([user, assistant])
+            return messages + history + [user_message]
+
+    def record(self, word: str, user_message: dict, assistant_message: dict):
+        """Remember a finished turn and trim the history to the configured bounds."""
+        if self.mode == "stateless":
+            return
+        with self._lock:
+            self.turns.append((user_message, assistant_message, word))
+            if self.mode == "window":
+                del self.turns[:-self.window_turns]
+            while self.turns and self._history_tokens() > self.token_budget:
+                _, _, old_word = self.turns.pop(0)
+                if self.mode == "summary":
+                    self.summarized_words.append(old_word)
+            # The summary itself must fit in the budget too
+            while self.summarized_words and self._history_tokens() > self.token_budget:
+                self.summarized_words.pop(0)
+
+    def _history_tokens(self):
+        messages = [{"role": "system", "content": self.system_prompt}]
+        summary = self._summary_message()
+        if summary is not None:
+            messages.append(summary)
+        for user, assistant, _ in self.turns:
+            messages.extend([user, assistant])
+        return estimate_message_tokens(messages)
+
+    def record_usage(self, usage, messages, completion: str) -> dict:
+        """
+        Store the token counts of the last request. Counts reported by the API
+        are used when present, local estimates otherwise.
+        """
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or estimate_message_tokens(messages)
+        completion_tokens = getattr(usage, "completion_tokens", None) or estimate_tokens(completion)
+        self.last_usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        return self.last_usage
+
+    def reset(self):
+        """Forget all remembered turns."""
+        with self._lock:
+            self.turns = []
+            self.summarized_words = []
+
+###############################################################################
+# GROQ CLIENT
+###############################################################################
+# Seconds to wait for a response (and for the connection to open)
+GROQ_TIMEOUT = float(os.environ.get("MUNDILEX_GROQ_TIMEOUT", "30"))
+GROQ_CONNECT_TIMEOUT = 5.0
+# Pooled HTTP connections, kept alive between lookups
+GROQ_MAX_CONNECTIONS = 8
+GROQ_KEEPALIVE_SECONDS = 120.0
+# Limits of the Groq plan; 0 disables a limit. Defaults match the free tier.
+GROQ_RPM = float(os.environ.get("MUNDILEX_GROQ_RPM", "30"))
+GROQ_TPM = float(os.environ.get("MUNDILEX_GROQ_TPM", "6000"))
+GROQ_MAX_RETRIES = int(os.environ.get("MUNDILEX_GROQ_RETRIES", "3"))
+RETRY_BASE_DELAY = 0.5  # Seconds before the first retry, doubled for each further one
+RETRY_MAX_DELAY = 20.0
+# Consecutive failed attempts that open the circuit, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30.0
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at rate_per_minute.
+    reserve() takes tokens right away and returns how long the caller must
+    wait before using them, so concurrent callers are spaced out fairly.
+    A request larger than the bucket may run when the bucket is full; the
+    debt it leaves is paid off by the callers after it.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take amount tokens and return the seconds to wait before using them."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill(time.monotonic())
+            available = self.tokens
+            self.tokens -= amount
+            return max(0.0, (min(amount, self.capacity) - available) / self.rate)
+
+    def available(self) -> float:
+        """Tokens in the bucket right now (negative while in debt)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self.tokens
+
+    def refund(self, amount: float):
+        """Give back tokens that were reserved but not used (negative amounts charge more)."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an API whose circuit breaker is open."""
+
+class CircuitBreaker:
+    """
+    Stops calling a failing API. After failure_threshold consecutive failed
+    attempts the circuit opens and calls fail fast for reset_seconds; then
+    a single trial call is let through (half-open) and its outcome closes
+    or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return "open"
+            return "half-open"
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_seconds or self.trial_running:
+                return False
+            self.trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.trial_running or (self.opened_at is None and self.failures >= self.failure_threshold):
+                if self.opened_at is None:
+                    self.times_opened += 1
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts, connection problems and server errors are worth retrying."""
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in (408, 409, 429) or status >= 500
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError")
+
+def retry_after_seconds(error: Exception):
+    """Return the server's Retry-After hint in seconds, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+def describe_api_error(error: Exception) -> str:
+    """Short, user-facing reason for a failed API call."""
+    if isinstance(error, CircuitOpenError):
+        return str(error)
+    status = getattr(error, "status_code", None)
+    if status == 429:
+        return "rate limited by Groq (HTTP 429)"
+    if status is not None:
+        return f"Groq returned HTTP {status}"
+    name = type(error).__name__
+    if "Timeout" in name:
+        return "request to Groq timed out"
+    if "Connection" in name:
+        return "could not connect to Groq"
+    return str(error) or name
+
+class GroqClient:
+    """
+    The one Groq API client of the application, shared by every lookup.
+
+    The groq SDK client and its HTTP connection pool are created on first
+    use and reused, so requests share kept-alive TLS connections; the base
+    URL comes from GROQ_BASE_URL unless given. Every attempt first reserves
+    one request from the RPM bucket and the estimated prompt plus
+    max_tokens from the TPM bucket; the estimate is settled against the
+    reported usage afterwards. Retryable failures are retried with
+    jittered exponential backoff (honouring Retry-After), and a circuit
+    breaker makes calls fail fast with CircuitOpenError while the API keeps
+    failing. Safe to use from several threads.
+    """
+
+    def __init__(self, api_key=None, base_url=None, timeout=GROQ_TIMEOUT, connect_timeout=GROQ_CONNECT_TIMEOUT,
+                 max_connections=GROQ_MAX_CONNECTIONS, rpm=GROQ_RPM, tpm=GROQ_TPM,
+                 max_retries=GROQ_MAX_RETRIES, breaker=None, sleep=time.sleep):
+        self.api_key = api_key if api_key is not None else GROQ_API_KEY
+        self.base_url = base_url
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self._sdk = None
+        self._http = None
+        self._sdk_lock = threading.Lock()
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_retries = max_retries
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self.attempts = 0
+        self.retries = 0
+        self.failures = 0
+        self.rejected = 0
+        self.throttled_seconds = 0.0
+
+    def sdk(self):
+        """Return the groq SDK client, importing groq and creating it on first use."""
+        if self._sdk is None:
+            with self._sdk_lock:
+                if self._sdk is None:
+                    import httpx
+                    from groq import Groq
+                    self._http = httpx.Client(
+                        timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections,
+                            keepalive_expiry=GROQ_KEEPALIVE_SECONDS
+                        )
+                    )
+                    # Retries are done by complete()
+                    self._sdk = Groq(
+                        api_key=self.api_key, base_url=self.base_url, timeout=self.timeout,
+                        max_retries=0, http_client=self._http
+                    )
+        return self._sdk
+
+    def close(self):
+        """Close the pooled connections."""
+        with self._sdk_lock:
+            if self._http is not None:
+                self._http.close()
+            self._sdk = None
+            self._http = None
+
+    def complete(self, messages, max_tokens: int, stream=False, **kwargs):
+        """
+        Create a chat completion (or a stream of chunks with stream=True).
+        Raises CircuitOpenError while the circuit is open, otherwise the
+        last error once the retries are used up.
+        """
+        cost = estimate_message_tokens(messages) + max_tokens
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                with self._lock:
+                    self.rejected += 1
+                raise CircuitOpenError("Groq is unavailable; showing cached and offline definitions only")
+            wait = max(self.requests.reserve(1), self.tokens.reserve(cost))
+            if wait > 0:
+                with self._lock:
+                    self.throttled_seconds += wait
+                self.sleep(wait)
+            with self._lock:
+                self.attempts += 1
+            try:
+                response = self.sdk().chat.completions.create(
+                    model=GROQ_MODEL,
+                    messages=messages,
+                    max_tokens=max_tokens,
+                    stream=stream,
+                    **kwargs
+                )
+            except Exception as e:
+                self.tokens.refund(cost)
+                if not is_retryable(e):
+                    self.breaker.record_success()  # The API answered; the request was at fault
+                    raise
+                with self._lock:
+                    self.failures += 1
+                if getattr(e, "status_code", None) == 429:
+                    # Throttling is not an outage; back off but keep the circuit closed
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise
+                delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+                delay = delay / 2 + random.uniform(0, delay / 2)
+                retry_after = retry_after_seconds(e)
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                print(f"Groq request failed ({describe_api_error(e)}); retrying in {delay:.1f}s")
+                with self._lock:
+                    self.retries += 1
+                self.sleep(delay)
+                continue
+
+            self.breaker.record_success()
+            if stream:
+                return self._settling_stream(response, cost)
+            self._settle(cost, getattr(response, "usage", None))
+            return response
+
+    def has_headroom(self, fraction: float) -> bool:
+        """True when both rate-limit buckets are at least fraction full (for optional work)."""
+        for bucket in (self.requests, self.tokens):
+            if bucket.rate > 0 and bucket.available() < bucket.capacity * fraction:
+                return False
+        return self.breaker.state == "closed"
+
+    def _settle(self, reserved, usage):
+        total = getattr(usage, "total_tokens", None)
+        if total is not None:
+            self.tokens.refund(reserved - total)
+
+    def _settling_stream(self, stream, reserved):
+        usage = None
+        try:
+            for chunk in stream:
+                x_groq = getattr(chunk, "x_groq", None)
+                if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                    usage = x_groq.usage
+                yield chunk
+        finally:
+            self._settle(reserved, usage)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "attempts": self.attempts,
+                "retries": self.retries,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "throttled_seconds": self.throttled_seconds,
+                "circuit": self.breaker.state,
+                "circuit_opened": self.breaker.times_opened
+            }
+
+###############################################################################
+# DEFINITION PROVIDERS
+###############################################################################
+# Local dictionaries live in DICTIONARY_DIR as "<language code>.mldict"
+DICTIONARY_DIR = os.environ.get("MUNDILEX_DICTIONARY_DIR", "dictionaries")
+DICTIONARY_EXTENSION = ".mldict"
+DICTIONARY_MAGIC = b"MLXDICT1"
+DICTIONARY_BLOCK_SIZE = 16  # Entries per prefix-compressed block
+# magic, language code, entry count, block size, block count, index offset
+DICTIONARY_HEADER = struct.Struct("<8s8sIIIQ")
+
+def encode_varint(value: int) -> bytes:
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def decode_varint(buf, pos: int):
+    """Return (value, next position) of the varint at pos."""
+    result = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+def write_dictionary(f, entries, language_code: str, block_size=DICTIONARY_BLOCK_SIZE) -> int:
+    """
+    Write {key: definition} to a binary file opened for writing; returns the
+    number of entries. Layout: header, definitions (UTF-8), blocks of
+    sorted, front-coded keys, then one offset per block. Each block starts
+    with a full key so lookups can binary-search the block offsets.
+    """
+    items = sorted((key.encode("utf-8"), definition.encode("utf-8")) for key, definition in entries.items())
+    f.write(b"\0" * DICTIONARY_HEADER.size)
+
+    refs = []
+    position = DICTIONARY_HEADER.size
+    for _, definition in items:
+        f.write(definition)
+        refs.append((position, len(definition)))
+        position += len(definition)
+
+    block_offsets = []
+    previous = b""
+    for i, (key, _) in enumerate(items):
+        if i % block_size == 0:
+            block_offsets.append(position)
+            previous = b""
+        shared = 0
+        limit = min(len(previous), len(key))
+        while shared < limit and previous[shared] == key[shared]:
+            shared += 1
+        offset, length = refs[i]
+        record = (encode_varint(shared) + encode_varint(len(key) - shared) + key[shared:]
+                  + encode_varint(offset) + encode_varint(length))
+        f.write(record)
+        position += len(record)
+        previous = key
+
+    index_offset = position
+    f.write(struct.pack(f"<{len(block_offsets)}Q", *block_offsets))
+    f.seek(0)
+    f.write(DICTIONARY_HEADER.pack(
+        DICTIONARY_MAGIC, language_code.encode("ascii")[:8], len(items), block_size,
+        len(block_offsets), index_offset
+    ))
+    return len(items)
+
+class DictionaryIndex:
+    """Read-only, memory-mapped view of a dictionary written by write_dictionary."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        magic, language, self.entry_count, self.block_size, self.block_count, self.index_offset = \
+            DICTIONARY_HEADER.unpack_from(self._mm, 0)
+        if magic != DICTIONARY_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a MundiLex dictionary.")
+        self.language_code = language.rstrip(b"\0").decode("ascii")
+
+    def __len__(self):
+        return self.entry_count
+
+    def _block_offset(self, block: int) -> int:
+        return struct.unpack_from("<Q", self._mm, self.index_offset + 8 * block)[0]
+
+    def _first_key(self, block: int) -> bytes:
+        pos = self._block_offset(block)
+        _, pos = decode_varint(self._mm, pos)  # Always 0 shared bytes
+        length, pos = decode_varint(self._mm, pos)
+        return self._mm[pos:pos + length]
+
+    def get(self, key: str):
+        """Return the definition stored under key, or None."""
+        target = key.encode("utf-8")
+        # Last block whose first key is <= target
+        lo, hi = 0, self.block_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._first_key(mid) <= target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return None
+        block = lo - 1
+
+        mm = self._mm
+        pos = self._block_offset(block)
+        count = min(self.block_size, self.entry_count - block * self.block_size)
+        current = b""
+        for _ in range(count):
+            shared, pos = decode_varint(mm, pos)
+            length, pos = decode_varint(mm, pos)
+            current = current[:shared] + mm[pos:pos + length]
+            pos += length
+            offset, pos = decode_varint(mm, pos)
+            size, pos = decode_varint(mm, pos)
+            if current == target:
+                return mm[offset:offset + size].decode("utf-8")
+            if current > target:
+                return None
+        return None
+
+    def close(self):
+        if getattr(self, "_mm", None) is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+class DefinitionProvider(ABC):
+    """
+    A source of definitions for LookupService. lookup() returns the
+    definition text, or None when the provider cannot answer so the next
+    provider is tried. Offline providers are consulted before the
+    definition cache; online ones only when nothing else had the word.
+    """
+    name = "provider"
+    offline = False
+
+    @abstractmethod
+    def lookup(self, word: str, language: str, on_chunk=None):
+        """Return the definition of word, or None if this provider has none."""
+
+    def stats(self) -> dict:
+        return {}
+
+    def close(self):
+        pass
+
+class LocalDictionaryProvider(DefinitionProvider):
+    """Definitions from memory-mapped dictionaries built with `Mundilux.py build-dictionary`."""
+    name = "local dictionary"
+    offline = True
+
+    def __init__(self, directory=DICTIONARY_DIR):
+        self.directory = directory
+        self._indexes = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _index(self, language: str):
+        code = LANGUAGE_CODES.get(language, "en")
+        with self._lock:
+            if code not in self._indexes:
+                path = os.path.join(self.directory, code + DICTIONARY_EXTENSION)
+                index = None
+                if os.path.exists(path):
+                    try:
+                        index = DictionaryIndex(path)
+                        print(f"Loaded local {language} dictionary with {len(index)} entries")
+                    except Exception as e:
+                        print(f"Failed to open local dictionary {path}: {e}")
+                self._indexes[code] = index
+            return self._indexes[code]
+
+    def lookup(self, word: str, language: str, on_chunk=None):
+        index = self._index(language)
+        if index is None:
+            return None
+        definition = index.get(word_normalizer.fold(word, language))
+        if definition is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return definition
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            for index in self._indexes.values():
+                if index is not None:
+                    index.close()
+            self._indexes.clear()
+
+class GroqProvider(DefinitionProvider):
+    """Definitions written by Llama AI via Groq; the fallback when no dictionary has the word."""
+    name = "groq"
+
+    def __init__(self, service):
+        self.service = service
+
+    def lookup(self, word: str, language: str, on_chunk=None):
+        response = self.service._fetch(word, language, on_chunk)
+        return None if response == DEFINITION_NOT_AVAILABLE else response
+
+###############################################################################
+# LOOKUP SERVICE
+###############################################################################
+LOOKUP_WORKERS = 4
+DEFINITION_NOT_AVAILABLE = "Definition not available."
+# Stream completions token by token so the first lines show up immediately
+STREAMING_ENABLED = os.environ.get("MUNDILEX_STREAMING", "1") != "0"
+# Repeat lookups of a word within this many seconds reuse the previous answer
+COALESCE_WINDOW_SECONDS = float(os.environ.get("MUNDILEX_COALESCE_WINDOW", "30"))
+
+class _Flight:
+    """One in-flight request shared by every caller with the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None  # why the leader's request failed, for every caller of the flight
+        self.chunks = []
+        self.listeners = []
+        self.lock = threading.Lock()
+
+    def add_listener(self, on_chunk):
+        """Replay the chunks streamed so far to on_chunk, then forward new ones."""
+        with self.lock:
+            for text in self.chunks:
+                on_chunk(text)
+            self.listeners.append(on_chunk)
+
+    def stream(self, text):
+        with self.lock:
+            self.chunks.append(text)
+            for on_chunk in self.listeners:
+                on_chunk(text)
+
+class SingleFlight:
+    """
+    Request coalescing keyed by (word, language).
+
+    The first caller for a key runs the request; callers arriving while it is
+    in flight wait for the same result (and receive its streamed chunks)
+    instead of making their own call. Successful results are also remembered
+    for `window` seconds so that repeats shortly after are answered at once.
+    """
+
+    def __init__(self, window=COALESCE_WINDOW_SECONDS):
+        self.window = window
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._recent = {}  # key -> (expiry, result), in insertion (= expiry) order
+        self.calls = 0
+        self.executed = 0
+        self.coalesced_in_flight = 0
+        self.coalesced_recent = 0
+
+    def _prune(self, now):
+        while self._recent:
+            key, (expiry, _) = next(iter(self._recent.items()))
+            if expiry > now:
+                break
+            del self._recent[key]
+
+    def acquire(self, key):
+        """
+        Return (flight, leader, result). With a recent result, flight is None
+        and result holds it. Otherwise the caller either leads the flight
+        (and must call publish) or follows it (and may wait on it).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.calls += 1
+            self._prune(now)
+            recent = self._recent.get(key)
+            if recent is not None:
+                self.coalesced_recent += 1
+                return None, False, recent[1]
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                self.coalesced_in_flight += 1
+                return flight, False, None
+            flight = _Flight()
+            self._in_flight[key] = flight
+            self.executed += 1
+            return flight, True, None
+
+    def publish(self, key, flight, result, remember=True, error=None):
+        """
+        Finish a led flight. result None means the request did not resolve
+        the key; error is the reason a failed result is shared with.
+        """
+        with self._lock:
+            if self._in_flight.get(key) is flight:
+                del self._in_flight[key]
+            if remember and result is not None and self.window > 0:
+                self._recent.pop(key, None)
+                self._recent[key] = (time.monotonic() + self.window, result)
+        flight.error = error
+        flight.result = result
+        flight.done.set()
+
+    def do(self, key, fn, on_chunk=None, remember=lambda result: True, failure=lambda result: None,
+           on_failure=None):
+        """
+        Run fn(on_chunk) once for concurrent callers with the same key and
+        return its result. on_chunk receives streamed text, including what
+        was streamed before a follower joined. A flight that ends without a
+        result (e.g. a batch that did not resolve this word) makes the
+        followers try again. A follower that already received chunks from
+        the failed flight gets no chunks from the retry, only its result, so
+        its text is never the start of one answer followed by another.
+        The leader calls failure(result) for the reason a result failed;
+        followers given that result receive the reason through on_failure.
+        """
+        while True:
+            flight, leader, result = self.acquire(key)
+            if flight is None:
+                return result
+            if on_chunk is not None:
+                flight.add_listener(on_chunk)
+            if not leader:
+                flight.done.wait()
+                if flight.result is not None:
+                    if flight.error is not None and on_failure is not None:
+                        on_failure(flight.error)
+                    return flight.result
+                if flight.chunks:
+                    on_chunk = None
+                continue
+            result = None
+            try:
+                # Without a chunk callback the leader asks for the whole answer at once
+                result = fn(flight.stream if on_chunk is not None else None)
+            finally:
+                self.publish(
+                    key, flight, result,
+                    remember=result is not None and remember(result),
+                    error=failure(result) if result is not None else None
+                )
+            return result
+
+    def forget(self, key):
+        """Drop the remembered result for a key so the next call runs again."""
+        with self._lock:
+            self._recent.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executed": self.executed,
+                "coalesced_in_flight": self.coalesced_in_flight,
+                "coalesced_recent": self.coalesced_recent,
+                "in_flight": len(self._in_flight)
+            }
+
+class _LookupTask(QRunnable):
+    """A single queued lookup executed on the LookupService thread pool."""
+
+    def __init__(self, service, request_id, word, language, source):
+        super().__init__()
+        self.service = service
+        self.request_id = request_id
+        self.word = word
+        self.language = language
+        self.source = source
+        self.cancelled = False
+        self.queued_at = time.perf_counter()
+        # The service keeps a reference while queued; Qt must not delete it
+        self.setAutoDelete(False)
+
+    def run(self):
+        if self.cancelled:
+            self.service._task_done(self)
+            return
+        metrics.observe("queue_wait", time.perf_counter() - self.queued_at)
+        # Inflected forms are looked up (and displayed) as their dictionary form
+        self.word = word_normalizer.lemma(self.word, self.language) or self.word
+        self._streamed = ""
+        self._notified = False
+        try:
+            with metrics.span("lookup"):
+                response = self.service.fetch_linguistic_info(
+                    self.word, self.language, on_chunk=self._on_chunk, fresh=self.source == "refresh", lemmatized=True
+                )
+        except Exception as e:
+            print(f"Error looking up '{self.word}': {e}")
+            traceback.print_exc()
+            self.service.lookup_failed.emit(self.word, f"{type(e).__name__}: {e}")
+            response = DEFINITION_NOT_AVAILABLE
+        finally:
+            # Never leave the request pending, or is_busy() would stay True
+            self.service._task_done(self)
+        if self.cancelled:
+            return
+        self.service.lookup_finished.emit(self.request_id, self.source, self.word, response)
+
+        if self.source == "clipboard" and not self._notified and response != DEFINITION_NOT_AVAILABLE:
+            # Shown by the notification thread; neither the GUI nor this lookup waits for it
+            notifications.notify("Linguistic Information", response, key=self.word)
+
+    def _on_chunk(self, text):
+        """Forward a streamed chunk and notify as soon as the first line is complete."""
+        if self.cancelled:
+            return
+        self.service.lookup_chunk.emit(self.request_id, self.word, text)
+        if self.source == "clipboard" and not self._notified:
+            self._streamed += text
+            first_line, newline, _ = self._streamed.lstrip().partition("\n")
+            if newline and first_line.strip():
+                self._notified = True
+                notifications.notify("Linguistic Information", first_line.strip(), key=self.word)
+
+class _PrefetchTask(QRunnable):
+    """Batch lookup that only fills the cache; nothing is displayed."""
+
+    def __init__(self, service, words, language):
+        super().__init__()
+        self.service = service
+        self.words = words
+        self.language = language
+
+    def run(self):
+        self.service.fetch_linguistic_info_batch(self.words, self.language)
+
+class LookupService(QObject):
+    """
+    Asynchronous definition lookups.
+
+    Requests are queued on a QThreadPool and results come back through
+    signals, so no network call ever runs on the GUI thread. Only the newest
+    request matters for the display: submitting a lookup cancels queued ones
+    that have not started yet and discards the results of those in flight.
+    Lookups of the same word share one API call through SingleFlight.
+    """
+    lookup_finished = pyqtSignal(int, str, str, str)  # request id, source, word, response
+    lookup_chunk = pyqtSignal(int, str, str)  # request id, word, streamed text
+    lookup_failed = pyqtSignal(str, str)  # word (or batch label), reason
+    passage_prefetched = pyqtSignal(str, int)  # language, definitions now cached
+    tokens_used = pyqtSignal(str, int, int)  # word, prompt tokens, completion tokens
+
+    def __init__(self, cache=None, context=None, max_workers=LOOKUP_WORKERS,
+                 coalesce_window=COALESCE_WINDOW_SECONDS, providers=None, client=None):
+        super().__init__()
+        self.cache = cache
+        # Rate-limited, retrying access to the Groq API
+        self.client = client if client is not None else GroqClient()
+        self.context = context if context is not None else ConversationContext()
+        # Tried in order: local dictionaries first, Groq as the fallback
+        self.providers = list(providers) if providers is not None else [LocalDictionaryProvider(), GroqProvider(self)]
+        self.single_flight = SingleFlight(coalesce_window)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_workers)
+        self._next_id = 0
+        self._pending = {}
+        # Cancelled tasks a pool thread may already have dequeued; kept referenced
+        # until run() ends, since Qt holds no reference to them (autoDelete is off)
+        self._cancelled = {}
+        self._passage_task = None
+        self._lock = threading.Lock()
+        self._failure = threading.local()  # reason the last Groq request of a thread failed
+
+    def submit(self, word: str, language: str, source: str = "search") -> int:
+        """Queue a lookup, cancelling older ones, and return its request id."""
+        skipped = self.cancel_all()
+        # Words copied in a burst were never looked up; define them together in the background
+        burst = [task.word for task in skipped if task.source == "clipboard" and task.language == language]
+        if burst:
+            self.prefetch(burst, language)
+        with self._lock:
+            self._next_id += 1
+            task = _LookupTask(self, self._next_id, word, language, source)
+            self._pending[task.request_id] = task
+        self.pool.start(task)
+        return task.request_id
+
+    def cancel_all(self) -> list:
+        """
+        Cancel every pending lookup. Lookups already running finish silently.
+        Returns the tasks that were removed from the queue before they started.
+        """
+        with self._lock:
+            tasks = list(self._pending.values())
+            self._cancelled.update(self._pending)
+            self._pending.clear()
+        skipped = []
+        for task in tasks:
+            task.cancelled = True
+            if self.pool.tryTake(task):
+                skipped.append(task)
+                with self._lock:
+                    self._cancelled.pop(task.request_id, None)
+        return skipped
+
+    def has_headroom(self, fraction: float) -> bool:
+        """True if the Groq rate limits leave room for optional work (see GroqClient.has_headroom)."""
+        return self.client.has_headroom(fraction)
+
+    def is_busy(self) -> bool:
+        """Return True while a lookup whose result will be displayed is pending."""
+        with self._lock:
+            return bool(self._pending)
+
+    def _task_done(self, task):
+        with self._lock:
+            self._pending.pop(task.request_id, None)
+            self._cancelled.pop(task.request_id, None)
+
+    def shutdown(self, timeout_ms=3000):
+        """Cancel queued lookups and wait for running ones to finish."""
+        self.cancel_all()
+        self.pool.waitForDone(timeout_ms)
+        for provider in self.providers:
+            provider.close()
+
+    def _lookup_offline(self, word: str, language: str):
+        """Return a definition from the first offline provider that has the word, or None."""
+        for provider in self.providers:
+            if provider.offline:
+                definition = provider.lookup(word, language)
+                if definition is not None:
+                    print(f"Found '{word}' ({language}) in the {provider.name}")
+                    return definition
+        return None
+
+    def _lookup_online(self, word: str, language: str, on_chunk=None) -> str:
+        """Ask the online providers in order. Runs once per flight."""
+        for provider in self.providers:
+            if not provider.offline:
+                definition = provider.lookup(word, language, on_chunk)
+                if definition is not None:
+                    return definition
+        return DEFINITION_NOT_AVAILABLE
+
+    @staticmethod
+    def flight_key(word: str, language: str) -> tuple:
+        return (DefinitionCache.normalize(word, language), language)
+
+    def coalescing_stats(self) -> dict:
+        """Counters of lookups answered by another caller's request."""
+        return self.single_flight.stats()
+
+    def provider_stats(self) -> dict:
+        """Hit counters of the definition providers, by provider name."""
+        return {provider.name: provider.stats() for provider in self.providers if provider.stats()}
+
+    def fetch_linguistic_info(self, word: str, language: str, on_chunk=None, fresh=False, lemmatized=False) -> str:
+        """
+        Fetch linguistic information from the local dictionaries, the cache
+        or, failing those, Llama AI via Groq. Blocking; runs on a pool thread.
+        Returns the raw response string. When on_chunk is given and streaming
+        is enabled, it is called with each piece of text as it arrives. fresh
+        skips the cache and any recently remembered answer. The word is
+        reduced to its dictionary form first, unless the caller has done so
+        (lemmatized).
+        """
+        if not lemmatized:
+            word = word_normalizer.lemma(word, language) or word
+        with metrics.span("dictionary_lookup"):
+            definition = self._lookup_offline(word, language)
+        if definition is not None:
+            return definition
+
+        key = self.flight_key(word, language)
+        if fresh:
+            self.single_flight.forget(key)
+        elif self.cache is not None:
+            with metrics.span("cache_lookup"):
+                cached = self.cache.get(word, language)
+            if cached is not None:
+                print(f"Cache hit for '{word}' ({language})")
+                return cached
+
+        # Callers of the same word share one request; failures are shared (with their reason)
+        # but not remembered
+        self._failure.reason = None
+        response = self.single_flight.do(
+            key,
+            lambda stream: self._lookup_online(word, language, stream),
+            on_chunk=on_chunk,
+            remember=lambda response: response != DEFINITION_NOT_AVAILABLE,
+            failure=lambda response: self._failure.reason if response == DEFINITION_NOT_AVAILABLE else None,
+            on_failure=lambda reason: self.lookup_failed.emit(word, reason)
+        )
+        if response == DEFINITION_NOT_AVAILABLE and self.cache is not None:
+            # Degrade to an expired cache entry rather than nothing
+            stale = self.cache.get(word, language, allow_stale=True)
+            if stale is not None:
+                print(f"Serving expired cache entry for '{word}' ({language})")
+                return stale
+        return response
+
+    def _fetch(self, word: str, language: str, on_chunk=None) -> str:
+        """Request a definition from Groq and record it (see GroqProvider)."""
+        try:
+            user_message = {
+                "role": "user",
+                "content": build_user_prompt(word, language)
+            }
+            messages = self.context.build_messages(user_message)
+
+            # Request response from Llama AI; a stream is read to its end within the span
+            streaming = on_chunk is not None and STREAMING_ENABLED
+            with metrics.span("network"):
+                if streaming:
+                    assistant_message, api_usage = self._complete_streaming(messages, on_chunk)
+                else:
+                    response = self.client.complete(messages, max_tokens=500, temperature=0.7)
+            with metrics.span("parsing"):
+                if not streaming:
+                    assistant_message = response.choices[0].message.content.strip()
+                    api_usage = getattr(response, "usage", None)
+                usage = self.context.record_usage(api_usage, messages, assistant_message)
+            print(f"Assistant:\n{assistant_message}")
+            print(
+                f"Tokens for '{word}': prompt={usage['prompt_tokens']}, "
+                f"completion={usage['completion_tokens']}"
+            )
+            self.tokens_used.emit(word, usage["prompt_tokens"], usage["completion_tokens"])
+
+            self.context.record(word, user_message, {
+                "role": "assistant",
+                "content": assistant_message
+            })
+
+            if self.cache is not None:
+                self.cache.put(word, language, assistant_message)
+
+            return assistant_message
+
+        except Exception as e:
+            reason = describe_api_error(e)
+            print(f"Error fetching linguistic info for '{word}': {reason}")
+            if not isinstance(e, CircuitOpenError):
+                traceback.print_exc()
+            self._failure.reason = reason
+            self.lookup_failed.emit(word, reason)
+            return DEFINITION_NOT_AVAILABLE
+
+    def _complete_streaming(self, messages, on_chunk):
+        """Run a streaming completion, passing each delta to on_chunk. Returns (text, usage)."""
+        start = time.perf_counter()
+        stream = self.client.complete(messages, max_tokens=500, temperature=0.7, stream=True)
+        parts = []
+        usage = None
+        for chunk in stream:
+            if chunk.choices:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if not parts:
+                        metrics.observe("first_token", time.perf_counter() - start)
+                    parts.append(delta)
+                    on_chunk(delta)
+            # Groq reports token usage on the final chunk
+            x_groq = getattr(chunk, "x_groq", None)
+            if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                usage = x_groq.usage
+        return "".join(parts).strip(), usage
+
+    def fetch_linguistic_info_batch(self, words, language: str, batch_size=BATCH_SIZE) -> dict:
+        """
+        Fetch linguistic information for several words with one JSON request
+        per BATCH_SIZE words. Blocking. Cached words are not requested again and
+        every fetched entry is written to the cache. Words already being looked
+        up elsewhere are not requested again; their result is awaited instead.
+        Words are requested in their dictionary form; the result is keyed by
+        the words as given. Returns {word: response} for the words that could
+        be resolved.
+        """
+        lemmas = {}
+        for word in words:
+            lemmas[word] = word_normalizer.lemma(word, language) or word
+        results = self._fetch_lemmas_batch(list(dict.fromkeys(lemmas.values())), language, batch_size)
+        return {word: results[lemma] for word, lemma in lemmas.items() if lemma in results}
+
+    def _fetch_lemmas_batch(self, words, language: str, batch_size=BATCH_SIZE) -> dict:
+        results = {}
+        missing = []
+        flights = {}  # word -> (key, flight) led by this call and not yet published
+        followed = {}
+        try:
+            for word in words:
+                with metrics.span("dictionary_lookup"):
+                    cached = self._lookup_offline(word, language)
+                if cached is None and self.cache is not None:
+                    with metrics.span("cache_lookup"):
+                        cached = self.cache.get(word, language)
+                if cached is not None:
+                    results[word] = cached
+                    continue
+                key = self.flight_key(word, language)
+                flight, leader, result = self.single_flight.acquire(key)
+                if flight is None:
+                    results[word] = result
+                elif leader:
+                    flights[word] = (key, flight)
+                    missing.append(word)
+                else:
+                    followed[word] = flight
+
+            for start in range(0, len(missing), batch_size):
+                batch = missing[start:start + batch_size]
+                entries = {}
+                try:
+                    messages = [
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": build_batch_prompt(batch, language)}
+                    ]
+                    with metrics.span("network"):
+                        response = self.client.complete(
+                            messages,
+                            max_tokens=min(BATCH_MAX_TOKENS_PER_WORD * len(batch), BATCH_MAX_TOKENS),
+                            temperature=0.7,
+                            response_format={"type": "json_object"}
+                        )
+                    with metrics.span("parsing"):
+                        content = response.choices[0].message.content
+                        entries = parse_batch_response(content, batch)
+                        usage = self.context.record_usage(getattr(response, "usage", None), messages, content)
+                    label = f"{len(batch)} words"
+                    print(
+                        f"Tokens for batch of {label}: prompt={usage['prompt_tokens']}, "
+                        f"completion={usage['completion_tokens']}, resolved={len(entries)}"
+                    )
+                    self.tokens_used.emit(label, usage["prompt_tokens"], usage["completion_tokens"])
+
+                    for word, entry in entries.items():
+                        if self.cache is not None:
+                            self.cache.put(word, language, entry)
+                        results[word] = entry
+                except Exception as e:
+                    reason = describe_api_error(e)
+                    print(f"Error fetching linguistic info for {len(batch)} words: {reason}")
+                    if not isinstance(e, CircuitOpenError):
+                        traceback.print_exc()
+                    self.lookup_failed.emit(f"{len(batch)} words", reason)
+                finally:
+                    # Unresolved words publish None so that waiting lookups fetch them on their own
+                    for word in batch:
+                        key, flight = flights.pop(word)
+                        self.single_flight.publish(key, flight, entries.get(word))
+        finally:
+            # Flights still led here after an error fail too, so no follower waits forever
+            for key, flight in flights.values():
+                self.single_flight.publish(key, flight, None)
+
+        for word, flight in followed.items():
+            flight.done.wait()
+            if flight.result is not None and flight.result != DEFINITION_NOT_AVAILABLE:
+                results[word] = flight.result
+        return results
+
+    def prefetch(self, words, language: str):
+        """Fetch definitions for several words in the background, only filling the cache."""
+        words = list(words)
+        self.pool.start(_PrefetchTask(self, words, language))
+
+    def prefetch_passage(self, text: str, language: str, is_known=None):
+        """
+        Prefetch the likely unknown words of a copied passage at low priority.
+        A passage still waiting in the queue is replaced by the newer one.
+        """
+        task = _PassagePrefetchTask(self, text, language, is_known)
+        with self._lock:
+            previous, self._passage_task = self._passage_task, task
+        if previous is not None:
+            self.pool.tryTake(previous)
+        self.pool.start(task, PASSAGE_PREFETCH_PRIORITY)
+
+###############################################################################
+# PASSAGE PREFETCH
+###############################################################################
+# Opt-in: copied passages (e.g. a subtitle line) prefetch their unknown words
+PASSAGE_PREFETCH = os.environ.get("MUNDILEX_PASSAGE_PREFETCH", "0") == "1"
+PASSAGE_MAX_LENGTH = 1000
+PASSAGE_PREFETCH_MAX_WORDS = 8
+PASSAGE_PREFETCH_PRIORITY = -1  # Below interactive lookups in the thread pool queue
+PASSAGE_PREFETCH_HEADROOM = 0.5  # Only prefetch while half the rate-limit budget is unused
+PASSAGE_MIN_WORD_LENGTH = 3
+# Frequency lists live in FREQUENCY_DIR as "<language code>.txt": one word per
+# line, most frequent first, optionally followed by a count ("haus 12345").
+FREQUENCY_DIR = os.environ.get("MUNDILEX_FREQUENCY_DIR", "frequency")
+COMMON_WORD_RANK = 3000  # Words ranked above this are assumed to be known
+
+class FrequencyList:
+    """Per-language word ranks from frequency list files, loaded on first use."""
+
+    def __init__(self, directory=FREQUENCY_DIR):
+        self.directory = directory
+        self._ranks = {}
+        self._lock = threading.Lock()
+
+    def ranks(self, language: str) -> dict:
+        """Return {folded word: rank} (1 = most frequent), empty without a list."""
+        code = LANGUAGE_CODES.get(language, "en")
+        with self._lock:
+            if code not in self._ranks:
+                ranks = {}
+                path = os.path.join(self.directory, f"{code}.txt")
+                if os.path.exists(path):
+                    try:
+                        with open(path, "r", encoding="utf-8") as f:
+                            for line in f:
+                                word = line.split(maxsplit=1)[0] if line.strip() else ""
+                                if word:
+                                    ranks.setdefault(word_normalizer.fold(word, language), len(ranks) + 1)
+                        print(f"Loaded {len(ranks)} {language} word frequencies")
+                    except Exception as e:
+                        print(f"Failed to load frequency list {path}: {e}")
+                self._ranks[code] = ranks
+            return self._ranks[code]
+
+frequency_list = FrequencyList()
+
+def rank_passage_words(text: str, language: str, is_known=None, frequencies=None,
+                       limit=PASSAGE_PREFETCH_MAX_WORDS, common_rank=COMMON_WORD_RANK) -> list:
+    """
+    Return up to limit words of a passage (as lemmas) that the learner most
+    likely does not know yet: not in the deck (is_known), not among the
+    common_rank most frequent words, rarest first. Words missing from the
+    frequency list come last, longest first, and capitalized ones among them
+    are skipped as probable names (except in German, where nouns are
+    capitalized).
+    """
+    ranks = frequencies if frequencies is not None else frequency_list.ranks(language)
+    code = LANGUAGE_CODES.get(language, "en")
+    candidates = {}
+    for token in tokenize(text):
+        if len(token) < PASSAGE_MIN_WORD_LENGTH:
+            continue
+        lemma = word_normalizer.lemma(token, language) or token
+        key = word_normalizer.fold(lemma, language)
+        if key in candidates:
+            continue
+        if is_known is not None and (is_known(lemma) or is_known(token)):
+            continue
+        rank = ranks.get(key) or ranks.get(word_normalizer.fold(token, language))
+        if rank is not None and rank <= common_rank:
+            continue
+        if rank is None and token[0].isupper() and code != "de":
+            continue
+        # Listed words by rarity, then unlisted ones by length (a rough proxy for rarity)
+        candidates[key] = (0, -rank, lemma) if rank is not None else (1, -len(lemma), lemma)
+    return [lemma for _, _, lemma in sorted(candidates.values())[:limit]]
+
+class _PassagePrefetchTask(QRunnable):
+    """Low-priority prefetch of the unknown words of a copied passage."""
+
+    def __init__(self, service, text, language, is_known=None):
+        super().__init__()
+        self.service = service
+        self.text = text
+        self.language = language
+        self.is_known = is_known
+        # The service may take it back from the queue; Qt must not delete it
+        self.setAutoDelete(False)
+
+    def run(self):
+        with self.service._lock:
+            if self.service._passage_task is self:
+                self.service._passage_task = None
+        try:
+            if not self.service.has_headroom(PASSAGE_PREFETCH_HEADROOM):
+                print("Skipping passage prefetch: the Groq rate limit budget is in use")
+                return
+            words = rank_passage_words(self.text, self.language, self.is_known)
+            if words:
+                print(f"Prefetching {len(words)} words from a copied passage: {', '.join(words)}")
+                resolved = self.service.fetch_linguistic_info_batch(words, self.language)
+                self.service.passage_prefetched.emit(self.language, len(resolved))
+        except Exception as e:
+            print(f"Passage prefetch failed: {e}")
+            traceback.print_exc()
+
+
+###############################################################################
+# HEADLESS CORE & LOOKUP DAEMON
+###############################################################################
+# `Mundilux.py serve` keeps one LookupCore running for other programs: JSON
+# lines over a Unix socket, or JSON over HTTP on localhost
+DAEMON_SOCKET = os.environ.get("MUNDILEX_DAEMON_SOCKET", "mundilex.sock")
+DAEMON_HTTP_PORT = int(os.environ.get("MUNDILEX_DAEMON_PORT", "8766"))  # 0 = no HTTP
+# The window sends its lookups to a running daemon unless this is "off"
+DAEMON_MODE = os.environ.get("MUNDILEX_DAEMON", "auto").lower()
+DAEMON_DEFAULT_LANGUAGE = "German"
+DAEMON_CONNECT_TIMEOUT = 0.5
+# A lookup may wait for every retry of a slow Groq request
+DAEMON_REQUEST_TIMEOUT = (GROQ_TIMEOUT + RETRY_MAX_DELAY) * (GROQ_MAX_RETRIES + 1)
+# The HTTP endpoint refuses other Host headers (DNS rebinding) and any Origin (web pages)
+DAEMON_HTTP_HOSTS = ("127.0.0.1", "localhost")
+# Ops that change nothing and cost no Groq request; every other op needs a POST
+DAEMON_HTTP_GET_OPS = ("ping", "stats", "search", "metrics", "headroom")
+
+def daemon_token_path(socket_path=DAEMON_SOCKET) -> str:
+    """The file holding the daemon's token, next to its socket."""
+    return f"{socket_path or DAEMON_SOCKET}.token"
+
+def daemon_token(path: str, create=False):
+    """
+    Read this install's daemon token. With create=True a missing token is
+    generated and written readable by its owner only. Returns None if there
+    is no token.
+    """
+    if create:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            os.chmod(path, 0o600)
+        else:
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_urlsafe(32))
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+class LookupCore:
+    """
+    The part of MundiLex that needs no window: definition cache, Groq
+    client, lookup service and flashcard store. The window owns one and
+    LookupDaemon serves one to other programs. Given a DaemonClient, lookups
+    are answered by that daemon instead (see RemoteLookupService).
+    """
+
+    def __init__(self, api_key=None, daemon=None):
+        # One Groq client for every lookup; it connects on the first one
+        self.groq_client = GroqClient(api_key=api_key)
+        # Persistent cache of fetched definitions, shared by every lookup path
+        self.definition_cache = DefinitionCache()
+        # Bounded message history sent with each lookup (stateless by default)
+        self.conversation_context = ConversationContext()
+        self.daemon = daemon
+        if daemon is not None:
+            # Keeps the local cache for when the daemon goes away mid-session
+            self.lookup_service = RemoteLookupService(
+                daemon, cache=self.definition_cache, context=self.conversation_context, client=self.groq_client
+            )
+        else:
+            self.lookup_service = LookupService(
+                cache=self.definition_cache, context=self.conversation_context, client=self.groq_client
+            )
+        self.store = VocabStore()
+        # Its counters are exported with the span histograms
+        metrics.register(self.stats)
+
+    def lookup(self, word: str, language: str, fresh=False, on_chunk=None) -> dict:
+        """Look a word up (blocking) and return the answer as a JSON-ready dict."""
+        lemma = word_normalizer.lemma(word, language) or word
+        response = self.lookup_service.fetch_linguistic_info(
+            lemma, language, on_chunk=on_chunk, fresh=fresh, lemmatized=True
+        )
+        return {
+            "word": lemma,
+            "language": language,
+            "response": response,
+            "found": response != DEFINITION_NOT_AVAILABLE
+        }
+
+    def search(self, query: str, limit=SEARCH_RESULT_LIMIT) -> list:
+        return [
+            {"word": word, "language": language}
+            for word, language in self.store.search_flashcards(query, limit)
+        ]
+
+    def save(self, word: str, language: str, response: str) -> bool:
+        """Save a flashcard. Returns False if the word is already in the deck."""
+        return self.store.add_flashcard({"word": word, "language": language, "response": response})
+
+    def stats(self) -> dict:
+        return {
+            "cache": self.definition_cache.stats(),
+            "coalescing": self.lookup_service.coalescing_stats(),
+            "providers": self.lookup_service.provider_stats(),
+            "groq": self.groq_client.stats(),
+            "flashcards": self.store.count_flashcards()
+        }
+
+    def close(self):
+        metrics.unregister(self.stats)
+        self.lookup_service.shutdown()
+        self.groq_client.close()
+        if self.daemon is not None:
+            self.daemon.close()
+        self.store.close()
+        self.definition_cache.close()
+
+class DaemonError(Exception):
+    """The lookup daemon answered with an error or could not be reached."""
+
+class DaemonClient:
+    """
+    Client of LookupDaemon's Unix socket. Each thread keeps its own
+    connection open, so a request costs one round trip.
+    """
+
+    def __init__(self, path=DAEMON_SOCKET, timeout=DAEMON_REQUEST_TIMEOUT, token=None):
+        self.path = path
+        self.timeout = timeout
+        self.token = token if token is not None else daemon_token(daemon_token_path(path))
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, path=DAEMON_SOCKET):
+        """Return a client if a daemon answers at path, otherwise None."""
+        if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+            return None
+        client = cls(path)
+        try:
+            client.request({"op": "ping"}, timeout=DAEMON_CONNECT_TIMEOUT)
+        except (OSError, DaemonError) as e:
+            print(f"No lookup daemon at {path}: {e}")
+            client.close()
+            return None
+        return client
+
+    def _connection(self, timeout):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(timeout)
+            sock.connect(self.path)
+            connection = (sock, sock.makefile("rwb"))
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        connection[0].settimeout(timeout)
+        return connection
+
+    def _drop_connection(self):
+        connection = getattr(self._local, "connection", None)
+        self._local.connection = None
+        if connection is not None:
+            with self._lock:
+                if connection in self._connections:
+                    self._connections.remove(connection)
+            connection[1].close()
+            connection[0].close()
+
+    def request(self, payload: dict, on_chunk=None, timeout=None) -> dict:
+        """Send one request and return the daemon's reply; streamed chunks go to on_chunk."""
+        payload = dict(payload, token=self.token)
+        if on_chunk is not None:
+            payload["stream"] = True
+        try:
+            _, stream = self._connection(timeout or self.timeout)
+            stream.write(json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n")
+            stream.flush()
+            while True:
+                line = stream.readline()
+                if not line:
+                    raise DaemonError("the daemon closed the connection")
+                reply = json.loads(line)
+                if "chunk" not in reply:
+                    break
+                on_chunk(reply["chunk"])
+        except (OSError, ValueError, DaemonError):
+            # The connection is in an unknown state; the next request opens a new one
+            self._drop_connection()
+            raise
+        if "error" in reply and "response" not in reply:
+            raise DaemonError(reply["error"])
+        return reply
+
+    def lookup(self, word: str, language: str, fresh=False, on_chunk=None) -> dict:
+        return self.request({"op": "lookup", "word": word, "language": language, "fresh": fresh}, on_chunk)
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for sock, stream in connections:
+            try:
+                stream.close()
+                sock.close()
+            except OSError:
+                pass
+
+class RemoteLookupService(LookupService):
+    """
+    LookupService whose definitions come from a running lookup daemon.
+    Queuing, cancellation and signals work as in LookupService; caching,
+    rate limiting and the Groq requests are the daemon's. If the daemon
+    stops answering, lookups fall back to the local cache and providers
+    for the rest of the session.
+    """
+
+    def __init__(self, daemon, **kwargs):
+        super().__init__(**kwargs)
+        self.daemon = daemon
+
+    def _daemon_lost(self, reason):
+        with self._lock:
+            daemon, self.daemon = self.daemon, None
+        if daemon is not None:
+            print(f"Lookup daemon unavailable ({reason}); looking words up locally from now on")
+            daemon.close()
+
+    def fetch_linguistic_info(self, word: str, language: str, on_chunk=None, fresh=False, lemmatized=False) -> str:
+        daemon = self.daemon
+        if daemon is not None:
+            try:
+                reply = daemon.lookup(word, language, fresh=fresh, on_chunk=on_chunk if STREAMING_ENABLED else None)
+            except (OSError, ValueError, DaemonError) as e:
+                self._daemon_lost(e)
+            else:
+                if reply.get("error"):
+                    self.lookup_failed.emit(word, reply["error"])
+                return reply["response"]
+        return super().fetch_linguistic_info(word, language, on_chunk=on_chunk, fresh=fresh, lemmatized=lemmatized)
+
+    def has_headroom(self, fraction: float) -> bool:
+        """Ask the daemon, whose rate limits the lookups use; False if it cannot tell."""
+        daemon = self.daemon
+        if daemon is None:
+            return super().has_headroom(fraction)
+        try:
+            reply = daemon.request({"op": "headroom", "fraction": fraction}, timeout=DAEMON_CONNECT_TIMEOUT)
+        except (OSError, ValueError, DaemonError) as e:
+            self._daemon_lost(e)
+            return False
+        return bool(reply.get("headroom"))
+
+    def fetch_linguistic_info_batch(self, words, language: str, batch_size=BATCH_SIZE) -> dict:
+        daemon = self.daemon
+        if daemon is not None:
+            try:
+                reply = daemon.request({"op": "prefetch", "words": list(words), "language": language})
+            except (OSError, ValueError, DaemonError) as e:
+                self._daemon_lost(e)
+            else:
+                return reply.get("definitions", {})
+        return super().fetch_linguistic_info_batch(words, language, batch_size)
+
+class _DaemonSocketHandler(socketserver.StreamRequestHandler):
+    """One client connection: a JSON request per line, a JSON reply per line."""
+
+    def setup(self):
+        super().setup()
+        self.server.daemon.track_connection(self.connection)
+
+    def finish(self):
+        self.server.daemon.untrack_connection(self.connection)
+        super().finish()
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                self._send({"error": f"invalid JSON: {e}"})
+                continue
+            if not isinstance(request, dict) or not self.server.daemon.authorized(request.get("token")):
+                self._send({"error": "missing or wrong token"})
+                continue
+            on_chunk = self._send_chunk if isinstance(request, dict) and request.get("stream") else None
+            self._send(self.server.daemon.handle(request, on_chunk))
+
+    def _send_chunk(self, text):
+        self._send({"chunk": text})
+
+    def _send(self, reply):
+        self.wfile.write(json.dumps(reply, ensure_ascii=False).encode("utf-8") + b"\n")
+        self.wfile.flush()
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _DaemonSocketServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+
+class LookupDaemon:
+    """
+    Serves a LookupCore to other programs. Requests are JSON objects with an
+    "op" and its arguments:
+
+        {"op": "lookup", "word": "Häuser", "language": "German", "fresh": false}
+        {"op": "prefetch", "words": ["Haus", "Baum"], "language": "German"}
+        {"op": "search", "query": "haus"}
+        {"op": "save", "word": "Haus", "language": "German", "response": "..."}
+        {"op": "stats"}   {"op": "metrics"}   {"op": "ping"}
+        {"op": "headroom", "fraction": 0.5}   (room in the Groq rate limits)
+        {"op": "profile", "action": "start"}   (or "stop", "reset", "report", "folded")
+
+    Every request carries the install's token (see daemon_token): as
+    "token" in the JSON object, or over HTTP as "Authorization: Bearer ...".
+    On the Unix socket a request is one line and so is its reply; a lookup
+    with "stream": true first sends {"chunk": "..."} lines as Groq writes.
+    Over HTTP the op is the path and the JSON object is POSTed to it;
+    read-only ops also take GET, e.g. GET /search?q=haus, and GET /metrics
+    answers in the Prometheus text format. Both only accept local clients.
+    """
+
+    def __init__(self, core, socket_path=DAEMON_SOCKET, http_port=DAEMON_HTTP_PORT):
+        self.core = core
+        self.socket_path = socket_path if hasattr(socket, "AF_UNIX") else None
+        self.http_port = http_port
+        self.token_path = daemon_token_path(socket_path)
+        self.token = None
+        self._servers = []
+        self._connections = set()  # accepted client sockets, shut down by stop()
+        self._failures = {}  # request id -> why its lookup failed, until the reply is sent
+        self._next_id = 0
+        self._local = threading.local()  # the request id each server thread is answering
+        self._lock = threading.Lock()
+        core.lookup_service.lookup_failed.connect(self._record_failure, Qt.DirectConnection)
+
+    def _record_failure(self, word: str, reason: str):
+        # Emitted on the thread doing the lookup; failures outside a request are not kept
+        request_id = getattr(self._local, "request_id", None)
+        if request_id is not None:
+            self._failures[request_id] = reason
+
+    def track_connection(self, connection):
+        with self._lock:
+            self._connections.add(connection)
+
+    def untrack_connection(self, connection):
+        with self._lock:
+            self._connections.discard(connection)
+
+    def authorized(self, token) -> bool:
+        """True if token is this install's daemon token."""
+        if not self.token or not isinstance(token, str):
+            return False
+        return hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8"))
+
+    def handle(self, request, on_chunk=None) -> dict:
+        """Answer one request; never raises. Callers check the token first."""
+        with self._lock:
+            self._next_id += 1
+            request_id = self._local.request_id = self._next_id
+        try:
+            return self._handle(request, on_chunk)
+        finally:
+            self._local.request_id = None
+            self._failures.pop(request_id, None)
+
+    def _handle(self, request, on_chunk) -> dict:
+        if not isinstance(request, dict):
+            return {"error": "expected a JSON object"}
+        op = request.get("op")
+        language = request.get("language") or DAEMON_DEFAULT_LANGUAGE
+        try:
+            if op == "lookup":
+                word = str(request.get("word", "")).strip()
+                if not word:
+                    return {"error": "missing 'word'"}
+                reply = self.core.lookup(word, language, fresh=bool(request.get("fresh")), on_chunk=on_chunk)
+                if not reply["found"]:
+                    reply["error"] = self._failures.get(self._local.request_id, "no definition found")
+                return reply
+            if op == "prefetch":
+                words = [str(word) for word in request.get("words", [])]
+                return {"definitions": self.core.lookup_service.fetch_linguistic_info_batch(words, language)}
+            if op == "search":
+                return {"results": self.core.search(str(request.get("query", "")))}
+            if op == "save":
+                word, response = request.get("word"), request.get("response")
+                if not word or not response:
+                    return {"error": "'save' needs 'word' and 'response'"}
+                return {"saved": self.core.save(word, language, response)}
+            if op == "stats":
+                return self.core.stats()
+            if op == "headroom":
+                fraction = float(request.get("fraction", PASSAGE_PREFETCH_HEADROOM))
+                return {"headroom": self.core.groq_client.has_headroom(fraction)}
+            if op == "metrics":
+                return {"metrics": metrics.prometheus_text()}
+            if op == "profile":
+                return self._profile(request.get("action", "report"))
+            if op == "ping":
+                return {"ok": True}
+            return {"error": f"unknown op '{op}'"}
+        except Exception as e:
+            traceback.print_exc()
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    def _profile(self, action: str) -> dict:
+        """Switch the sampling profiler on or off, or report what it has seen."""
+        if action == "start":
+            profiler.start()
+        elif action == "stop":
+            profiler.stop()
+        elif action == "reset":
+            profiler.reset()
+        elif action == "folded":
+            return {"running": profiler.running, "folded": profiler.folded()}
+        elif action != "report":
+            return {"error": f"unknown profile action '{action}'"}
+        return {"running": profiler.running, "samples": profiler.samples, "report": profiler.report()}
+
+    def start(self):
+        """Start serving on background threads."""
+        self.token = daemon_token(self.token_path, create=True)
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                if DaemonClient.connect(self.socket_path) is not None:
+                    raise DaemonError(f"a lookup daemon is already listening on {self.socket_path}")
+                os.unlink(self.socket_path)  # Left behind by a daemon that did not exit cleanly
+            server = _DaemonSocketServer(self.socket_path, _DaemonSocketHandler)
+            os.chmod(self.socket_path, 0o600)
+            server.daemon = self
+            self._serve(server)
+            print(f"Serving lookups on unix:{self.socket_path}")
+        if self.http_port:
+            server = self._http_server()
+            self._serve(server)
+            print(f"Serving lookups on http://127.0.0.1:{server.server_address[1]}")
+
+    def _serve(self, server):
+        self._servers.append(server)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def _http_server(self):
+        """A localhost HTTP server for clients that cannot use the Unix socket."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import urlsplit, parse_qsl
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep connections alive between requests
+
+            def setup(self):
+                super().setup()
+                daemon.track_connection(self.connection)
+
+            def finish(self):
+                daemon.untrack_connection(self.connection)
+                super().finish()
+
+            def do_GET(self):
+                if not self._allowed():
+                    return
+                url = urlsplit(self.path)
+                op = url.path.strip("/")
+                if op not in DAEMON_HTTP_GET_OPS:
+                    self._reply({"error": f"'{op}' needs a POST"}, 405, [("Allow", "POST")])
+                    return
+                if op == "metrics":
+                    self._send(200, metrics.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4")
+                    return
+                request = dict(parse_qsl(url.query))
+                request["op"] = op
+                if "q" in request:
+                    request["query"] = request.pop("q")
+                self._reply(daemon.handle(request))
+
+            def do_POST(self):
+                if not self._allowed():
+                    return
+                try:
+                    body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                    request = json.loads(body or b"{}")
+                except ValueError as e:
+                    self._reply({"error": f"invalid JSON: {e}"})
+                    return
+                if isinstance(request, dict):
+                    request.setdefault("op", urlsplit(self.path).path.strip("/"))
+                self._reply(daemon.handle(request))
+
+            def _allowed(self) -> bool:
+                """Check Host, Origin and token; answers the request itself if they fail."""
+                host = (self.headers.get("Host") or "").split(":", 1)[0]
+                if host not in DAEMON_HTTP_HOSTS or "Origin" in self.headers:
+                    status, reply = 403, {"error": "only local clients, not web pages"}
+                else:
+                    scheme, _, token = (self.headers.get("Authorization") or "").partition(" ")
+                    if scheme.lower() == "bearer" and daemon.authorized(token.strip()):
+                        return True
+                    status, reply = 401, {"error": "missing or wrong token"}
+                # An unread request body would be taken for the next request
+                self.close_connection = True
+                self._reply(reply, status)
+                return False
+
+            def _reply(self, reply, status=None, headers=()):
+                body = json.dumps(reply, ensure_ascii=False).encode("utf-8")
+                if status is None:
+                    status = 400 if "error" in reply and "response" not in reply else 200
+                self._send(status, body, "application/json", headers)
+
+            def _send(self, status, body, content_type, headers=()):
+                self.send_response(status)
+                self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", self.http_port), Handler)
+        server.daemon_threads = True
+        return server
+
+    def stop(self):
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+        # Clients that stay connected would otherwise keep being served
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
 
 ###############################################################################
-# CLIPBOARD MONITOR WORKER
+# CLIPBOARD MONITORS
 ###############################################################################
-class ClipboardWorker(QObject):
-    data_fetched = pyqtSignal(str, str)
+# "qt" reacts to QClipboard.dataChanged (no polling), "poll" reads the clipboard
+# through pyperclip on a timer, "auto" picks "qt" where the platform delivers
+# change notifications for other applications (X11 and Windows).
+CLIPBOARD_BACKENDS = ("auto", "qt", "poll")
+CLIPBOARD_BACKEND = os.environ.get("MUNDILEX_CLIPBOARD_BACKEND", "auto")
+CLIPBOARD_POLL_INTERVAL_MS = 1000
+CLIPBOARD_POLL_MAX_INTERVAL_MS = 4000
+CLIPBOARD_POLL_BACKOFF = 1.5  # Interval multiplier after each unchanged poll
+
+def resolve_clipboard_backend(backend=CLIPBOARD_BACKEND, platform_name=None) -> str:
+    """Return the concrete clipboard backend ("qt" or "poll") to use."""
+    if backend not in CLIPBOARD_BACKENDS:
+        print(f"Unknown clipboard backend '{backend}', falling back to 'auto'.")
+        backend = "auto"
+    if backend != "auto":
+        return backend
+    if platform_name is None:
+        platform_name = QApplication.platformName() if QApplication.instance() else ""
+    return "qt" if platform_name in ("xcb", "windows") else "poll"
+
+class ClipboardMonitorBase(QObject):
+    """Shared filtering of clipboard text for every clipboard backend."""
+    word_detected = pyqtSignal(str, str)  # word, language
+    passage_detected = pyqtSignal(str, str)  # text, language (with passages_enabled)
     error_occurred = pyqtSignal(str)
 
     def __init__(self):
         super().__init__()
         self._running = False
+        self.passages_enabled = False
         self.last_text = ""
+        self.last_passage = ""
         self.current_language = "German"  # Default language
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.check_clipboard)
+
+    def is_monitoring(self) -> bool:
+        return self._running
+
+    def is_single_word(self, text):
+        """Check if the text is a single word (letters of any script, see WORD_PATTERN)."""
+        return bool(WORD_PATTERN.fullmatch(text))
+
+    def handle_text(self, text):
+        """
+        Emit word_detected if the clipboard text is a new single word, or
+        passage_detected for longer text when passages are enabled.
+        """
+        text = text.strip()
+        if text.startswith("sk-") or text.startswith("hf_"):
+            return
+
+        if len(text) <= 50:
+            # "Häuser," copied from a subtitle line is the word "Häuser"
+            with metrics.span("validation"):
+                word = word_normalizer.clean(text, self.current_language)
+                single_word = self.is_single_word(word)
+            if single_word:
+                if word.casefold() != self.last_text:
+                    self.last_text = word.casefold()
+                    print(f"New text detected: {word}")
+                    self.word_detected.emit(word, self.current_language)
+                return
+
+        if self.passages_enabled and len(text) <= PASSAGE_MAX_LENGTH and text != self.last_passage:
+            self.last_passage = text
+            if len(tokenize(text)) > 1:
+                self.passage_detected.emit(text, self.current_language)
+
+class QtClipboardMonitor(ClipboardMonitorBase):
+    """
+    Event-driven clipboard monitor. Lives on the GUI thread (QClipboard must)
+    and only reads the clipboard when Qt reports that it changed.
+    """
+
+    def __init__(self, clipboard=None):
+        super().__init__()
+        self.clipboard = clipboard if clipboard is not None else QApplication.clipboard()
 
     def start_monitoring(self, language):
-        """Start monitoring the clipboard for new single words."""
+        """Start listening for clipboard changes."""
         self.current_language = language
+        if not self._running:
+            self.clipboard.dataChanged.connect(self.check_clipboard)
         self._running = True
-        self.timer.start(1000)  # Check every second
 
     def stop_monitoring(self):
-        """Stop monitoring the clipboard."""
+        """Stop listening for clipboard changes."""
+        if self._running:
+            self.clipboard.dataChanged.disconnect(self.check_clipboard)
         self._running = False
-        self.timer.stop()
-
-    def is_single_word(self, text):
-        """Check if the text is a single word in specified languages."""
-        return bool(re.fullmatch(r"[A-Za-zäöüÄÖÜßàáâãäåçèéêëìíîïñòóôõöùúûüýÿÀÁÂÃÄÅÇÈÉÊËÌÍÎÏÑÒÓÔÕÖÙÚÛÜÝ]+", text))
 
     def check_clipboard(self):
-        """Check the clipboard for new single words."""
+        """Read the changed clipboard and hand new words to the lookup service."""
         if not self._running:
             return
         try:
-            text = pyperclip.paste().strip()
-            if text.startswith("sk-") or text.startswith("hf_") or len(text) > 50:
-                return
+            with metrics.span("clipboard_read"):
+                text = self.clipboard.text()
+            self.handle_text(text)
+        except Exception as e:
+            err_msg = f"Error checking clipboard: {e}"
+            print(err_msg)
+            traceback.print_exc()
+            self.error_occurred.emit(err_msg)
+
+class ClipboardWorker(ClipboardMonitorBase):
+    """
+    Polling clipboard monitor, used where the platform gives no change
+    notifications. Runs on its own thread; the poll interval backs off while
+    the clipboard stays unchanged and snaps back as soon as it changes.
+    """
 
-            if self.is_single_word(text) and text.lower() != self.last_text.lower():
-                self.last_text = text.lower()
-                print(f"New text detected: {text}")
+    def __init__(self, interval_ms=CLIPBOARD_POLL_INTERVAL_MS,
+                 max_interval_ms=CLIPBOARD_POLL_MAX_INTERVAL_MS, backoff=CLIPBOARD_POLL_BACKOFF):
+        super().__init__()
+        self.interval_ms = interval_ms
+        self.max_interval_ms = max(interval_ms, max_interval_ms)
+        self.backoff = backoff
+        self._last_raw = None
+        # Parented so moveToThread() takes the timer along to the worker thread
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.check_clipboard)
 
-                # Fetch linguistic information using Llama AI via Groq
-                response = self.fetch_linguistic_info(text, self.current_language)
+    def start_monitoring(self, language=None):
+        """Start monitoring the clipboard for new single words."""
+        if language is not None:
+            self.current_language = language
+        self._running = True
+        self.timer.start(self.interval_ms)
 
-                # Emit the fetched data along with the language
-                self.data_fetched.emit(text, response)
+    def stop_monitoring(self):
+        """Stop monitoring the clipboard. Safe to call from any thread."""
+        self._running = False
+        if QThread.currentThread() is self.thread():
+            self.timer.stop()
+        else:
+            QtCore.QMetaObject.invokeMethod(self.timer, "stop", Qt.QueuedConnection)
 
-                # Desktop notification
-                show_notification("Linguistic Information", response)
+    def check_clipboard(self):
+        """Check the clipboard for new single words and hand them to the lookup service."""
+        if not self._running:
+            return
+        try:
+            import pyperclip
+            with metrics.span("clipboard_read"):
+                raw = pyperclip.paste()
+            if raw == self._last_raw:
+                interval = min(int(self.timer.interval() * self.backoff), self.max_interval_ms)
+            else:
+                self._last_raw = raw
+                interval = self.interval_ms
+                self.handle_text(raw)
+            if interval != self.timer.interval():
+                self.timer.setInterval(interval)
         except Exception as e:
             err_msg = f"Error checking clipboard: {e}"
             print(err_msg)
             traceback.print_exc()
             self.error_occurred.emit(err_msg)
 
-    def fetch_linguistic_info(self, word: str, language: str) -> str:
-        """
-        Fetch linguistic information using Llama AI via Groq.
-        Returns the raw response string.
-        """
-        try:
-            global client, chat_history
-            global_initialized = 'client' in globals() and 'chat_history' in globals()
-            if not global_initialized:
-                client = Groq(api_key=GROQ_API_KEY)
-                chat_history = [{
-                    "role": "system",
-                    "content": "You are a helpful assistant specializing in multiple languages. Provide clear and concise definitions, synonyms, antonyms, and example sentences in the specified language."
-                }]
-            
-            user_message = {
-                "role": "user",
-                "content": f"Provide the definition, synonyms, antonyms, and example sentences for the word '{word}' in {language}. Format your response clearly. and whatever the language is I want you to speak in that language. also seperate your different resonses in different lines at least 2 lines space . and do not say hi or what you are about to do or any extra things just what you are asked to do"
-            }
+###############################################################################
+# ERROR REPORTING
+###############################################################################
+ERROR_REPORT_DELAY_MS = 1500  # Failures within this window are reported together
+ERROR_REPORT_MAX_WORDS = 3
 
-            # Append user message to chat history
-            chat_history.append(user_message)
+class ErrorAggregator(QObject):
+    """
+    Collects lookup failures and reports them as one summary per burst,
+    e.g. "Could not look up 'Haus', 'Baum' and 2 more: rate limited by
+    Groq (HTTP 429)", instead of one dialog per failed word. Lives on the
+    GUI thread; failures from worker threads arrive as queued signals.
+    """
+    summary_ready = pyqtSignal(str)
 
-            # Request response from Llama AI
-            response = client.chat.completions.create(
-                model="llama3-70b-8192",
-                messages=chat_history,
-                max_tokens=500,
-                temperature=0.7
-            )
+    def __init__(self, delay_ms=ERROR_REPORT_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self._failures = {}  # reason -> subjects, in arrival order
+        self.reported = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay_ms)
+        self.timer.timeout.connect(self.flush)
 
-            assistant_message = response.choices[0].message.content.strip()
-            print(f"Assistant:\n{assistant_message}")
+    def add(self, subject: str, reason: str):
+        subjects = self._failures.setdefault(reason, [])
+        if subject not in subjects:
+            subjects.append(subject)
+        if not self.timer.isActive():
+            self.timer.start()
 
-            # Append assistant response to chat history
-            chat_history.append({
-                "role": "assistant",
-                "content": assistant_message
-            })
+    def flush(self):
+        if not self._failures:
+            return
+        parts = []
+        for reason, subjects in self._failures.items():
+            shown = ", ".join(f"'{subject}'" for subject in subjects[:ERROR_REPORT_MAX_WORDS])
+            if len(subjects) > ERROR_REPORT_MAX_WORDS:
+                shown += f" and {len(subjects) - ERROR_REPORT_MAX_WORDS} more"
+            parts.append(f"{shown}: {reason}")
+        self._failures = {}
+        self.reported += 1
+        self.summary_ready.emit("Could not look up " + "; ".join(parts))
 
-            return assistant_message
+###############################################################################
+# METRICS PANEL
+###############################################################################
+METRICS_PANEL_REFRESH_MS = 1000
 
-        except Exception as e:
-            err_msg = f"Error fetching linguistic info for '{word}': {e}"
-            print(err_msg)
-            traceback.print_exc()
-            self.error_occurred.emit(err_msg)
-            return "Definition not available."
+class MetricsPanel(QDialog):
+    """
+    Debug panel: the span histograms, the counters of the lookup core and
+    the sampling profiler, which can be switched on and off here. Refreshes
+    itself while it is open.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("MundiLex Metrics")
+        self.resize(900, 650)
+        layout = QVBoxLayout(self)
+
+        self.text = QTextEdit(self)
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QTextEdit.NoWrap)
+        font = QFont("Monospace", 11)
+        font.setStyleHint(QFont.TypeWriter)
+        self.text.setFont(font)
+        layout.addWidget(self.text)
+
+        buttons_layout = QHBoxLayout()
+        self.profiler_toggle = QCheckBox("Sampling Profiler", self)
+        self.profiler_toggle.setChecked(profiler.running)
+        self.profiler_toggle.setToolTip(f"Sample every thread's stack every {profiler.interval * 1000:g} ms")
+        self.profiler_toggle.stateChanged.connect(self.toggle_profiler)
+        buttons_layout.addWidget(self.profiler_toggle)
+        buttons_layout.addStretch()
+        for label, slot in (
+            ("Save Profile...", self.save_profile),
+            ("Save Metrics...", self.save_metrics),
+            ("Reset", self.reset),
+            ("Close", self.close),
+        ):
+            button = QPushButton(label, self)
+            button.clicked.connect(slot)
+            buttons_layout.addWidget(button)
+        layout.addLayout(buttons_layout)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(METRICS_PANEL_REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.timer.stop()
+
+    def refresh(self):
+        lines = [f"{'span':<18} {'count':>7} {'mean':>10} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}"]
+        for name, histogram in metrics.histograms().items():
+            snapshot = histogram.snapshot()
+            if not snapshot["count"]:
+                continue
+            columns = [snapshot["sum"] / snapshot["count"], histogram.quantile(0.5), histogram.quantile(0.95),
+                       histogram.quantile(0.99), snapshot["max"]]
+            lines.append(f"{name:<18} {snapshot['count']:>7} " + " ".join(f"{v * 1000:7.2f} ms" for v in columns))
+        lines += ["", "Counters"]
+        prefix = len(metrics.prefix) + 1
+        lines += [f"  {key[prefix:]:<40} {value:g}" if not isinstance(value, str) else f"  {key[prefix:]:<40} {value}"
+                  for key, value in metrics.values().items()]
+        lines += ["", "Profiler", profiler.report()]
+        scroll = self.text.verticalScrollBar().value()
+        self.text.setPlainText("\n".join(lines))
+        self.text.verticalScrollBar().setValue(scroll)
+
+    def toggle_profiler(self, state):
+        if state == Qt.Checked:
+            profiler.start()
+        else:
+            profiler.stop()
+        self.refresh()
+
+    def save_profile(self):
+        """Save the profiler's samples as folded stacks (for flamegraph.pl or speedscope)."""
+        path, _ = QFileDialog.getSaveFileName(self, "Save Profile", "mundilex-profile.folded",
+                                              "Folded stacks (*.folded *.txt)")
+        if not path:
+            return
+        try:
+            profiler.write_folded(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to save the profile: {e}")
+
+    def save_metrics(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Metrics", "mundilex.prom", "Prometheus text (*.prom *.txt)")
+        if not path:
+            return
+        try:
+            metrics.write(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to save the metrics: {e}")
+
+    def reset(self):
+        metrics.reset()
+        profiler.reset()
+        self.refresh()
 
 ###############################################################################
 # MAIN APPLICATION WINDOW
@@ -205,49 +4373,146 @@ class SmartDictionaryApp(QMainWindow):
         self.setMinimumSize(1000, 700)
         self.setWindowIcon(QIcon("dictionary_icon.png"))  # Optional: Add a dictionary icon
 
-        # Initialize Groq client
-        try:
-            global client, chat_history
-            client = Groq(api_key=self.api_key)
-            chat_history = [{
-                "role": "system",
-                "content": "You are a helpful assistant specializing in multiple languages. Provide clear and concise definitions, synonyms, antonyms, and example sentences in the specified language."
-            }]
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to initialize Groq client: {e}")
-            sys.exit(1)
+        # Cache, Groq client, lookups and store; lookups go to a running
+        # `Mundilux.py serve` daemon if there is one
+        startup_profile.mark("window setup")
+        daemon = DaemonClient.connect() if DAEMON_MODE != "off" else None
+        self.core = LookupCore(api_key=self.api_key, daemon=daemon)
+        self.groq_client = self.core.groq_client
+        self.definition_cache = self.core.definition_cache
+        self.conversation_context = self.core.conversation_context
+        self.store = self.core.store
+        if daemon is not None:
+            self.statusBar().showMessage(f"Lookups are answered by the daemon at {daemon.path}")
+        startup_profile.mark("lookup core")
 
-        # Load saved data
-        self.data_store = load_vocab_data()
-        self.vocab_list_data = self.data_store.get("vocab_list", [])
-        self.favorites = self.data_store.get("favorites", [])
+        # Asynchronous lookups; results arrive through signals on the GUI thread
+        self.lookup_service = self.core.lookup_service
+        self.lookup_service.lookup_finished.connect(self.handle_lookup_finished)
+        self.lookup_service.lookup_chunk.connect(self.handle_lookup_chunk)
+        # Lookup failures are summarized in the status bar, never one dialog per word
+        self.error_aggregator = ErrorAggregator(parent=self)
+        self.error_aggregator.summary_ready.connect(self.handle_lookup_errors)
+        self.lookup_service.lookup_failed.connect(self.error_aggregator.add)
+        self.lookup_service.passage_prefetched.connect(self.handle_passage_prefetched)
+        self.lookup_service.tokens_used.connect(self.handle_tokens_used)
 
-        # Initialize flashcards
-        self.current_flashcard = -1
-        self.flashcards = []
+        # The saved data is loaded after the first paint (load_saved_data)
+        self.flashcard_index = FlashcardIndex()
+        self.favorites = []
+        self.saved_data_loaded = False
+
+        # Text-to-speech on its own thread; the engine is created on the first pronunciation
+        self.sound = None
+        self.speech = SpeechService()
+        self.speech.voice_missing.connect(self.handle_voice_missing)
+        self.speech.play_file.connect(self.play_cached_audio)
+        self.speech.stop_playback.connect(self.stop_cached_audio)
+        self.speech.error_occurred.connect(self.handle_error)
+        startup_profile.mark("speech service")
+
+        # Background import/export, one at a time
+        self.transfer_thread = None
+        self.transfer_worker = None
+
+        # Initialize flashcards and their review schedule
+        self.current_flashcard = None
+        self.scheduler = ReviewScheduler()
 
         # Initialize current language
         self.current_language = "German"
 
+        # Request whose result info_display is waiting for, and the one streaming into it
+        self.displayed_request_id = None
+        self.streaming_request_id = None
+
+        # Prefetch unknown words of copied passages (opt-in)
+        self.passage_prefetch = PASSAGE_PREFETCH
+
         # Initialize worker and thread
+        self.clipboard_backend = resolve_clipboard_backend()
+        print(f"Clipboard backend: {self.clipboard_backend}")
         self.init_worker()
+        startup_profile.mark("clipboard monitor")
 
         # Initialize UI
         self.initUI()
+        startup_profile.mark("build UI")
+
+        # Debug panel (F12), created when first opened
+        self.metrics_panel = None
+        QtWidgets.QShortcut(QtGui.QKeySequence("F12"), self, activated=self.show_metrics_panel)
+        # Prometheus text file for an external scraper
+        if METRICS_FILE:
+            self.metrics_timer = QTimer(self)
+            self.metrics_timer.timeout.connect(write_metrics_file)
+            self.metrics_timer.start(METRICS_WRITE_INTERVAL_MS)
+
+    def warm_normalizer(self):
+        """Load the lemmatizer for the current language in the background."""
+        threading.Thread(
+            target=word_normalizer.warm, args=(self.current_language,), name="WarmLemmatizer", daemon=True
+        ).start()
+
+    def showEvent(self, event):
+        """Load the saved data once the window has been painted for the first time."""
+        super().showEvent(event)
+        if not self.saved_data_loaded:
+            self.saved_data_loaded = True
+            QTimer.singleShot(0, self.load_saved_data)
+
+    def load_saved_data(self):
+        """Load flashcards, favorites and review states, then populate the lists."""
+        startup_profile.mark("first paint")
+        try:
+            self.flashcard_index = FlashcardIndex(self.store.load_flashcards())
+            self.favorites = self.store.load_favorites()
+            self.scheduler = ReviewScheduler(self.store.load_review_states())
+        except Exception as e:
+            err_msg = f"Failed to load saved data: {e}"
+            print(err_msg)
+            traceback.print_exc()
+            QMessageBox.critical(self, "Error", err_msg)
+        startup_profile.mark("load saved data")
+
+        self.populate_saved_flashcards()
+        self.populate_favorites()
+        self.load_flashcards()
+        startup_profile.mark("populate lists")
+        self.warm_normalizer()
+        if startup_profile.enabled:
+            startup_profile.report()
 
     def init_worker(self):
-        """Initialize the clipboard monitoring worker and thread."""
-        self.worker = ClipboardWorker()
+        """Initialize the clipboard monitor (and its thread for the polling backend)."""
+        if self.clipboard_backend == "qt":
+            self.worker = QtClipboardMonitor()
+            self.thread = None
+        else:
+            self.worker = ClipboardWorker()
+            self.thread = QThread()
+            self.worker.moveToThread(self.thread)
         self.worker.current_language = self.current_language
-        self.thread = QThread()
-        self.worker.moveToThread(self.thread)
+        self.worker.passages_enabled = self.passage_prefetch
 
         # Connect signals and slots
-        self.worker.data_fetched.connect(self.handle_data_fetched)
+        self.worker.word_detected.connect(self.handle_word_detected)
+        self.worker.passage_detected.connect(self.handle_passage_detected)
         self.worker.error_occurred.connect(self.handle_error)
 
-        self.thread.started.connect(lambda: self.worker.start_monitoring(self.current_language))
-        self.thread.start()
+        if self.thread is None:
+            self.worker.start_monitoring(self.current_language)
+        else:
+            # Bound method (not a lambda) so the slot runs in the worker thread
+            self.thread.started.connect(self.worker.start_monitoring)
+            self.thread.start()
+
+    def stop_worker(self):
+        """Stop the clipboard monitor and wait for its thread to exit."""
+        self.worker.stop_monitoring()
+        if self.thread is not None:
+            self.thread.quit()
+            self.thread.wait()
 
     def initUI(self):
         """Set up the main user interface."""
@@ -316,6 +4581,15 @@ class SmartDictionaryApp(QMainWindow):
         self.clipboard_toggle.stateChanged.connect(self.toggle_clipboard)
         top_layout.addWidget(self.clipboard_toggle)
 
+        # Passage prefetch toggle
+        self.passage_toggle = QCheckBox("Prefetch from Passages", self)
+        self.passage_toggle.setChecked(self.passage_prefetch)
+        self.passage_toggle.setFont(QFont("Segoe UI", 14))
+        self.passage_toggle.setStyleSheet("color: #ecf0f1;")
+        self.passage_toggle.setToolTip("Define the unknown words of copied sentences in the background")
+        self.passage_toggle.stateChanged.connect(self.toggle_passage_prefetch)
+        top_layout.addWidget(self.passage_toggle)
+
         # Search Bar
         search_label = QLabel("Search Word:", self)
         search_label.setFont(QFont("Segoe UI", 14))
@@ -404,6 +4678,24 @@ class SmartDictionaryApp(QMainWindow):
         favorite_btn.clicked.connect(self.toggle_favorite)
         import_export_layout.addWidget(favorite_btn)
 
+        # Metrics Button
+        metrics_btn = QPushButton("Metrics", self)
+        metrics_btn.setFont(QFont("Segoe UI", 14))
+        metrics_btn.setToolTip("Lookup timings, counters and the sampling profiler (F12)")
+        metrics_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #7f8c8d;
+                color: #ffffff;
+                border-radius: 10px;
+                padding: 10px 20px;
+            }
+            QPushButton:hover {
+                background-color: #636e72;
+            }
+        """)
+        metrics_btn.clicked.connect(self.show_metrics_panel)
+        import_export_layout.addWidget(metrics_btn)
+
         # Grid for content
         content_layout = QHBoxLayout()
         content_layout.setSpacing(30)
@@ -445,6 +4737,8 @@ class SmartDictionaryApp(QMainWindow):
             border-radius: 10px;
             padding: 15px;
         """)
+        # Search highlights belong to the card they were made for
+        self.info_display.textChanged.connect(self.clear_search_highlights)
         linguistic_info_layout.addWidget(self.info_display)
 
         # Pronunciation and Save Buttons
@@ -466,6 +4760,40 @@ class SmartDictionaryApp(QMainWindow):
         pronounce_btn.clicked.connect(self.pronounce_word)
         buttons_layout.addWidget(pronounce_btn)
 
+        stop_speech_btn = QPushButton("Stop", self)
+        stop_speech_btn.setFont(QFont("Segoe UI", 14))
+        stop_speech_btn.setToolTip("Stop the pronunciation")
+        stop_speech_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #7f8c8d;
+                color: #ffffff;
+                border-radius: 10px;
+                padding: 10px 25px;
+            }
+            QPushButton:hover {
+                background-color: #636e72;
+            }
+        """)
+        stop_speech_btn.clicked.connect(self.stop_pronunciation)
+        buttons_layout.addWidget(stop_speech_btn)
+
+        refresh_btn = QPushButton("Refresh", self)
+        refresh_btn.setFont(QFont("Segoe UI", 14))
+        refresh_btn.setToolTip("Discard the cached definition and fetch it again")
+        refresh_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #3498db;
+                color: #ffffff;
+                border-radius: 10px;
+                padding: 10px 25px;
+            }
+            QPushButton:hover {
+                background-color: #2980b9;
+            }
+        """)
+        refresh_btn.clicked.connect(self.refresh_definition)
+        buttons_layout.addWidget(refresh_btn)
+
         save_btn = QPushButton("Add to Flashcards", self)
         save_btn.setFont(QFont("Segoe UI", 14))
         save_btn.setStyleSheet("""
@@ -540,6 +4868,49 @@ class SmartDictionaryApp(QMainWindow):
 
         flashcards_layout.addLayout(flashcards_btn_layout)
 
+        # Review grades (SM-2) and bulk rescheduling
+        grades_layout = QHBoxLayout()
+        for label, grade, color, hover in (
+            ("Again", GRADE_AGAIN, "#e74c3c", "#c0392b"),
+            ("Hard", GRADE_HARD, "#e67e22", "#d35400"),
+            ("Good", GRADE_GOOD, "#27ae60", "#1e8449"),
+            ("Easy", GRADE_EASY, "#16a085", "#138d75"),
+        ):
+            grade_btn = QPushButton(label, self)
+            grade_btn.setFont(QFont("Segoe UI", 12))
+            grade_btn.setStyleSheet(f"""
+                QPushButton {{
+                    background-color: {color};
+                    color: #ffffff;
+                    border-radius: 10px;
+                    padding: 8px 12px;
+                }}
+                QPushButton:hover {{
+                    background-color: {hover};
+                }}
+            """)
+            grade_btn.clicked.connect(lambda _, grade=grade: self.grade_flashcard(grade))
+            grades_layout.addWidget(grade_btn)
+
+        reschedule_btn = QPushButton("Reschedule", self)
+        reschedule_btn.setFont(QFont("Segoe UI", 12))
+        reschedule_btn.setToolTip(f"Spread all overdue cards over the next {RESCHEDULE_SPREAD_DAYS} days")
+        reschedule_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #8e44ad;
+                color: #ffffff;
+                border-radius: 10px;
+                padding: 8px 12px;
+            }
+            QPushButton:hover {
+                background-color: #71368a;
+            }
+        """)
+        reschedule_btn.clicked.connect(self.reschedule_flashcards)
+        grades_layout.addWidget(reschedule_btn)
+
+        flashcards_layout.addLayout(grades_layout)
+
         content_layout.addWidget(flashcards_group, 2)
 
         #######################################################################
@@ -549,15 +4920,33 @@ class SmartDictionaryApp(QMainWindow):
         saved_flashcards_layout = QVBoxLayout()
         saved_flashcards_group.setLayout(saved_flashcards_layout)
 
-        # List Widget to display saved flashcards
-        self.saved_flashcards_list = QListWidget()
+        # Search-as-you-type over saved words and their stored responses
+        self.flashcard_filter = QLineEdit(self)
+        self.flashcard_filter.setPlaceholderText("Search flashcards...")
+        self.flashcard_filter.setClearButtonEnabled(True)
+        self.flashcard_filter.setFont(QFont("Segoe UI", 14))
+        self.flashcard_filter.setStyleSheet("""
+            background-color: #ecf0f1;
+            color: #2c3e50;
+            border-radius: 10px;
+            padding: 5px;
+        """)
+        self.flashcard_filter.textChanged.connect(self.apply_flashcard_filter)
+        saved_flashcards_layout.addWidget(self.flashcard_filter)
+
+        # Virtualized list view of saved flashcards
+        self.saved_flashcards_model = LazyListModel(flashcard_label, parent=self)
+        self.saved_flashcards_list = QListView()
+        self.saved_flashcards_list.setModel(self.saved_flashcards_model)
+        self.saved_flashcards_list.setUniformItemSizes(True)
+        self.saved_flashcards_list.setSelectionMode(QListView.ExtendedSelection)
         self.saved_flashcards_list.setFont(QFont("Segoe UI", 14))
         self.saved_flashcards_list.setStyleSheet("""
             background-color: #ecf0f1;
             color: #2c3e50;
             border-radius: 10px;
         """)
-        self.saved_flashcards_list.itemClicked.connect(self.display_flashcard)
+        self.saved_flashcards_list.clicked.connect(self.display_flashcard)
         saved_flashcards_layout.addWidget(self.saved_flashcards_list)
 
         # Remove Button
@@ -586,15 +4975,19 @@ class SmartDictionaryApp(QMainWindow):
         favorites_layout = QVBoxLayout()
         favorites_group.setLayout(favorites_layout)
 
-        # List Widget to display favorite words
-        self.favorites_list = QListWidget()
+        # Virtualized list view of favorite words
+        self.favorites_model = LazyListModel(parent=self)
+        self.favorites_list = QListView()
+        self.favorites_list.setModel(self.favorites_model)
+        self.favorites_list.setUniformItemSizes(True)
+        self.favorites_list.setSelectionMode(QListView.ExtendedSelection)
         self.favorites_list.setFont(QFont("Segoe UI", 14))
         self.favorites_list.setStyleSheet("""
             background-color: #ecf0f1;
             color: #2c3e50;
             border-radius: 10px;
         """)
-        self.favorites_list.itemClicked.connect(self.display_favorite)
+        self.favorites_list.clicked.connect(self.display_favorite)
         favorites_layout.addWidget(self.favorites_list)
 
         # Remove Favorite Button
@@ -624,43 +5017,101 @@ class SmartDictionaryApp(QMainWindow):
         content_layout.setStretch(2, 1)  # Saved Flashcards
         content_layout.setStretch(3, 1)  # Favorites
 
-        # Populate UI from saved data
-        self.populate_saved_flashcards()
-        self.populate_favorites()
-        self.load_flashcards()
-
     ###########################################################################
     # VOCABULARY & DATA STORE
     ###########################################################################
     def populate_saved_flashcards(self):
-        """Populate the saved flashcards list widget from self.vocab_list_data."""
-        self.saved_flashcards_list.clear()
-        for flashcard in self.vocab_list_data:
-            display_text = f"{flashcard['word']} - {flashcard['language']}"
-            item = QListWidgetItem(display_text)
-            self.saved_flashcards_list.addItem(item)
+        """Reload the saved flashcards list model from self.flashcard_index."""
+        self.saved_flashcards_model.set_items(self.flashcard_index)
+
+    def apply_flashcard_filter(self):
+        """Show only the saved flashcards matching the search box (all of them if it's empty)."""
+        query = self.flashcard_filter.text()
+        if not VocabStore.search_terms(query):
+            self.populate_saved_flashcards()
+            return
+        matches = (self.flashcard_index.get(word, language) for word, language in self.store.search_flashcards(query))
+        self.saved_flashcards_model.set_items([flashcard for flashcard in matches if flashcard])
+
+    def highlight_search_terms(self):
+        """Highlight the words of info_display that match the flashcard search box."""
+        terms = VocabStore.search_terms(self.flashcard_filter.text())
+        selections = []
+        if terms:
+            pattern = QRegularExpression(
+                r"\b(?:" + "|".join(QRegularExpression.escape(term) for term in terms) + r")\w*",
+                QRegularExpression.CaseInsensitiveOption | QRegularExpression.UseUnicodePropertiesOption
+            )
+            highlight = QTextCharFormat()
+            highlight.setBackground(QColor("#f9e79f"))
+            document = self.info_display.document()
+            cursor = document.find(pattern)
+            while not cursor.isNull():
+                selection = QTextEdit.ExtraSelection()
+                selection.cursor = cursor
+                selection.format = highlight
+                selections.append(selection)
+                cursor = document.find(pattern, cursor)
+        self.info_display.setExtraSelections(selections)
+
+    def clear_search_highlights(self):
+        if self.info_display.extraSelections():
+            self.info_display.setExtraSelections([])
 
     def populate_favorites(self):
-        """Populate the favorites list widget from self.favorites."""
-        self.favorites_list.clear()
-        for word in self.favorites:
-            item = QListWidgetItem(word)
-            self.favorites_list.addItem(item)
-
-    def save_data_store(self):
-        """Save data store (vocab, favorites) to JSON."""
-        self.data_store["vocab_list"] = self.vocab_list_data
-        self.data_store["favorites"] = self.favorites
-        save_vocab_data(self.data_store)
+        """Reload the favorites list model from self.favorites."""
+        self.favorites_model.set_items(self.favorites)
 
     ###########################################################################
     # EVENT HANDLERS
     ###########################################################################
     def handle_data_fetched(self, word: str, response: str):
         """Handle new data fetched from clipboard or search."""
+        with metrics.span("rendering"):
+            self.main_word_display.setText(word)
+            formatted_response = response.replace('\n\n', '<br><br>').replace('\n', '<br>')
+            self.info_display.setHtml(f"<p>{formatted_response}</p>")
+
+    def request_lookup(self, word: str, source: str):
+        """Queue a lookup for a word and show a placeholder until it completes."""
         self.main_word_display.setText(word)
-        formatted_response = response.replace('\n\n', '<br><br>').replace('\n', '<br>')
-        self.info_display.setHtml(f"<p>{formatted_response}</p>")
+        self.info_display.setHtml("<p><i>Fetching definition...</i></p>")
+        self.displayed_request_id = self.lookup_service.submit(word, self.current_language, source)
+
+    def handle_word_detected(self, word: str, language: str):
+        """Handle a new word copied to the clipboard."""
+        self.request_lookup(word, "clipboard")
+
+    def handle_lookup_chunk(self, request_id: int, word: str, text: str):
+        """Append streamed text of the displayed lookup to info_display."""
+        if request_id != self.displayed_request_id:
+            return
+        with metrics.span("rendering_chunk"):
+            if self.streaming_request_id != request_id:
+                # First chunk replaces the placeholder
+                self.streaming_request_id = request_id
+                self.info_display.clear()
+            self.info_display.moveCursor(QtGui.QTextCursor.End)
+            self.info_display.insertPlainText(text)
+
+    def handle_lookup_finished(self, request_id: int, source: str, word: str, response: str):
+        """Display the result of an asynchronous lookup."""
+        if request_id != self.displayed_request_id:
+            return
+        self.streaming_request_id = None
+        self.handle_data_fetched(word, response)
+
+    def handle_tokens_used(self, word: str, prompt_tokens: int, completion_tokens: int):
+        """Show the token counts of the last request in the status bar."""
+        self.statusBar().showMessage(
+            f"'{word}': {prompt_tokens} prompt + {completion_tokens} completion tokens "
+            f"({self.conversation_context.mode} context)"
+        )
+
+    def handle_lookup_errors(self, summary: str):
+        """Show a summary of recent lookup failures without interrupting the user."""
+        print(summary)
+        self.statusBar().showMessage(summary, 10000)
 
     def handle_error(self, error_message: str):
         """Handle errors from the worker thread."""
@@ -672,11 +5123,10 @@ class SmartDictionaryApp(QMainWindow):
     def change_language(self, language):
         """Handle language change from the combo box."""
         self.current_language = language
+        self.warm_normalizer()
         if self.clipboard_toggle.isChecked():
             # Restart clipboard monitoring with new language
-            self.worker.stop_monitoring()
-            self.thread.quit()
-            self.thread.wait()
+            self.stop_worker()
 
             # Initialize a new worker and thread
             self.init_worker()
@@ -688,13 +5138,28 @@ class SmartDictionaryApp(QMainWindow):
         """Enable or disable clipboard monitoring."""
         if state == Qt.Checked:
             # Enable clipboard monitoring
-            if not self.thread.isRunning():
+            if not self.worker.is_monitoring():
                 self.init_worker()
         else:
             # Disable clipboard monitoring
-            self.worker.stop_monitoring()
-            self.thread.quit()
-            self.thread.wait()
+            self.stop_worker()
+
+    def toggle_passage_prefetch(self, state):
+        """Enable or disable prefetching the unknown words of copied passages."""
+        self.passage_prefetch = state == Qt.Checked
+        self.worker.passages_enabled = self.passage_prefetch
+
+    def handle_passage_detected(self, text: str, language: str):
+        """Prefetch the likely unknown words of a copied passage in the background."""
+        self.lookup_service.prefetch_passage(text, language, is_known=self.is_known_word)
+
+    def is_known_word(self, word: str) -> bool:
+        """True if the word is in the flashcard deck (called from pool threads)."""
+        return (word, self.current_language) in self.flashcard_index
+
+    def handle_passage_prefetched(self, language: str, count: int):
+        if count:
+            self.statusBar().showMessage(f"{count} words from the copied passage are ready", 5000)
 
     ###########################################################################
     # SEARCH FUNCTIONALITY
@@ -706,62 +5171,56 @@ class SmartDictionaryApp(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please enter a word to search.")
             return
 
-        # Fetch linguistic information using Llama AI via Groq
-        response = self.worker.fetch_linguistic_info(word, self.current_language)
+        # Fetch linguistic information off the GUI thread
+        self.request_lookup(word, "search")
 
-        # Display fetched data
-        self.handle_data_fetched(word, response)
+    def refresh_definition(self):
+        """Invalidate the cached definition of the current word and fetch it again."""
+        word = self.main_word_display.text().strip()
+        if not word or word == "-":
+            QMessageBox.warning(self, "Warning", "No word information available to refresh.")
+            return
+
+        self.definition_cache.invalidate(word, self.current_language)
+        self.request_lookup(word, "refresh")
 
     ###########################################################################
     # PRONUNCIATION
     ###########################################################################
     def pronounce_word(self):
-        """Pronounce the content displayed in info_display."""
+        """Pronounce the content displayed in info_display on the speech service thread."""
         content = self.info_display.toPlainText().strip()
-        if not content or content == "Definition not available.":
+        if not content or content == DEFINITION_NOT_AVAILABLE:
             QMessageBox.warning(self, "Warning", "No content available for pronunciation.")
             return
+        self.speech.speak(content, self.current_language)
+
+    def stop_pronunciation(self):
+        """Stop speaking and drop queued utterances."""
+        self.speech.stop()
 
+    def handle_voice_missing(self, language: str):
+        self.statusBar().showMessage(f"{language} voice not found. Using default voice.", 5000)
+
+    def play_cached_audio(self, path: str):
+        """Replay a cached pronunciation (GUI thread)."""
         try:
-            engine = pyttsx3.init()
-            engine.setProperty('rate', 150)
-            engine.setProperty('volume', 0.9)
-            # Attempt to set language-specific voice
-            voices = engine.getProperty('voices')
-            language_code = self.get_language_code(self.current_language)
-            language_voice_found = False
-            for voice in voices:
-                if hasattr(voice, 'languages'):
-                    languages = voice.languages
-                    for lang in languages:
-                        try:
-                            if language_code in lang.decode('utf-8').lower():
-                                engine.setProperty('voice', voice.id)
-                                language_voice_found = True
-                                break
-                        except:
-                            continue
-                if language_voice_found:
-                    break
-            if not language_voice_found:
-                QMessageBox.warning(self, "Warning", 
-                                    f"{self.current_language} voice not found. Using default voice.")
-            engine.say(content)
-            engine.runAndWait()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error during pronunciation: {e}")
+            from PyQt5.QtMultimedia import QSound
+        except ImportError:
+            print("QtMultimedia is not available; cannot play cached audio.")
+            return
+        if self.sound is not None:
+            self.sound.stop()
+        self.sound = QSound(path, self)
+        self.sound.play()
+
+    def stop_cached_audio(self):
+        if self.sound is not None:
+            self.sound.stop()
 
     def get_language_code(self, language):
         """Return language code based on selected language."""
-        language_codes = {
-            "German": "de",
-            "English": "en",
-            "French": "fr",
-            "Italian": "it",
-            "Spanish": "es",
-            "Russian": "ru"
-        }
-        return language_codes.get(language, "en")
+        return LANGUAGE_CODES.get(language, "en")
 
     ###########################################################################
     # VOCABULARY ACTIONS
@@ -776,6 +5235,13 @@ class SmartDictionaryApp(QMainWindow):
             )
             return
 
+        if self.lookup_service.is_busy():
+            QMessageBox.warning(
+                self, "Warning",
+                "The definition is still being fetched. Please try again in a moment."
+            )
+            return
+
         # Extract information from the info_display
         info_html = self.info_display.toHtml()
         if not info_html:
@@ -791,21 +5257,24 @@ class SmartDictionaryApp(QMainWindow):
             response = self.info_display.toPlainText().strip()
 
             # Check if the word already exists in flashcards
-            existing_words = [fc['word'] for fc in self.vocab_list_data]
-            if word not in existing_words:
+            if (word, self.current_language) not in self.flashcard_index:
                 # Create a comprehensive flashcard entry
                 flashcard = {
                     "word": word,
                     "language": self.current_language,
                     "response": response
                 }
-                self.vocab_list_data.append(flashcard)
+                self.flashcard_index.add(flashcard)
+                self.store.add_flashcard(flashcard)
+                self.scheduler.add(FlashcardIndex.key(word, self.current_language))
+                if self.flashcard_filter.text():
+                    self.apply_flashcard_filter()
+                else:
+                    self.saved_flashcards_model.append(flashcard)
                 QMessageBox.information(
                     self, "Added", 
                     f"'{word}' has been added to your flashcards."
                 )
-                self.populate_saved_flashcards()
-                self.save_data_store()
             else:
                 QMessageBox.warning(
                     self, "Already Exists", 
@@ -815,37 +5284,81 @@ class SmartDictionaryApp(QMainWindow):
             QMessageBox.critical(self, "Error", f"Error saving flashcard: {e}")
 
     def import_flashcards(self):
-        """Import flashcards from a JSON file."""
+        """Import flashcards from a JSON or JSON Lines file in the background."""
         options = QFileDialog.Options()
-        file_name, _ = QFileDialog.getOpenFileName(self,"Import Flashcards","","JSON Files (*.json);;All Files (*)", options=options)
+        file_name, _ = QFileDialog.getOpenFileName(self,"Import Flashcards","","JSON Files (*.json *.jsonl);;All Files (*)", options=options)
         if file_name:
-            try:
-                with open(file_name, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                imported_flashcards = data.get("vocab_list", [])
-                # Validate and add
-                new_entries = 0
-                for flashcard in imported_flashcards:
-                    if flashcard['word'] not in [fc['word'] for fc in self.vocab_list_data]:
-                        self.vocab_list_data.append(flashcard)
-                        new_entries +=1
-                QMessageBox.information(self, "Imported", f"Imported {new_entries} new flashcards.")
-                self.populate_saved_flashcards()
-                self.save_data_store()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to import flashcards: {e}")
+            worker = FlashcardImportWorker(self.store, file_name, self.current_language)
+            worker.batch_imported.connect(self.handle_flashcards_imported)
+            worker.finished.connect(self.handle_import_finished)
+            self.start_transfer(worker, "Importing flashcards...")
+
+    def handle_flashcards_imported(self, flashcards: list):
+        """Add a batch of flashcards committed by the import worker to the index and list."""
+        for flashcard in flashcards:
+            self.flashcard_index.add(flashcard)
+            self.scheduler.add(FlashcardIndex.key(flashcard['word'], flashcard['language']))
+        if self.flashcard_filter.text():
+            self.apply_flashcard_filter()
+        else:
+            self.saved_flashcards_model.extend(flashcards)
+
+    def handle_import_finished(self, imported: int, cancelled: bool):
+        if cancelled:
+            QMessageBox.information(self, "Import Cancelled", f"Import cancelled after {imported} new flashcards.")
+        else:
+            QMessageBox.information(self, "Imported", f"Imported {imported} new flashcards.")
 
     def export_flashcards(self):
-        """Export flashcards to a JSON file."""
+        """Export flashcards to a JSON or JSON Lines file in the background."""
         options = QFileDialog.Options()
-        file_name, _ = QFileDialog.getSaveFileName(self,"Export Flashcards","","JSON Files (*.json);;All Files (*)", options=options)
+        file_name, _ = QFileDialog.getSaveFileName(self,"Export Flashcards","","JSON Files (*.json);;JSON Lines (*.jsonl);;All Files (*)", options=options)
         if file_name:
-            try:
-                with open(file_name, "w", encoding="utf-8") as f:
-                    json.dump({"vocab_list": self.vocab_list_data, "favorites": self.favorites}, f, ensure_ascii=False, indent=2)
-                QMessageBox.information(self, "Exported", "Flashcards exported successfully.")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to export flashcards: {e}")
+            worker = FlashcardExportWorker(self.store, file_name)
+            worker.finished.connect(self.handle_export_finished)
+            self.start_transfer(worker, "Exporting flashcards...")
+
+    def handle_export_finished(self, exported: int, cancelled: bool):
+        if cancelled:
+            QMessageBox.information(self, "Export Cancelled", "Export cancelled; no file was written.")
+        else:
+            QMessageBox.information(self, "Exported", "Flashcards exported successfully.")
+
+    def start_transfer(self, worker, label: str):
+        """Run an import/export worker on its own thread with a cancellable progress dialog."""
+        if self.transfer_thread is not None:
+            QMessageBox.warning(self, "Busy", "An import or export is already running.")
+            return
+        thread = QThread()
+        worker.moveToThread(thread)
+
+        progress = QProgressDialog(label, "Cancel", 0, 100, self)
+        progress.setWindowTitle("MundiLex")
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        progress.setAutoClose(False)
+        progress.setValue(0)
+
+        worker.progress.connect(progress.setValue)
+        # Direct connection: the worker thread is busy in run() and never sees queued calls
+        progress.canceled.connect(worker.cancel, Qt.DirectConnection)
+        worker.error_occurred.connect(self.handle_error)
+        worker.finished.connect(progress.close)
+        # Parented to the window, so it would otherwise live as long as the window
+        worker.finished.connect(progress.deleteLater)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(self.handle_transfer_thread_finished)
+        thread.started.connect(worker.run)
+
+        self.transfer_thread = thread
+        self.transfer_worker = worker
+        thread.start()
+
+    def handle_transfer_thread_finished(self):
+        # finished is emitted while the thread is still winding down; let it end before dropping it
+        self.transfer_thread.wait()
+        self.transfer_thread = None
+        self.transfer_worker = None
 
     def toggle_favorite(self):
         """Toggle favorite status of the current word."""
@@ -856,82 +5369,87 @@ class SmartDictionaryApp(QMainWindow):
 
         if word in self.favorites:
             self.favorites.remove(word)
+            self.store.remove_favorite(word)
+            self.favorites_model.remove_item(word)
             QMessageBox.information(self, "Removed", f"'{word}' has been removed from favorites.")
         else:
             self.favorites.append(word)
+            self.store.add_favorite(word)
+            self.favorites_model.append(word)
             QMessageBox.information(self, "Added", f"'{word}' has been added to favorites.")
-        
-        self.populate_favorites()
-        self.save_data_store()
 
     def remove_favorite(self):
         """Remove the selected favorite word."""
-        selected_items = self.favorites_list.selectedItems()
-        if not selected_items:
+        rows = [index.row() for index in self.favorites_list.selectionModel().selectedRows()]
+        if not rows:
             QMessageBox.warning(
                 self, "No Selection", 
                 "Please select a favorite word to remove."
             )
             return
 
-        for item in selected_items:
-            word = item.text().strip()
+        for row in rows:
+            word = self.favorites_model.item(row)
             if word in self.favorites:
                 self.favorites.remove(word)
-                self.favorites_list.takeItem(self.favorites_list.row(item))
+                self.store.remove_favorite(word)
+        self.favorites_model.remove_rows(rows)
 
         QMessageBox.information(
             self, "Removed", 
             "Selected favorite words have been removed."
         )
-        self.save_data_store()
 
     def remove_selected_flashcard(self):
         """Remove the selected flashcard from the list and data store."""
-        selected_items = self.saved_flashcards_list.selectedItems()
-        if not selected_items:
+        rows = [index.row() for index in self.saved_flashcards_list.selectionModel().selectedRows()]
+        if not rows:
             QMessageBox.warning(
                 self, "No Selection", 
                 "Please select a flashcard to remove."
             )
             return
 
-        for item in selected_items:
-            flashcard_text = item.text()
-            word = flashcard_text.split(" - ")[0].strip()
-            # Remove from vocab_list_data
-            self.vocab_list_data = [fc for fc in self.vocab_list_data if fc['word'] != word]
-            # Remove from the list widget
-            self.saved_flashcards_list.takeItem(self.saved_flashcards_list.row(item))
+        for row in rows:
+            flashcard = self.saved_flashcards_model.item(row)
+            word = flashcard['word']
+            self.flashcard_index.remove(word, flashcard['language'])
+            self.store.remove_flashcards(word, flashcard['language'])
+            self.scheduler.remove(FlashcardIndex.key(word, flashcard['language']))
+            if self.current_flashcard is flashcard:
+                self.current_flashcard = None
             # Also remove from favorites if present
             if word in self.favorites:
                 self.favorites.remove(word)
+                self.store.remove_favorite(word)
+                self.favorites_model.remove_item(word)
+        # Remove from the list view
+        self.saved_flashcards_model.remove_rows(rows)
+        if self.current_flashcard is None:
+            self.next_flashcard()
 
         QMessageBox.information(
             self, "Removed", 
             "Selected flashcards have been removed."
         )
-        self.populate_favorites()
-        self.save_data_store()
 
     ###########################################################################
     # FLASHCARDS
     ###########################################################################
     def load_flashcards(self):
-        """Refresh flashcard display from vocab list."""
-        self.flashcards = list(self.vocab_list_data)
-        self.current_flashcard = -1
+        """Show the first due flashcard."""
+        self.current_flashcard = None
         self.next_flashcard()
 
     def flip_flashcard(self):
         """Toggle between showing the word and its details."""
-        if self.current_flashcard == -1 or not self.flashcards:
+        if self.current_flashcard is None:
             return
-        flashcard = self.flashcards[self.current_flashcard]
+        flashcard = self.current_flashcard
         current_text = self.flashcard_display.toPlainText()
         if current_text == flashcard['word']:
             # Show all details
-            response = flashcard.get('response', 'No information available.')
+            response = self.store.response_text(flashcard, 'No information available.')
             formatted_response = response.replace('\n\n', '<br><br>').replace('\n', '<br>')
             self.flashcard_display.setHtml(f"<p>{formatted_response}</p>")
         else:
@@ -939,38 +5457,86 @@ class SmartDictionaryApp(QMainWindow):
             self.flashcard_display.setText(flashcard['word'])
 
     def next_flashcard(self):
-        """Display the next flashcard in the list."""
-        if not self.flashcards:
+        """Display the card due soonest, skipping the one currently shown."""
+        skip = None
+        if self.current_flashcard is not None:
+            skip = FlashcardIndex.key(self.current_flashcard['word'], self.current_flashcard['language'])
+        key = self.scheduler.next_due(skip=skip)
+        if key is None:
+            key = skip
+        flashcard = self.flashcard_index.get(*key) if key is not None else None
+        if flashcard is None:
+            self.current_flashcard = None
             self.flashcard_display.setText("No flashcards available.")
             return
-        self.current_flashcard = (self.current_flashcard + 1) % len(self.flashcards)
-        flashcard = self.flashcards[self.current_flashcard]
+        self.current_flashcard = flashcard
         self.flashcard_display.setText(flashcard['word'])
 
-    def display_flashcard(self, item):
+    def grade_flashcard(self, grade: int):
+        """Record how well the current card was remembered and move to the next due card."""
+        if self.current_flashcard is None:
+            return
+        key = FlashcardIndex.key(self.current_flashcard['word'], self.current_flashcard['language'])
+        state = self.scheduler.grade(key, grade)
+        if state is None:
+            return
+        self.store.update_reviews([(key, state)])
+        if state.interval >= 1:
+            when = f"{state.interval:g} day{'' if state.interval == 1 else 's'}"
+        else:
+            when = f"{RELEARN_DELAY // 60} minutes"
+        self.statusBar().showMessage(f"'{self.current_flashcard['word']}' is due again in {when}")
+        self.current_flashcard = None
+        self.next_flashcard()
+
+    def reschedule_flashcards(self):
+        """Spread every overdue card over the next few days."""
+        changed = self.scheduler.reschedule_all()
+        self.store.update_reviews(changed)
+        QMessageBox.information(
+            self, "Rescheduled",
+            f"Spread {len(changed)} overdue flashcards over the next {RESCHEDULE_SPREAD_DAYS} days."
+        )
+        self.current_flashcard = None
+        self.next_flashcard()
+
+    def display_flashcard(self, index):
         """Display the selected flashcard's information."""
-        flashcard_text = item.text()
-        word = flashcard_text.split(" - ")[0].strip()
-        flashcard = next((fc for fc in self.flashcards if fc['word'] == word), None)
+        flashcard = self.saved_flashcards_model.item(index.row())
         if flashcard:
+            # A stored card replaces whatever lookup was still on its way
+            self.lookup_service.cancel_all()
+            self.displayed_request_id = None
             self.main_word_display.setText(flashcard['word'])
-            response = flashcard.get('response', 'No information available.')
+            response = self.store.response_text(flashcard, 'No information available.')
             formatted_response = response.replace('\n\n', '<br><br>').replace('\n', '<br>')
             self.info_display.setHtml(f"<p>{formatted_response}</p>")
+            self.highlight_search_terms()
             self.flashcard_display.setText(flashcard['word'])
+            self.current_flashcard = flashcard
 
-    def display_favorite(self, item):
+    def display_favorite(self, index):
         """Display information for the selected favorite word."""
-        word = item.text().strip()
+        word = self.favorites_model.item(index.row())
         # Fetch linguistic information for the word
-        response = self.worker.fetch_linguistic_info(word, self.current_language)
-        self.handle_data_fetched(word, response)
+        self.request_lookup(word, "favorite")
 
     ###########################################################################
     # ADDITIONAL FEATURES
     ###########################################################################
     # Add more features here as needed, such as categorized flashcards, quizzes, etc.
 
+    ###########################################################################
+    # METRICS
+    ###########################################################################
+    def show_metrics_panel(self):
+        """Open the metrics panel (non-modal)."""
+        if self.metrics_panel is None:
+            self.metrics_panel = MetricsPanel(self)
+        self.metrics_panel.show()
+        self.metrics_panel.raise_()
+        self.metrics_panel.activateWindow()
+
     ###########################################################################
     # CLOSE EVENT
     ###########################################################################
@@ -982,21 +5548,241 @@ class SmartDictionaryApp(QMainWindow):
             QMessageBox.No
         )
         if reply == QMessageBox.Yes:
-            self.worker.stop_monitoring()
-            self.thread.quit()
-            self.thread.wait()
+            self.stop_worker()
 
-            self.save_data_store()
+            self.speech.shutdown()
+            notifications.close()
+            if self.transfer_thread is not None:
+                self.transfer_worker.cancel()
+                self.transfer_thread.quit()
+                self.transfer_thread.wait()
+            if METRICS_FILE:
+                write_metrics_file()
+            self.core.close()
 
             event.accept()
         else:
             event.ignore()
 
+###############################################################################
+# COMMAND LINE TOOLS
+###############################################################################
+def read_word_list(path: str) -> list:
+    """Read one word per line, skipping blank lines, comments and duplicates."""
+    words, seen = [], set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            word = line.strip()
+            if not word or word.startswith("#"):
+                continue
+            key = word.strip().casefold()
+            if key not in seen:
+                seen.add(key)
+                words.append(word)
+    return words
+
+def prefetch_main(argv) -> int:
+    """Pre-fetch definitions for a word list file into the definition cache."""
+    parser = argparse.ArgumentParser(
+        prog="Mundilux.py prefetch",
+        description="Pre-fetch definitions for every word in a word list file (one word per line)."
+    )
+    parser.add_argument("word_file")
+    parser.add_argument("--language", default="German")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Words per request")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight at once")
+    parser.add_argument("--cache", default=DEFINITION_CACHE_FILE, help="Definition cache file")
+    args = parser.parse_args(argv)
+
+    words = read_word_list(args.word_file)
+    cache = DefinitionCache(args.cache)
+    client = GroqClient()
+    service = LookupService(cache=cache, client=client)
+    batches = [words[i:i + args.batch_size] for i in range(0, len(words), args.batch_size)]
+    print(f"Pre-fetching {len(words)} {args.language} words in {len(batches)} batches...")
+
+    start = time.perf_counter()
+    resolved = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        futures = [
+            executor.submit(service.fetch_linguistic_info_batch, batch, args.language, args.batch_size)
+            for batch in batches
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            resolved += len(future.result())
+            print(f"[{done}/{len(batches)}] {resolved}/{len(words)} words resolved")
+
+    stats = cache.stats()
+    print(
+        f"Done in {time.perf_counter() - start:.1f}s: {resolved}/{len(words)} words resolved, "
+        f"{stats['hits']} were already cached, {stats['entries']} entries in cache."
+    )
+    client.close()
+    cache.close()
+    return 0 if resolved == len(words) else 1
+
+def format_dictionary_entry(entry: dict) -> str:
+    """Render a Wiktextract (kaikki.org) entry in the layout of the AI definitions."""
+    glosses = []
+    examples = []
+    synonyms = [s.get("word") for s in entry.get("synonyms", [])]
+    antonyms = [a.get("word") for a in entry.get("antonyms", [])]
+    for sense in entry.get("senses", []):
+        glosses.extend(sense.get("glosses", [])[:1])
+        examples.extend(e.get("text") for e in sense.get("examples", []))
+        synonyms.extend(s.get("word") for s in sense.get("synonyms", []))
+        antonyms.extend(a.get("word") for a in sense.get("antonyms", []))
+    if not glosses:
+        return ""
+
+    pos = entry.get("pos")
+    lines = [f"Definition ({pos}):" if pos else "Definition:"]
+    lines.extend(f"{i}. {gloss}" for i, gloss in enumerate(glosses, 1))
+    parts = ["\n".join(lines)]
+    synonyms = list(dict.fromkeys(s for s in synonyms if s))
+    antonyms = list(dict.fromkeys(a for a in antonyms if a))
+    examples = [e for e in examples if e][:3]
+    if synonyms:
+        parts.append("Synonyms: " + ", ".join(synonyms[:10]))
+    if antonyms:
+        parts.append("Antonyms: " + ", ".join(antonyms[:10]))
+    if examples:
+        parts.append("Examples:\n" + "\n".join(f"{i}. {e}" for i, e in enumerate(examples, 1)))
+    return "\n\n".join(parts)
+
+def iter_dictionary_dump(path: str, language_code: str):
+    """
+    Yield (headword, definition) from a dump file: Wiktextract JSON lines
+    (.jsonl, as published on kaikki.org) or tab-separated "word<TAB>definition"
+    lines (anything else, e.g. converted FreeDict data). Gzipped files work too.
+    """
+    import gzip
+    opener = gzip.open if path.endswith(".gz") else open
+    name = path[:-3] if path.endswith(".gz") else path
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if name.endswith(".jsonl"):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"Skipping line {line_number}: {e}")
+                    continue
+                # Multilingual dumps hold every language; keep the requested one
+                if entry.get("lang_code", language_code) != language_code:
+                    continue
+                word, definition = entry.get("word"), format_dictionary_entry(entry)
+            else:
+                word, _, definition = line.partition("\t")
+                definition = definition.replace("\\n", "\n")
+            if word and definition:
+                yield word, definition
+
+def build_dictionary_main(argv) -> int:
+    """Build a local dictionary file from a dump for LocalDictionaryProvider."""
+    parser = argparse.ArgumentParser(
+        prog="Mundilux.py build-dictionary",
+        description="Build a local dictionary from a Wiktextract JSONL or word<TAB>definition dump."
+    )
+    parser.add_argument("dump_file")
+    parser.add_argument("--language", default="German")
+    parser.add_argument("--output", help=f"Dictionary file (default: {DICTIONARY_DIR}/<code>{DICTIONARY_EXTENSION})")
+    args = parser.parse_args(argv)
+
+    if args.language not in LANGUAGE_CODES:
+        print(f"Unknown language '{args.language}'. Choose one of: {', '.join(LANGUAGE_CODES)}")
+        return 1
+    code = LANGUAGE_CODES[args.language]
+    output = args.output or os.path.join(DICTIONARY_DIR, code + DICTIONARY_EXTENSION)
+
+    start = time.perf_counter()
+    entries = {}
+    read = 0
+    for word, definition in iter_dictionary_dump(args.dump_file, code):
+        read += 1
+        key = word_normalizer.fold(word, args.language)
+        # Homographs (e.g. noun and verb) share one entry
+        entries[key] = f"{entries[key]}\n\n{definition}" if key in entries else definition
+        if read % 100000 == 0:
+            print(f"{read} entries read...")
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    part = output + ".part"
+    with open(part, "wb") as f:
+        written = write_dictionary(f, entries, code)
+    os.replace(part, output)
+    print(
+        f"Wrote {written} headwords ({read} entries) to {output} "
+        f"({os.path.getsize(output) / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s."
+    )
+    return 0
+
+def serve_main(argv) -> int:
+    """Run the lookup daemon until interrupted."""
+    parser = argparse.ArgumentParser(
+        prog="Mundilux.py serve",
+        description="Serve lookups to other programs over a Unix socket and localhost HTTP (see LookupDaemon)."
+    )
+    parser.add_argument("--socket", default=DAEMON_SOCKET, help="Unix socket path ('' to disable)")
+    parser.add_argument("--http-port", type=int, default=DAEMON_HTTP_PORT, help="Localhost HTTP port (0 to disable)")
+    parser.add_argument("--language", default=DAEMON_DEFAULT_LANGUAGE, help="Language to load the lemmatizer for")
+    args = parser.parse_args(argv)
+
+    core = LookupCore(api_key=GROQ_API_KEY)
+    daemon = LookupDaemon(core, socket_path=args.socket, http_port=args.http_port)
+    try:
+        daemon.start()
+    except (OSError, DaemonError) as e:
+        print(f"Could not start the lookup daemon: {e}")
+        core.close()
+        return 1
+    word_normalizer.warm(args.language)
+    if PROFILER_AUTOSTART:
+        profiler.start()
+    # Stop cleanly (removing the socket) on kill as well as on Ctrl+C
+    import signal
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print("Lookup daemon ready; press Ctrl+C to stop.")
+    try:
+        while True:
+            if METRICS_FILE:
+                time.sleep(METRICS_WRITE_INTERVAL_MS / 1000)
+                write_metrics_file()
+            else:
+                time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if METRICS_FILE:
+            write_metrics_file()
+        daemon.stop()
+        core.close()
+    return 0
+
+COMMANDS = {
+    "prefetch": prefetch_main,
+    "build-dictionary": build_dictionary_main,
+    "serve": serve_main
+}
+
 ###############################################################################
 # MAIN
 ###############################################################################
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(COMMANDS[sys.argv[1]](sys.argv[2:]))
+
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        startup_profile.enabled = True
+    startup_profile.mark("module body")
+    if PROFILER_AUTOSTART:
+        profiler.start()
+
     app = QApplication(sys.argv)
+    startup_profile.mark("QApplication")
     app.setStyle("Fusion")  # Use Fusion style for a modern look
 
     # Apply a modern color palette with grey, orange, purple, and gold
@@ -1020,6 +5806,8 @@ def main():
 
     app.setPalette(palette)
 
+    startup_profile.mark("palette")
+
     window = SmartDictionaryApp(GROQ_API_KEY)
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,124 @@
+"""
+Microbenchmark comparing the clipboard backends of MundiLex.
+
+For each backend ("qt" and "poll") it measures:
+  * idle CPU: process + child-process CPU time spent while nothing is copied
+  * detection latency: time from writing a word to the system clipboard
+    until the monitor emits word_detected
+
+Needs a real desktop session (X11 or Windows), because the event-driven
+backend only sees clipboard changes made by other processes there.
+
+Usage:
+    python benchmarks/bench_clipboard.py [--idle 10] [--samples 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyperclip
+from PyQt5.QtCore import QThread
+from PyQt5.QtWidgets import QApplication
+
+import Mundilux
+
+
+def cpu_seconds():
+    """CPU time of this process and its reaped children (xclip/xsel)."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def spin(app, seconds):
+    """Run the Qt event loop for the given number of seconds."""
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def make_monitor(backend):
+    if backend == "qt":
+        return Mundilux.QtClipboardMonitor(), None
+    monitor = Mundilux.ClipboardWorker()
+    thread = QThread()
+    monitor.moveToThread(thread)
+    return monitor, thread
+
+
+def run_backend(app, backend, idle_seconds, samples):
+    monitor, thread = make_monitor(backend)
+    detected = {}
+    monitor.word_detected.connect(lambda word, _: detected.setdefault(word, time.perf_counter()))
+
+    if thread is None:
+        monitor.start_monitoring("German")
+    else:
+        thread.started.connect(monitor.start_monitoring)
+        thread.start()
+
+    # Idle CPU: nothing is copied while we wait
+    spin(app, 0.5)
+    cpu_start = cpu_seconds()
+    spin(app, idle_seconds)
+    idle_cpu = (cpu_seconds() - cpu_start) / idle_seconds * 100
+
+    # Detection latency: copy distinct words from another thread, like a user would
+    latencies = []
+    for i in range(samples):
+        word = f"bench{backend}{''.join(chr(ord('a') + int(d)) for d in str(i))}"
+        start = {}
+
+        def copy():
+            start["t"] = time.perf_counter()
+            pyperclip.copy(word)
+
+        threading.Thread(target=copy).start()
+        deadline = time.perf_counter() + 10
+        while word not in detected and time.perf_counter() < deadline:
+            app.processEvents()
+            time.sleep(0.0005)
+        if word in detected:
+            latencies.append((detected[word] - start["t"]) * 1000)
+        # Let the polling backend's backoff settle as it would between real copies
+        spin(app, 0.3)
+
+    monitor.stop_monitoring()
+    if thread is not None:
+        thread.quit()
+        thread.wait()
+    return idle_cpu, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--idle", type=float, default=10, help="Seconds of idle CPU measurement per backend")
+    parser.add_argument("--samples", type=int, default=20, help="Number of copy events per backend")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    print(f"Qt platform: {app.platformName()}")
+    original = pyperclip.paste()
+    try:
+        print(f"{'backend':<8} {'idle CPU %':>10} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'missed':>7}")
+        for backend in ("qt", "poll"):
+            idle_cpu, latencies = run_backend(app, backend, args.idle, args.samples)
+            missed = args.samples - len(latencies)
+            if latencies:
+                latencies.sort()
+                p50 = statistics.median(latencies)
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                print(f"{backend:<8} {idle_cpu:>10.2f} {p50:>8.1f} {p95:>8.1f} {latencies[-1]:>8.1f} {missed:>7}")
+            else:
+                print(f"{backend:<8} {idle_cpu:>10.2f} {'-':>8} {'-':>8} {'-':>8} {missed:>7}")
+    finally:
+        pyperclip.copy(original)
+
+
+if __name__ == "__main__":
+    main()
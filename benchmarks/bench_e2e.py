@@ -0,0 +1,308 @@
+"""
+End-to-end latency of the window against the fake Groq server.
+
+For each deck size a child process fills a fresh database with that many
+cards, opens the window on the offscreen Qt platform and drives it the way a
+user does, one action at a time:
+
+  copy         copy a new word; time until its definition is rendered
+               (QtClipboardMonitor.check_clipboard -> lookup -> info_display)
+  copy cached  copy a word that was looked up before (definition cache hit)
+  search       type a new word and press Search (search_word)
+  save         save the displayed word as a flashcard (save_current_word)
+
+Reports p50/p95/p99 latency and throughput per action, the time to the first
+streamed text of new words, how long the deck took to load and the memory
+(RSS) of the process. Results are written to e2e-<commit>.json in
+--results-dir (default: ~/.cache/mundilex/benchmarks, outside the source
+tree so they survive checkouts) and compared with the newest result of
+another commit there (or the file given with --compare).
+
+Usage:
+    python benchmarks/bench_e2e.py [--decks 1000,10000,100000] [--actions 50]
+        [--first-token-ms 200] [--token-delay-ms 2] [--error-rate 0] [--compare FILE]
+        [--results-dir DIR]
+"""
+import argparse
+import contextlib
+import datetime
+import glob
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "mundilex", "benchmarks"
+)
+ACTIONS = ("copy", "copy cached", "search", "save")
+LANGUAGE = "German"
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def summarize(seconds):
+    """p50/p95/p99 in milliseconds and sequential throughput of one action."""
+    total = sum(seconds)
+    return {
+        "count": len(seconds),
+        "p50 ms": percentile(seconds, 0.50) * 1000,
+        "p95 ms": percentile(seconds, 0.95) * 1000,
+        "p99 ms": percentile(seconds, 0.99) * 1000,
+        "per s": len(seconds) / total if total else 0.0,
+    }
+
+
+def rss_mb():
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def word_for(prefix, number):
+    """A distinct word made of letters only, so the clipboard monitor accepts it."""
+    letters = ""
+    while True:
+        number, digit = divmod(number, 26)
+        letters += chr(ord("a") + digit)
+        if not number:
+            return prefix + letters
+
+
+def run_deck(args):
+    """Child process: measure one deck size and write the result to args.output."""
+    from fake_groq_server import FakeGroqServer
+    server = FakeGroqServer(
+        first_token_ms=args.first_token_ms, token_delay_ms=args.token_delay_ms,
+        error_rate=args.error_rate, error_status=500
+    ).start()
+    os.environ.update({
+        "QT_QPA_PLATFORM": "offscreen",
+        "MUNDILEX_CLIPBOARD_BACKEND": "qt",
+        "MUNDILEX_DAEMON": "off",
+        "MUNDILEX_GROQ_RPM": "0",
+        "MUNDILEX_GROQ_TPM": "0",
+        "GROQ_BASE_URL": server.base_url,
+        "GROQ_API_KEY": "fake",
+    })
+    os.chdir(tempfile.mkdtemp())
+    sys.path.insert(0, REPO_DIR)
+    # Keep the per-lookup logging out of the report
+    log = open(os.devnull, "w")
+    with contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        import Mundilux
+        from bench_storage import make_deck
+        from PyQt5.QtWidgets import QApplication, QMessageBox
+
+        store = Mundilux.VocabStore()
+        deck = make_deck(args.child)
+        for i in range(0, len(deck), 1000):
+            store.add_flashcards(deck[i:i + 1000])
+        store.close()
+        del deck
+
+        # Dialogs would block the run; answer them at once
+        for name in ("information", "warning", "critical"):
+            setattr(QMessageBox, name, staticmethod(lambda *a, **k: QMessageBox.Ok))
+        app = QApplication([])
+        Mundilux.word_normalizer.warm(LANGUAGE)
+        baseline_rss = rss_mb()
+
+        start = time.perf_counter()
+        window = Mundilux.SmartDictionaryApp("fake")
+        window.show()
+        deadline = time.monotonic() + 300
+        while len(window.flashcard_index) < args.child:
+            app.processEvents()
+            if time.monotonic() > deadline:
+                raise RuntimeError("the deck did not load")
+        load_seconds = time.perf_counter() - start
+        loaded_rss = rss_mb()
+
+        finished = []
+        first_text = []
+        window.lookup_service.lookup_finished.connect(lambda request_id, *a: finished.append(time.perf_counter()))
+        window.lookup_service.lookup_chunk.connect(lambda request_id, *a: first_text.append(time.perf_counter()))
+
+        def wait_for_render(start):
+            """Spin the event loop until the lookup started at start has been rendered."""
+            count = len(finished)
+            del first_text[:]
+            deadline = time.monotonic() + 60
+            while len(finished) == count:
+                app.processEvents()
+                if time.monotonic() > deadline:
+                    raise RuntimeError("a lookup did not finish")
+            # lookup_finished reaches the window first, so the text is on screen by now
+            return finished[-1] - start, (first_text[0] - start) if first_text else None
+
+        timings = {action: [] for action in ACTIONS}
+        first_texts = []
+        clipboard = app.clipboard()
+        # The first lookup imports groq and opens the connection; keep it out of the figures
+        clipboard.setText("aufwaermen")
+        wait_for_render(time.perf_counter())
+        copied = [word_for("kopie", i) for i in range(args.actions)]
+        for word in copied:
+            start = time.perf_counter()
+            clipboard.setText(word)
+            elapsed, first = wait_for_render(start)
+            timings["copy"].append(elapsed)
+            if first is not None:
+                first_texts.append(first)
+        for word in copied:
+            start = time.perf_counter()
+            clipboard.setText(word)
+            timings["copy cached"].append(wait_for_render(start)[0])
+        for i in range(args.actions):
+            window.search_bar.setText(word_for("suche", i))
+            start = time.perf_counter()
+            window.search_word()
+            timings["search"].append(wait_for_render(start)[0])
+            start = time.perf_counter()
+            window.save_current_word()
+            timings["save"].append(time.perf_counter() - start)
+
+        window.stop_worker()
+        window.speech.shutdown()
+        window.core.close()
+        server.stop()
+
+    result = {
+        "deck": args.child,
+        "load s": load_seconds,
+        "actions": {action: summarize(seconds) for action, seconds in timings.items()},
+        "first text": summarize(first_texts),
+        "rss base MB": baseline_rss,
+        "rss loaded MB": loaded_rss,
+        "rss end MB": rss_mb(),
+        "rss peak MB": peak_rss_mb(),
+        "server requests": server.request_count,
+        "server errors": server.error_count,
+    }
+    with open(args.output, "w") as f:
+        json.dump(result, f)
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_DIR, capture_output=True, text=True
+        ).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def previous_result(results_dir, commit):
+    """The newest stored result of another commit, or None."""
+    paths = sorted(glob.glob(os.path.join(results_dir, "e2e-*.json")), key=os.path.getmtime, reverse=True)
+    for path in paths:
+        with open(path) as f:
+            result = json.load(f)
+        if result.get("commit") != commit:
+            return path
+    return None
+
+
+def print_report(results, baseline=None):
+    base = {deck["deck"]: deck for deck in (baseline or {}).get("decks", [])}
+    for deck in results["decks"]:
+        before = base.get(deck["deck"])
+        print(
+            f"deck {deck['deck']}: loaded in {deck['load s']:.2f} s, RSS {deck['rss loaded MB']:.0f} MB "
+            f"loaded / {deck['rss peak MB']:.0f} MB peak (process without window {deck['rss base MB']:.0f} MB)"
+        )
+        rows = list(deck["actions"].items()) + [("first text", deck["first text"])]
+        for action, row in rows:
+            line = (
+                f"  {action:<12} p50 {row['p50 ms']:8.1f} ms  p95 {row['p95 ms']:8.1f} ms  "
+                f"p99 {row['p99 ms']:8.1f} ms  {row['per s']:8.1f}/s"
+            )
+            old = before and (before["actions"].get(action) if action != "first text" else before["first text"])
+            if old and old["p50 ms"]:
+                line += f"   p50 {100 * (row['p50 ms'] / old['p50 ms'] - 1):+.0f}%  p95 {100 * (row['p95 ms'] / old['p95 ms'] - 1):+.0f}%"
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--decks", default="1000,10000,100000", help="Comma-separated deck sizes")
+    parser.add_argument("--actions", type=int, default=50, help="Repetitions of each action")
+    parser.add_argument("--first-token-ms", type=float, default=200, help="Fake server latency before the first token")
+    parser.add_argument("--token-delay-ms", type=float, default=2, help="Fake server delay between tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with HTTP 500")
+    parser.add_argument("--compare", help="Result file to compare with (default: newest of another commit)")
+    parser.add_argument("--results-dir", default=RESULTS_DIR, help="Where results are kept (default: %(default)s)")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        run_deck(args)
+        return
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {
+            "actions": args.actions, "first token ms": args.first_token_ms,
+            "token delay ms": args.token_delay_ms, "error rate": args.error_rate
+        },
+        "decks": [],
+    }
+    for size in (int(size) for size in args.decks.split(",")):
+        print(f"Running deck of {size} cards...", flush=True)
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+            output = f.name
+        command = [
+            sys.executable, os.path.abspath(__file__), "--child", str(size), "--output", output,
+            "--actions", str(args.actions), "--first-token-ms", str(args.first_token_ms),
+            "--token-delay-ms", str(args.token_delay_ms), "--error-rate", str(args.error_rate),
+        ]
+        # Each deck in its own process, so memory figures do not add up
+        subprocess.run(command, check=True, cwd=BENCH_DIR)
+        with open(output) as f:
+            results["decks"].append(json.load(f))
+        os.unlink(output)
+
+    compare = args.compare or previous_result(args.results_dir, commit)
+    baseline = None
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)
+        print(f"Compared with {baseline.get('commit')} ({compare})")
+    print_report(results, baseline)
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    path = os.path.join(args.results_dir, f"e2e-{commit}.json")
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of flashcard duplicate detection during import.
+
+Imports N cards into an existing N-card deck (half of the imported cards are
+duplicates) with the FlashcardIndex used by MundiLex, and compares it with the
+previous approach, which rebuilt the list of existing words for every
+imported card. The old approach is O(n*m), so it is timed on a sample of the
+import and extrapolated.
+
+Usage:
+    python benchmarks/bench_flashcard_index.py [--deck 100000] [--sample 200]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Mundilux
+
+
+def make_cards(start, count, language="German"):
+    return [
+        {"word": f"Wort{i}", "language": language, "response": f"Definition of Wort{i}"}
+        for i in range(start, start + count)
+    ]
+
+
+def import_with_list(deck, imported):
+    """The previous import loop."""
+    new_entries = 0
+    for flashcard in imported:
+        if flashcard["word"] not in [fc["word"] for fc in deck]:
+            deck.append(flashcard)
+            new_entries += 1
+    return new_entries
+
+
+def import_with_index(index, imported):
+    new_entries = 0
+    for flashcard in imported:
+        if index.add(flashcard):
+            new_entries += 1
+    return new_entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deck", type=int, default=100000, help="Cards in the deck and in the import")
+    parser.add_argument("--sample", type=int, default=200, help="Imported cards timed with the old approach")
+    args = parser.parse_args()
+
+    deck = make_cards(0, args.deck)
+    # Half of the import overlaps with the deck
+    imported = make_cards(args.deck // 2, args.deck)
+
+    start = time.perf_counter()
+    index = Mundilux.FlashcardIndex(deck)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    added = import_with_index(index, imported)
+    indexed = time.perf_counter() - start
+
+    sample = imported[:args.sample]
+    start = time.perf_counter()
+    import_with_list(list(deck), sample)
+    listed = (time.perf_counter() - start) / len(sample) * len(imported)
+
+    print(f"deck={args.deck} imported={len(imported)} new={added}")
+    print(f"FlashcardIndex: build {build * 1000:.1f} ms, import {indexed * 1000:.1f} ms")
+    print(f"list scan:      import ~{listed:.1f} s (extrapolated from {len(sample)} cards)")
+    print(f"speedup:        ~{listed / indexed:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Rate limiting, retries and the circuit breaker against the fake Groq server.
+
+Scenarios (each with a fresh server and LookupService):
+  burst     more lookups than the server's requests-per-minute limit, without
+            and with the client-side token bucket
+  flaky     a share of requests fail with HTTP 500, without and with retries
+  outage    every request fails with 503; the circuit breaker should stop
+            calling the server after a few attempts and fail fast
+
+Usage:
+    python benchmarks/bench_resilience.py [--words 30] [--rpm 20] [--error-rate 0.3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_groq_server import FakeGroqServer
+
+
+def run_lookups(Mundilux, server_options, words, concurrency, **client_options):
+    """Look up every word through a fresh server and LookupService; returns a result row."""
+    server = FakeGroqServer(**server_options).start()
+    client = Mundilux.GroqClient(api_key="fake", base_url=server.base_url, **client_options)
+    service = Mundilux.LookupService(cache=None, coalesce_window=0, client=client)
+    failed = []
+    service.lookup_failed.connect(lambda word, reason: failed.append(reason))
+
+    latencies = []
+
+    def lookup(word):
+        start = time.perf_counter()
+        response = service.fetch_linguistic_info(word, "German")
+        latencies.append(time.perf_counter() - start)
+        return response != Mundilux.DEFINITION_NOT_AVAILABLE
+
+    start = time.perf_counter()
+    # Keep the per-lookup logging out of the report
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()), \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        ok = sum(executor.map(lookup, words))
+    elapsed = time.perf_counter() - start
+    service.shutdown()
+    client.close()
+    server.stop()
+    latencies.sort()
+    return {
+        "ok": ok,
+        "failed": len(words) - ok,
+        "server requests": server.request_count,
+        "server errors": server.error_count,
+        "retries": client.retries,
+        "rejected": client.rejected,
+        "circuit": client.breaker.state,
+        "median ms": latencies[len(latencies) // 2] * 1000,
+        "wall s": elapsed,
+    }
+
+
+def print_row(label, row):
+    print(
+        f"  {label:<28} ok={row['ok']:<4} failed={row['failed']:<4} "
+        f"requests={row['server requests']:<4} errors={row['server errors']:<4} "
+        f"retries={row['retries']:<4} fast-failed={row['rejected']:<4} circuit={row['circuit']:<9} "
+        f"median={row['median ms']:7.1f} ms  wall={row['wall s']:6.2f} s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=30)
+    parser.add_argument("--rpm", type=int, default=20, help="Server limit and client budget, requests per minute")
+    parser.add_argument("--error-rate", type=float, default=0.3)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp())  # No local dictionaries or caches from the working tree
+    os.environ["MUNDILEX_LEMMATIZER"] = "none"
+    import Mundilux
+    Mundilux.RETRY_BASE_DELAY = 0.05
+
+    words = [f"Wort{i}" for i in range(args.words)]
+    unlimited = dict(rpm=0, tpm=0)
+    rate_limited = dict(rpm_limit=args.rpm)
+    flaky = dict(error_rate=args.error_rate, error_status=500)
+
+    print(f"burst: {args.words} lookups, server allows {args.rpm} requests/minute")
+    print_row("no limiter, no retries", run_lookups(Mundilux, rate_limited, words, args.concurrency,
+                                                     max_retries=0, **unlimited))
+    print_row("token bucket", run_lookups(Mundilux, rate_limited, words, args.concurrency,
+                                          rpm=args.rpm, tpm=0, max_retries=0))
+
+    print(f"flaky: {args.error_rate:.0%} of requests fail with HTTP 500")
+    print_row("no retries", run_lookups(Mundilux, flaky, words, args.concurrency, max_retries=0, **unlimited))
+    print_row("3 jittered retries", run_lookups(Mundilux, flaky, words, args.concurrency,
+                                                max_retries=3, **unlimited))
+
+    print("outage: every request fails with 503")
+    print_row("circuit breaker", run_lookups(Mundilux, dict(outage=True), words, 1, max_retries=1, **unlimited))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of the spaced-repetition scheduler on a large deck.
+
+Measures building the due-date heap, picking and grading cards (O(log n)
+each) and the bulk "reschedule everything" operation, both in memory and
+persisted to a temporary SQLite store.
+
+Usage:
+    python benchmarks/bench_scheduler.py [--deck 100000] [--reviews 10000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Mundilux
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--deck", type=int, default=100000)
+    parser.add_argument("--reviews", type=int, default=10000)
+    args = parser.parse_args()
+
+    now = time.time()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = Mundilux.VocabStore(os.path.join(tmp, "bench.db"), legacy_json=None)
+        store.add_flashcards(
+            {"word": f"Wort{i}", "language": "German", "response": "..."} for i in range(args.deck)
+        )
+        # Two thirds of the deck has been reviewed before, many of those cards are overdue
+        seeded = []
+        for word_key, language, _ in store.load_review_states()[: args.deck * 2 // 3]:
+            state = Mundilux.ReviewState(
+                due=now + random.uniform(-30, 30) * Mundilux.DAY, interval=10, repetitions=3
+            )
+            seeded.append(((word_key, language), state))
+        store.update_reviews(seeded)
+
+        start = time.perf_counter()
+        scheduler = Mundilux.ReviewScheduler(store.load_review_states())
+        print(f"load + heapify {args.deck} cards: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        start = time.perf_counter()
+        for _ in range(args.reviews):
+            key = scheduler.next_due()
+            scheduler.grade(key, random.choice((1, 3, 4, 5)), now)
+        elapsed = time.perf_counter() - start
+        print(f"{args.reviews} next_due + grade: {elapsed * 1000:.1f} ms ({elapsed / args.reviews * 1e6:.1f} us each)")
+
+        start = time.perf_counter()
+        changed = scheduler.reschedule_all(now)
+        in_memory = time.perf_counter() - start
+        store.update_reviews(changed)
+        total = time.perf_counter() - start
+        print(f"reschedule_all: {len(changed)} overdue cards, {in_memory * 1000:.1f} ms in memory, "
+              f"{total * 1000:.1f} ms including the store")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
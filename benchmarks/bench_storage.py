@@ -0,0 +1,165 @@
+"""
+Bytes per flashcard of stored responses, before and after compression.
+
+Builds a deck of N cards in three languages whose responses follow the shape
+of real lookups (definition, synonyms, antonyms and example sentences, with
+the same headings every time) and stores it in a VocabStore once per codec.
+Reports, per card:
+
+  response   size of the response body alone (plain UTF-8 or compressed)
+  database   whole database file, including the full-text index
+  memory     Python heap held by the loaded deck (FlashcardIndex)
+  display    time to decompress one response when a card is shown
+
+The legacy vocab_data.json size is printed for reference.
+
+Usage:
+    python benchmarks/bench_storage.py [--cards 50000]
+"""
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+LANGUAGES = {
+    "German": dict(
+        share=0.6,
+        stems=["haus", "baum", "wald", "stadt", "zeit", "welt", "licht", "berg", "fluss", "weg", "spiel", "wort",
+               "kraft", "arbeit", "freund", "schule", "reise", "stimme", "farbe", "wasser"],
+        endings=["", "en", "er", "ung", "heit", "lich", "chen", "ig", "keit", "schaft"],
+        headings=["**Definition:**", "**Synonyme:**", "**Antonyme:**", "**Beispielsätze:**"],
+        glue=["ist ein", "bezeichnet", "beschreibt", "bedeutet", "wird verwendet für", "im Sinne von",
+              "oft im Zusammenhang mit", "ein Ort, an dem", "etwas, das man", "eine Person, die"],
+        sentences=["Das {w} ist sehr {a}.", "Wir haben gestern über das {w} gesprochen.",
+                   "Ohne {w} wäre das Leben {a}.", "Mein Freund findet das {w} {a}.",
+                   "Im Sommer ist das {w} besonders {a}.", "Kannst du mir das {w} zeigen?"],
+        adjectives=["schön", "groß", "klein", "alt", "neu", "wichtig", "schwierig", "einfach", "teuer", "laut"],
+    ),
+    "Spanish": dict(
+        share=0.25,
+        stems=["casa", "árbol", "ciudad", "tiempo", "mundo", "luz", "monte", "río", "camino", "juego", "palabra",
+               "fuerza", "trabajo", "amigo", "escuela", "viaje", "voz", "color", "agua", "mesa"],
+        endings=["", "s", "ito", "ón", "ero", "dad", "ción", "mente"],
+        headings=["**Definición:**", "**Sinónimos:**", "**Antónimos:**", "**Oraciones de ejemplo:**"],
+        glue=["es un", "se refiere a", "describe", "significa", "se utiliza para", "en el sentido de",
+              "a menudo relacionado con", "un lugar donde", "algo que se", "una persona que"],
+        sentences=["La {w} es muy {a}.", "Ayer hablamos de la {w}.", "Sin {w} la vida sería {a}.",
+                   "Mi amigo piensa que la {w} es {a}.", "En verano la {w} es especialmente {a}.",
+                   "¿Puedes mostrarme la {w}?"],
+        adjectives=["bonita", "grande", "pequeña", "vieja", "nueva", "importante", "difícil", "fácil", "cara"],
+    ),
+    "Russian": dict(
+        share=0.15,
+        stems=["дом", "дерев", "город", "врем", "мир", "свет", "гор", "рек", "дорог", "игр", "слов", "сил",
+               "работ", "друг", "школ", "путешестви", "голос", "цвет", "вод", "стол"],
+        endings=["", "а", "о", "ы", "ик", "ость", "ение", "ный"],
+        headings=["**Определение:**", "**Синонимы:**", "**Антонимы:**", "**Примеры предложений:**"],
+        glue=["это", "обозначает", "описывает", "значит", "используется для", "в смысле",
+              "часто связано с", "место, где", "то, что", "человек, который"],
+        sentences=["Этот {w} очень {a}.", "Вчера мы говорили о {w}.", "Без {w} жизнь была бы {a}.",
+                   "Мой друг считает, что {w} {a}.", "Летом {w} особенно {a}.", "Можешь показать мне {w}?"],
+        adjectives=["красивый", "большой", "маленький", "старый", "новый", "важный", "трудный", "простой"],
+    ),
+}
+
+
+def make_word(rng, spec):
+    return rng.choice(spec["stems"]) + rng.choice(spec["endings"]) + rng.choice(["", rng.choice(spec["stems"])])
+
+
+def make_response(rng, word, spec):
+    """A response shaped like the ones the lookup prompt asks for."""
+    definition = " ".join(
+        f"{rng.choice(spec['glue'])} {make_word(rng, spec)}" for _ in range(rng.randint(3, 6))
+    )
+    synonyms = ", ".join(make_word(rng, spec) for _ in range(rng.randint(3, 6)))
+    antonyms = ", ".join(make_word(rng, spec) for _ in range(rng.randint(1, 3)))
+    examples = "\n".join(
+        f"{i}. " + rng.choice(spec["sentences"]).format(w=word, a=rng.choice(spec["adjectives"]))
+        for i in range(1, rng.randint(3, 5) + 1)
+    )
+    parts = [f"{word.capitalize()}: {definition}.", synonyms, antonyms, examples]
+    return "\n\n\n".join(f"{heading}\n\n{part}" for heading, part in zip(spec["headings"], parts))
+
+
+def make_deck(count, seed=1):
+    rng = random.Random(seed)
+    names = list(LANGUAGES)
+    weights = [LANGUAGES[name]["share"] for name in names]
+    cards = []
+    for i in range(count):
+        language = rng.choices(names, weights)[0]
+        spec = LANGUAGES[language]
+        word = f"{make_word(rng, spec)}{i}"
+        cards.append({"word": word, "language": language, "response": make_response(rng, word, spec)})
+    return cards
+
+
+def measure(Mundilux, codec, label, cards, workdir):
+    """Store the deck with one codec and return its per-card figures."""
+    path = os.path.join(workdir, f"deck-{label}.db")
+    start = time.perf_counter()
+    store = Mundilux.VocabStore(path, legacy_json=None, codec=codec)
+    for i in range(0, len(cards), 1000):
+        # The batch size of the import worker
+        store.add_flashcards(cards[i:i + 1000])
+    stored = time.perf_counter() - start
+    with store._lock:
+        store._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        response_bytes = store._conn.execute("SELECT SUM(LENGTH(CAST(response AS BLOB))) FROM flashcards").fetchone()[0]
+
+    gc.collect()
+    tracemalloc.start()
+    index = Mundilux.FlashcardIndex(store.load_flashcards())
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    sample = random.Random(2).sample(list(index), 2000)
+    start = time.perf_counter()
+    for flashcard in sample:
+        store.response_text(flashcard)
+    display = (time.perf_counter() - start) / len(sample)
+    assert store.response_text(index.get(cards[-1]["word"], cards[-1]["language"])) == cards[-1]["response"]
+    return {
+        "response": response_bytes / len(cards),
+        "database": os.path.getsize(path) / len(cards),
+        "memory": memory / len(cards),
+        "display us": display * 1e6,
+        "store s": stored,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=50000)
+    args = parser.parse_args()
+
+    import Mundilux
+    cards = make_deck(args.cards)
+    workdir = tempfile.mkdtemp()
+    legacy = len(json.dumps({"vocab_list": cards, "favorites": []}, ensure_ascii=False, indent=4).encode("utf-8"))
+    print(f"{args.cards} cards; legacy vocab_data.json {legacy / args.cards:.0f} bytes/card")
+    print(f"  {'codec':<20} {'response':>10} {'database':>10} {'memory':>10} {'display':>10} {'store':>8}")
+    runs = [("none", "none"), ("zlib", "zlib, no dictionary"), ("zlib", "zlib")]
+    if importlib.util.find_spec("zstandard"):
+        runs.append(("zstd", "zstd"))
+    for codec, label in runs:
+        # Without enough cards a language never gets a dictionary
+        Mundilux.RESPONSE_DICT_MIN_SAMPLES = len(cards) + 1 if label.endswith("no dictionary") else 64
+        row = measure(Mundilux, codec, label, cards, workdir)
+        print(
+            f"  {label:<20} {row['response']:>8.0f} B {row['database']:>8.0f} B {row['memory']:>8.0f} B "
+            f"{row['display us']:>7.1f} us {row['store s']:>6.1f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Local stand-in for the Groq chat-completions endpoint.
+
+Serves POST /openai/v1/chat/completions with canned definitions, both as a
+plain JSON completion and as a server-sent-event stream (stream=true), with
+configurable latency, error injection (random, or the first N requests), an
+optional requests-per-minute limit (answered with 429 and Retry-After like
+the real API) and an outage switch that fails every request with 503.
+Point MundiLex at it through the GROQ_BASE_URL environment variable, which
+the groq client honours:
+
+    python benchmarks/fake_groq_server.py --port 8765 --first-token-ms 300
+    GROQ_BASE_URL=http://127.0.0.1:8765 python Mundilux.py
+
+It can also be started in-process with FakeGroqServer(...).start().
+"""
+import argparse
+import json
+import random
+import re
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+
+def canned_definition(word, language):
+    """Return a deterministic, realistically shaped definition for a word."""
+    return (
+        f"Definition: '{word}' is a {language} word used here as a stand-in entry.\n\n"
+        f"Synonyms: {word}chen, {word}lich, {word}heit\n\n"
+        f"Antonyms: un{word}, nicht-{word}\n\n"
+        f"Examples:\n"
+        f"1. Das ist ein Beispiel mit {word}.\n"
+        f"2. Wir sprechen heute über {word}.\n"
+        f"3. Ohne {word} wäre der Satz unvollständig."
+    )
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        with server.lock:
+            server.request_count += 1
+
+        if self.path != COMPLETIONS_PATH:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        if server.outage:
+            with server.lock:
+                server.error_count += 1
+            self._send_json(503, {"error": {"message": "Service unavailable", "type": "fake_outage"}})
+            return
+
+        retry_after = server.take_rate_limit_slot()
+        if retry_after is not None:
+            with server.lock:
+                server.error_count += 1
+                server.rate_limited_count += 1
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}},
+                            {"retry-after": str(retry_after)})
+            return
+
+        with server.lock:
+            fail = server.fail_first > 0
+            server.fail_first -= fail
+        if fail or (server.error_rate and random.random() < server.error_rate):
+            with server.lock:
+                server.error_count += 1
+            self._send_json(server.error_status, {"error": {"message": "Injected error", "type": "fake_error"}},
+                            {"retry-after": "1"} if server.error_status == 429 else None)
+            return
+
+        messages = body.get("messages", [])
+        prompt = messages[-1]["content"] if messages else ""
+        batch = re.search(r"in (\w+) for each of these words: (\[.*?\])\.", prompt)
+        if batch:
+            # Batch prompt: answer with a JSON object mapping each word to its entry
+            language, words = batch.group(1), json.loads(batch.group(2))
+            text = json.dumps({word: canned_definition(word, language) for word in words}, ensure_ascii=False)
+        else:
+            match = re.search(r"word '(.+?)' in (\w+)", prompt)
+            word, language = (match.group(1), match.group(2)) if match else ("wort", "German")
+            text = canned_definition(word, language)
+        prompt_tokens = sum(len(m.get("content", "")) // 4 + 4 for m in messages)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(text) // 4 + 1,
+            "total_tokens": prompt_tokens + len(text) // 4 + 1
+        }
+
+        time.sleep(server.first_token_ms / 1000)
+        if body.get("stream"):
+            self._stream(body, text, usage)
+        else:
+            self._send_json(200, {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            })
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, body, text, usage):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        # Chunked, like the real API, so the connection can be kept alive
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_chunk(data):
+            self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        def event(delta, finish_reason=None, extra=None):
+            chunk = {
+                "id": "chatcmpl-fake",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            if extra:
+                chunk.update(extra)
+            write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+
+        event({"role": "assistant", "content": ""})
+        # Split into word-sized tokens, keeping the whitespace
+        for token in re.findall(r"\S+\s*|\s+", text):
+            event({"content": token})
+            time.sleep(self.server.token_delay_ms / 1000)
+        event({}, "stop", {"x_groq": {"usage": usage}})
+        write_chunk(b"data: [DONE]\n\n")
+        write_chunk(b"")
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, first_token_ms=0, token_delay_ms=0,
+                 error_rate=0.0, error_status=429, verbose=False, rpm_limit=0, outage=False, fail_first=0):
+        super().__init__((host, port), FakeGroqHandler)
+        self.first_token_ms = first_token_ms
+        self.token_delay_ms = token_delay_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.verbose = verbose
+        self.rpm_limit = rpm_limit
+        self.outage = outage
+        self.fail_first = fail_first  # Requests still to fail with error_status, for deterministic tests
+        self.request_count = 0
+        self.error_count = 0
+        self.rate_limited_count = 0
+        self.lock = threading.Lock()
+        # Requests left under rpm_limit, replenished continuously like Groq's limits
+        self._allowance = float(rpm_limit)
+        self._allowance_updated = time.monotonic()
+        self._thread = None
+
+    def take_rate_limit_slot(self):
+        """Admit a request under rpm_limit; returns None, or the Retry-After seconds when over it."""
+        if not self.rpm_limit:
+            return None
+        rate = self.rpm_limit / 60.0
+        now = time.monotonic()
+        with self.lock:
+            self._allowance = min(self.rpm_limit, self._allowance + (now - self._allowance_updated) * rate)
+            self._allowance_updated = now
+            if self._allowance < 1:
+                return max(1, math.ceil((1 - self._allowance) / rate))
+            self._allowance -= 1
+            return None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serve from a daemon thread and return self."""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-token-ms", type=float, default=300, help="Latency before the first byte")
+    parser.add_argument("--token-delay-ms", type=float, default=20, help="Delay between streamed tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=429, help="HTTP status of injected failures")
+    parser.add_argument("--rpm-limit", type=int, default=0, help="Requests per minute before answering 429")
+    parser.add_argument("--outage", action="store_true", help="Fail every request with 503")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = FakeGroqServer(args.host, args.port, args.first_token_ms, args.token_delay_ms,
+                            args.error_rate, args.error_status, args.verbose, args.rpm_limit, args.outage)
+    print(f"Fake Groq server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
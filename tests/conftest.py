@@ -0,0 +1,48 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+# No display, no spaCy models and no daemon: the tests only exercise the lookup machinery
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("MUNDILEX_LEMMATIZER", "none")
+os.environ.setdefault("MUNDILEX_DAEMON", "off")
+
+from fake_groq_server import FakeGroqServer
+
+
+@pytest.fixture
+def fake_groq():
+    """Start FakeGroqServers with the given options; they are stopped after the test."""
+    servers = []
+
+    def start(**options):
+        server = FakeGroqServer(**options).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def groq_client(fake_groq):
+    """Return a GroqClient for a fake server, without rate limits or real sleeping."""
+    import Mundilux
+    clients = []
+
+    def make(server, **options):
+        options.setdefault("rpm", 0)
+        options.setdefault("tpm", 0)
+        options.setdefault("sleep", lambda seconds: None)
+        client = Mundilux.GroqClient(api_key="fake", base_url=server.base_url, **options)
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
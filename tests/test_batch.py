@@ -0,0 +1,58 @@
+import json
+
+import Mundilux
+from fake_groq_server import canned_definition
+
+
+def test_missing_words_are_left_out():
+    content = json.dumps({"Haus": "Definition: house"})
+
+    assert Mundilux.parse_batch_response(content, ["Haus", "Baum"]) == {"Haus": "Definition: house"}
+
+
+def test_extra_words_are_ignored():
+    content = json.dumps({"Haus": "Definition: house", "Garten": "Definition: garden"})
+
+    assert Mundilux.parse_batch_response(content, ["Haus"]) == {"Haus": "Definition: house"}
+
+
+def test_keys_match_regardless_of_case_and_spacing():
+    content = json.dumps({" haus ": "Definition: house"})
+
+    assert Mundilux.parse_batch_response(content, ["Haus"]) == {"Haus": "Definition: house"}
+
+
+def test_empty_entries_count_as_missing():
+    content = json.dumps({"Haus": "  ", "Baum": None})
+
+    assert Mundilux.parse_batch_response(content, ["Haus", "Baum"]) == {}
+
+
+def test_structured_entries_are_flattened_into_sections():
+    content = json.dumps({"Haus": {"Definition": "house", "Synonyms": ["Gebäude", "Heim"]}})
+
+    assert Mundilux.parse_batch_response(content, ["Haus"]) == {
+        "Haus": "Definition: house\n\nSynonyms: Gebäude, Heim"
+    }
+
+
+def test_text_around_the_object_is_tolerated():
+    content = 'Here you go:\n{"Haus": "Definition: house"}\nEnjoy!'
+
+    assert Mundilux.parse_batch_response(content, ["Haus"]) == {"Haus": "Definition: house"}
+
+
+def test_unparseable_answers_resolve_nothing():
+    assert Mundilux.parse_batch_response("not JSON at all", ["Haus"]) == {}
+    assert Mundilux.parse_batch_response('["Haus"]', ["Haus"]) == {}
+
+
+def test_a_batch_is_defined_with_one_request(fake_groq, groq_client):
+    server = fake_groq()
+    service = Mundilux.LookupService(cache=None, coalesce_window=0, client=groq_client(server))
+
+    definitions = service.fetch_linguistic_info_batch(["Haus", "Baum", "Wald"], "German")
+
+    assert definitions == {word: canned_definition(word, "German") for word in ("Haus", "Baum", "Wald")}
+    assert server.request_count == 1
+    service.shutdown()
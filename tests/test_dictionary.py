@@ -0,0 +1,54 @@
+import pytest
+
+import Mundilux
+
+
+@pytest.fixture
+def write_index(tmp_path):
+    indexes = []
+
+    def write(entries, block_size=4):
+        path = tmp_path / f"test{len(indexes)}.mldict"
+        with open(path, "wb") as f:
+            Mundilux.write_dictionary(f, entries, "de", block_size=block_size)
+        index = Mundilux.DictionaryIndex(str(path))
+        indexes.append(index)
+        return index
+
+    yield write
+    for index in indexes:
+        index.close()
+
+
+def test_every_entry_is_found(write_index):
+    # Shared prefixes exercise the front coding, several blocks the binary search
+    entries = {f"haus{i:03d}": f"Definition {i}" for i in range(100)}
+    entries.update({"häuser": "Plural von Haus", "hausen": "wohnen", "haus": "Gebäude", "ärger": "Verdruss"})
+    index = write_index(entries)
+
+    assert len(index) == len(entries)
+    assert index.language_code == "de"
+    for key, definition in entries.items():
+        assert index.get(key) == definition
+
+
+@pytest.mark.parametrize("key", ["", "aaa", "haus0005", "haus100", "hausa", "zzz", "Haus"])
+def test_missing_keys_return_none(write_index, key):
+    index = write_index({"haus": "y", **{f"haus{i:03d}": "x" for i in range(20)}})
+
+    assert index.get(key) is None
+
+
+def test_an_empty_dictionary_finds_nothing(write_index):
+    index = write_index({})
+
+    assert len(index) == 0
+    assert index.get("haus") is None
+
+
+def test_a_file_that_is_not_a_dictionary_is_rejected(tmp_path):
+    path = tmp_path / "other.mldict"
+    path.write_bytes(b"\0" * 64)
+
+    with pytest.raises(ValueError):
+        Mundilux.DictionaryIndex(str(path))
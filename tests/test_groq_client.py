@@ -0,0 +1,99 @@
+import pytest
+
+import Mundilux
+
+MESSAGES = [{"role": "user", "content": Mundilux.build_user_prompt("Haus", "German")}]
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_a_retryable_error_is_retried_then_succeeds(fake_groq, groq_client, status):
+    server = fake_groq(fail_first=1, error_status=status)
+    sleeps = []
+    client = groq_client(server, max_retries=2, sleep=sleeps.append)
+
+    response = client.complete(MESSAGES, max_tokens=50)
+
+    assert "Haus" in response.choices[0].message.content
+    assert server.request_count == 2
+    assert client.retries == 1
+    assert len(sleeps) == 1
+    assert client.breaker.state == "closed"
+
+
+def test_retry_after_is_honoured(fake_groq, groq_client):
+    server = fake_groq(fail_first=1, error_status=429)
+    sleeps = []
+    client = groq_client(server, max_retries=1, sleep=sleeps.append)
+
+    client.complete(MESSAGES, max_tokens=50)
+
+    assert sleeps[0] >= 1  # The fake server answers 429 with Retry-After: 1
+
+
+def test_the_last_error_is_raised_once_the_retries_are_used_up(fake_groq, groq_client):
+    server = fake_groq(fail_first=10, error_status=500)
+    client = groq_client(server, max_retries=2)
+
+    with pytest.raises(Exception) as raised:
+        client.complete(MESSAGES, max_tokens=50)
+
+    assert getattr(raised.value, "status_code", None) == 500
+    assert server.request_count == 3
+
+
+def test_the_breaker_opens_and_fails_fast(fake_groq, groq_client):
+    server = fake_groq(outage=True)
+    breaker = Mundilux.CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    client = groq_client(server, max_retries=0, breaker=breaker)
+
+    for _ in range(2):
+        with pytest.raises(Exception) as raised:
+            client.complete(MESSAGES, max_tokens=50)
+        assert not isinstance(raised.value, Mundilux.CircuitOpenError)
+    assert breaker.state == "open"
+
+    with pytest.raises(Mundilux.CircuitOpenError):
+        client.complete(MESSAGES, max_tokens=50)
+    assert server.request_count == 2
+    assert client.rejected == 1
+
+
+def test_rate_limits_do_not_open_the_breaker(fake_groq, groq_client):
+    server = fake_groq(fail_first=5, error_status=429)
+    breaker = Mundilux.CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    client = groq_client(server, max_retries=5, breaker=breaker)
+
+    client.complete(MESSAGES, max_tokens=50)
+
+    assert breaker.state == "closed"
+    assert server.request_count == 6
+
+
+def test_a_half_open_breaker_closes_after_a_successful_trial(monkeypatch):
+    breaker = Mundilux.CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    now = [1000.0]
+    monkeypatch.setattr(Mundilux.time, "monotonic", lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] += 31
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one trial call at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_lookups_degrade_to_not_available_while_the_breaker_is_open(fake_groq, groq_client):
+    server = fake_groq(outage=True)
+    client = groq_client(server, max_retries=0, breaker=Mundilux.CircuitBreaker(failure_threshold=1))
+    service = Mundilux.LookupService(cache=None, coalesce_window=0, client=client)
+    reasons = []
+    service.lookup_failed.connect(lambda word, reason: reasons.append(reason))
+
+    assert service.fetch_linguistic_info("Haus", "German") == Mundilux.DEFINITION_NOT_AVAILABLE
+    assert service.fetch_linguistic_info("Baum", "German") == Mundilux.DEFINITION_NOT_AVAILABLE
+
+    assert server.request_count == 1
+    assert reasons == ["Groq returned HTTP 503", "Groq is unavailable; showing cached and offline definitions only"]
+    service.shutdown()
@@ -0,0 +1,63 @@
+import io
+import json
+
+import pytest
+
+import Mundilux
+
+
+class SmallChunkReader(Mundilux.JsonStreamReader):
+    # Values, strings and numbers regularly straddle chunk boundaries
+    CHUNK_SIZE = 7
+
+
+def test_values_across_chunk_boundaries_are_decoded_whole():
+    document = [{"word": "Haus", "count": 123456789, "ratio": 0.125}, "ein langer Text mit Leerzeichen", -42, []]
+    reader = SmallChunkReader(io.StringIO(json.dumps(document)))
+
+    assert list(reader.iter_array()) == document
+
+
+def test_a_number_at_the_end_of_a_chunk_is_not_cut_off():
+    for padding in range(10):
+        text = "[" + " " * padding + "1234567890123]"
+        reader = SmallChunkReader(io.StringIO(text))
+        assert list(reader.iter_array()) == [1234567890123]
+
+
+def test_an_empty_array_yields_nothing():
+    assert list(SmallChunkReader(io.StringIO(" [ ] ")).iter_array()) == []
+
+
+def test_a_truncated_document_raises():
+    reader = SmallChunkReader(io.StringIO('[{"word": "Haus"}, {"word": "Ba'))
+
+    with pytest.raises(ValueError):
+        list(reader.iter_array())
+
+
+def test_a_missing_separator_raises():
+    reader = SmallChunkReader(io.StringIO('[1 2]'))
+
+    with pytest.raises(ValueError, match="Expected ','"):
+        list(reader.iter_array())
+
+
+def test_flashcards_are_read_from_a_document_with_other_keys():
+    cards = [{"word": f"Wort{i}", "language": "German", "response": "x" * i} for i in range(50)]
+    text = json.dumps({"favorites": ["Haus"], "vocab_list": cards, "version": 2})
+
+    read = [card for card, _ in Mundilux.iter_flashcards_from_file(io.StringIO(text))]
+
+    assert read == cards
+
+
+def test_flashcards_round_trip_through_export():
+    cards = [{"word": "Häuser", "language": "German", "response": "Plural von Haus"},
+             {"word": "casa", "language": "Spanish", "response": "house", "due": 12.5}]
+    for jsonl in (False, True):
+        f = io.StringIO()
+        for _ in Mundilux.write_flashcards_to_file(f, cards, favorites=["casa"], jsonl=jsonl):
+            pass
+        f.seek(0)
+        assert [card for card, _ in Mundilux.iter_flashcards_from_file(f, jsonl=jsonl)] == cards
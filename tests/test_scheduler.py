@@ -0,0 +1,110 @@
+import pytest
+
+import Mundilux
+from Mundilux import DAY, GRADE_AGAIN, GRADE_EASY, GRADE_GOOD, GRADE_HARD, ReviewScheduler, ReviewState
+
+NOW = 1_000_000.0
+
+
+def test_good_grades_follow_the_sm2_intervals():
+    scheduler = ReviewScheduler()
+    scheduler.add(("haus", "German"))
+
+    state = scheduler.grade(("haus", "German"), GRADE_GOOD, now=NOW)
+    assert (state.repetitions, state.interval, state.due) == (1, 1.0, NOW + DAY)
+    state = scheduler.grade(("haus", "German"), GRADE_GOOD, now=NOW)
+    assert state.interval == 6.0
+    state = scheduler.grade(("haus", "German"), GRADE_GOOD, now=NOW)
+    assert state.interval == round(6.0 * state.ease, 2)
+    assert state.ease == pytest.approx(2.5)  # A 4 leaves the ease unchanged
+    assert state.last_review == NOW
+
+
+def test_a_forgotten_card_relearns_soon_and_gets_harder():
+    scheduler = ReviewScheduler()
+    scheduler.add(("haus", "German"))
+    scheduler.grade(("haus", "German"), GRADE_GOOD, now=NOW)
+
+    state = scheduler.grade(("haus", "German"), GRADE_AGAIN, now=NOW)
+
+    assert (state.repetitions, state.lapses, state.interval) == (0, 1, 0.0)
+    assert state.due == NOW + Mundilux.RELEARN_DELAY
+    assert state.ease < 2.5
+
+
+def test_the_ease_never_drops_below_the_sm2_floor():
+    scheduler = ReviewScheduler()
+    scheduler.add(("haus", "German"))
+    for _ in range(20):
+        state = scheduler.grade(("haus", "German"), GRADE_AGAIN, now=NOW)
+
+    assert state.ease == 1.3
+
+
+def test_easy_grows_the_ease_and_hard_shrinks_it():
+    scheduler = ReviewScheduler()
+    scheduler.add(("easy", "German"))
+    scheduler.add(("hard", "German"))
+
+    assert scheduler.grade(("easy", "German"), GRADE_EASY, now=NOW).ease > 2.5
+    assert scheduler.grade(("hard", "German"), GRADE_HARD, now=NOW).ease < 2.5
+
+
+def test_grading_an_unknown_card_does_nothing():
+    assert ReviewScheduler().grade(("haus", "German"), GRADE_GOOD, now=NOW) is None
+
+
+def test_next_due_returns_new_cards_in_order_then_the_soonest_due():
+    scheduler = ReviewScheduler([
+        ("later", "German", ReviewState(due=NOW + 2 * DAY)),
+        ("sooner", "German", ReviewState(due=NOW + DAY)),
+    ])
+    assert scheduler.next_due() == ("sooner", "German")
+
+    scheduler.add(("new1", "German"))
+    scheduler.add(("new2", "German"))
+    assert scheduler.next_due() == ("new1", "German")
+    assert scheduler.next_due(skip=("new1", "German")) == ("new2", "German")
+
+    scheduler.grade(("new1", "German"), GRADE_GOOD, now=NOW)
+    scheduler.remove(("new2", "German"))
+    assert scheduler.next_due() == ("sooner", "German")  # Stale heap entries are skipped
+
+
+def test_next_due_with_skip_on_a_single_card_deck():
+    scheduler = ReviewScheduler()
+    assert scheduler.next_due() is None
+    scheduler.add(("haus", "German"))
+
+    assert scheduler.next_due(skip=("haus", "German")) is None
+    assert scheduler.next_due() == ("haus", "German")
+
+
+def test_many_grades_keep_the_heap_bounded():
+    scheduler = ReviewScheduler()
+    keys = [(f"wort{i}", "German") for i in range(10)]
+    for key in keys:
+        scheduler.add(key)
+    for round_ in range(100):
+        for key in keys:
+            scheduler.grade(key, GRADE_GOOD, now=NOW + round_)
+
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 64
+    assert scheduler.next_due() == min(keys, key=lambda key: scheduler.state(key).due)
+
+
+def test_reschedule_all_spreads_overdue_cards_most_overdue_first():
+    overdue = [(f"wort{i}", "German", ReviewState(due=NOW - (i + 1) * DAY, interval=1.0)) for i in range(4)]
+    scheduler = ReviewScheduler(overdue + [
+        ("future", "German", ReviewState(due=NOW + DAY)),
+        ("new", "German", ReviewState()),
+    ])
+
+    changed = scheduler.reschedule_all(now=NOW, spread_days=8)
+
+    assert [key for key, _ in changed] == [("wort3", "German"), ("wort2", "German"), ("wort1", "German"), ("wort0", "German")]
+    assert [state.due for _, state in changed] == [NOW, NOW + 2 * DAY, NOW + 4 * DAY, NOW + 6 * DAY]
+    assert scheduler.state(("future", "German")).due == NOW + DAY
+    assert scheduler.state(("new", "German")).due is None
+    assert scheduler.next_due() == ("new", "German")
+    assert scheduler.count_due(now=NOW) == 2  # The new card and the first rescheduled one
@@ -0,0 +1,213 @@
+import threading
+import time
+
+import pytest
+
+import Mundilux
+from Mundilux import SingleFlight
+
+
+def run_concurrently(count, target):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight(window=0)
+    calls = []
+    started = threading.Event()
+    release = threading.Event()
+
+    def fetch(stream):
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "Haus: house"
+
+    results = {}
+
+    def caller(i):
+        results[i] = flight.do("haus", fetch)
+
+    leader = threading.Thread(target=caller, args=(0,))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=caller, args=(i,)) for i in range(1, 5)]
+    for thread in followers:
+        thread.start()
+    while flight.stats()["coalesced_in_flight"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == {i: "Haus: house" for i in range(5)}
+    assert flight.stats() == {
+        "calls": 5, "executed": 1, "coalesced_in_flight": 4, "coalesced_recent": 0, "in_flight": 0
+    }
+
+
+def test_different_keys_do_not_coalesce():
+    flight = SingleFlight(window=0)
+    results = {}
+    run_concurrently(3, lambda i: results.setdefault(i, flight.do(i, lambda stream: f"result {i}")))
+
+    assert results == {i: f"result {i}" for i in range(3)}
+    assert flight.stats()["executed"] == 3
+
+
+def test_recent_results_are_reused_within_the_window(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(Mundilux.time, "monotonic", lambda: now[0])
+    flight = SingleFlight(window=2)
+    calls = []
+
+    def fetch(stream):
+        calls.append(1)
+        return "Haus: house"
+
+    flight.do("haus", fetch)
+    now[0] += 1
+    flight.do("haus", fetch)
+    assert len(calls) == 1
+
+    now[0] += 2
+    flight.do("haus", fetch)
+    assert len(calls) == 2
+
+    flight.forget("haus")
+    flight.do("haus", fetch)
+    assert len(calls) == 3
+
+
+def test_results_rejected_by_remember_are_not_reused():
+    flight = SingleFlight(window=60)
+    calls = []
+
+    def fetch(stream):
+        calls.append(1)
+        return "not available"
+
+    for _ in range(2):
+        flight.do("haus", fetch, remember=lambda result: result != "not available")
+
+    assert len(calls) == 2
+
+
+def test_the_leader_streams_chunks_to_every_caller():
+    flight = SingleFlight(window=0)
+    received = []
+
+    def fetch(stream):
+        for text in ("Das ", "Haus"):
+            stream(text)
+        return "Das Haus"
+
+    assert flight.do("haus", fetch, on_chunk=received.append) == "Das Haus"
+    assert received == ["Das ", "Haus"]
+
+
+def test_followers_retry_when_the_leader_fails():
+    flight = SingleFlight(window=0)
+    started = threading.Event()
+    release = threading.Event()
+    follower_result = []
+
+    def failing(stream):
+        started.set()
+        release.wait(5)
+        raise RuntimeError("connection lost")
+
+    def leader():
+        with pytest.raises(RuntimeError):
+            flight.do("haus", failing)
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: follower_result.append(flight.do("haus", lambda stream: "Haus: house")))
+    follower.start()
+    while flight.stats()["coalesced_in_flight"] < 1:
+        time.sleep(0.001)
+    release.set()
+    thread.join(5)
+    follower.join(5)
+
+    assert follower_result == ["Haus: house"]
+    assert flight.stats()["executed"] == 2
+
+
+def test_a_retrying_follower_does_not_get_a_second_stream():
+    flight = SingleFlight(window=0)
+    started = threading.Event()
+    release = threading.Event()
+    received = []
+    results = []
+
+    def failing(stream):
+        stream("Da")
+        started.set()
+        release.wait(5)
+        raise RuntimeError("connection lost")
+
+    def succeeding(stream):
+        if stream is not None:
+            stream("Das Haus")
+        return "Das Haus"
+
+    def leader():
+        with pytest.raises(RuntimeError):
+            flight.do("haus", failing, on_chunk=lambda text: None)
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flight.do("haus", succeeding, on_chunk=received.append)))
+    follower.start()
+    while flight.stats()["coalesced_in_flight"] < 1:
+        time.sleep(0.001)
+    release.set()
+    thread.join(5)
+    follower.join(5)
+
+    assert results == ["Das Haus"]
+    assert received == ["Da"]
+
+
+def test_followers_receive_the_leaders_failure_reason():
+    flight = SingleFlight(window=0)
+    started = threading.Event()
+    release = threading.Event()
+    reasons = []
+    results = []
+
+    def failing(stream):
+        started.set()
+        release.wait(5)
+        return "not available"
+
+    def caller(on_failure):
+        results.append(flight.do(
+            "haus", failing,
+            failure=lambda result: "rate limited" if result == "not available" else None,
+            on_failure=on_failure
+        ))
+
+    leader = threading.Thread(target=caller, args=(lambda reason: reasons.append(("leader", reason)),))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=caller, args=(lambda reason: reasons.append(("follower", reason)),))
+    follower.start()
+    while flight.stats()["coalesced_in_flight"] < 1:
+        time.sleep(0.001)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert results == ["not available", "not available"]
+    # The leader reports its own failure; only followers are told through on_failure
+    assert reasons == [("follower", "rate limited")]
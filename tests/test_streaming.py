@@ -0,0 +1,39 @@
+import Mundilux
+from fake_groq_server import canned_definition
+
+
+def make_service(client):
+    return Mundilux.LookupService(cache=None, coalesce_window=0, client=client)
+
+
+def test_streamed_chunks_arrive_in_order_and_join_into_the_answer(fake_groq, groq_client):
+    server = fake_groq(token_delay_ms=1)
+    service = make_service(groq_client(server))
+    chunks = []
+
+    response = service.fetch_linguistic_info("Haus", "German", on_chunk=chunks.append)
+
+    assert len(chunks) > 10
+    assert response == canned_definition("Haus", "German")
+    assert "".join(chunks).strip() == response
+    service.shutdown()
+
+
+def test_without_a_chunk_callback_the_answer_comes_in_one_piece(fake_groq, groq_client):
+    server = fake_groq()
+    service = make_service(groq_client(server))
+
+    assert service.fetch_linguistic_info("Baum", "German") == canned_definition("Baum", "German")
+    service.shutdown()
+
+
+def test_a_follower_receives_the_chunks_streamed_before_it_joined():
+    flight = Mundilux._Flight()
+    flight.stream("Das ")
+    flight.stream("Haus")
+    received = []
+
+    flight.add_listener(received.append)
+    flight.stream(" ist alt.")
+
+    assert received == ["Das ", "Haus", " ist alt."]